@@ -0,0 +1,130 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import common
+from modules import backup, checkout
+from modules import db_manager as db
+
+# --- ÇEVRİMİÇİ YEDEK BENCHMARKI: YEDEK SÜRESİ + YAZICI BEKLEMESİ ---
+# Kullanım:
+#   python -m benchmarks.bench_backup                        # 1M fikstür kopyası
+#   python -m benchmarks.bench_backup --db /yedek/library.db --writers 4
+#
+# Veritabanının geçici kopyasında masalar (iş parçacıkları) sürekli ödünç / iade
+# yazarken anlık görüntü alınır. Önce yedeksiz bir ölçüm turu yapılır; yazma
+# gecikmesi (p50 / p99 / en kötü) yedeksiz, sayfa kopyalama (veritabanına dokunan
+# aşama) ve doğrulama + sıkıştırma (geçici dosyada) aşamalarında ayrı ayrı
+# raporlanır. Ardından anlık görüntü geri yüklenir (geri yükleme süresi) ve yedek
+# başlarken yazılmış son ödüncün kopyada olduğu doğrulanır.
+
+BOOKS_PER_WRITER = 4
+
+
+def _writer_loop(member_id, book_ids, stop, samples):
+    # samples: (bitiş anı, gecikme ms)
+    i = 0
+    while not stop.is_set():
+        book_id = book_ids[i % len(book_ids)]
+        i += 1
+        t0 = time.perf_counter()
+        checkout.checkout(member_id, [book_id])
+        loan_id = db.fetch_value("SELECT id FROM transactions WHERE book_id = ? AND status = 'Aktif'", (book_id,))
+        checkout.checkin([loan_id])
+        end = time.perf_counter()
+        samples.append((end, (end - t0) * 1000))
+
+
+def _with_writers(writers, func):
+    # func() çalışırken yazıcılar döner. Dönüş: (func sonucu, [(an, gecikme ms)], başlangıç anı)
+    members = [row[0] for row in db.fetch_all("SELECT id FROM members ORDER BY id LIMIT ?", (writers,))]
+    books = [row[0] for row in db.fetch_all("""
+        SELECT id FROM books b WHERE status = 'Müsait'
+        AND NOT EXISTS (SELECT 1 FROM reservations r WHERE r.book_id = b.id AND r.status IN ('Bekliyor', 'Ayrıldı'))
+        ORDER BY id LIMIT ?""", (writers * BOOKS_PER_WRITER,))]
+    stop = threading.Event()
+    samples = []
+    threads = [threading.Thread(target=_writer_loop, daemon=True, args=(
+        members[i], books[i * BOOKS_PER_WRITER:(i + 1) * BOOKS_PER_WRITER], stop, samples))
+        for i in range(writers)]
+    for t in threads: t.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    return result, samples, start
+
+
+def _latency_line(name, timed_samples, begin, end):
+    samples = [ms for at, ms in timed_samples if begin <= at <= end]
+    elapsed = end - begin
+    if not samples:
+        return f"  {name:<16} yazma yok"
+    stats = [common.percentile(samples, p) for p in (50, 99)]
+    return (f"  {name:<16} {len(samples) / elapsed:>8,.0f} ödünç+iade/sn  p50 {stats[0]:6.2f} ms  "
+            f"p99 {stats[1]:6.2f} ms  en kötü {max(samples):7.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çevrimiçi yedek süresi ve yazıcıların beklemesi.")
+    parser.add_argument("--scale", default="1M", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--db", default=None, help="Fikstür yerine bu veritabanının kopyası")
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=backup.PAGES_PER_STEP)
+    parser.add_argument("--idle-seconds", type=float, default=3)
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp(prefix="akyurt_backup_")
+    try:
+        path = os.path.join(tmpdir, "live.db")
+        shutil.copyfile(args.db or common.ensure_fixture(args.scale), path)
+        common.use_database(path)
+        snap_dir = os.path.join(tmpdir, "snapshots")
+        print(f"{path}: {os.path.getsize(path) / 1e6:,.0f} MB, {args.writers} yazıcı")
+
+        _, idle, idle_start = _with_writers(args.writers, lambda: time.sleep(args.idle_seconds))
+        marker = {}
+
+        def progress(done, total):
+            if done == total: marker["copied"] = time.perf_counter()
+
+        def take():
+            marker["last_loan"] = db.fetch_value("SELECT MAX(id) FROM transactions")
+            marker["start"] = time.perf_counter()
+            report = backup.snapshot(snap_dir, pages=args.pages, progress=progress)
+            marker["end"] = time.perf_counter()
+            return report
+
+        report, during, _ = _with_writers(args.writers, take)
+
+        print(f"\n  kopya      {report['copy_seconds']:6.1f} sn  ({report['pages']:,} sayfa, {report['steps']} adım, "
+              f"{report['db_bytes'] / 1e6 / report['copy_seconds']:,.0f} MB/sn)")
+        print(f"  doğrulama  {report['check_seconds']:6.1f} sn")
+        print(f"  sıkıştırma {report['compress_seconds']:6.1f} sn  "
+              f"({report['db_bytes'] / 1e6:,.0f} MB → {report['gz_bytes'] / 1e6:,.0f} MB)")
+        print()
+        print(_latency_line("yedeksiz", idle, idle_start, idle_start + args.idle_seconds))
+        print(_latency_line("kopyalama", during, marker["start"], marker["copied"]))
+        print(_latency_line("doğrula+sıkıştır", during, marker["copied"], marker["end"]))
+
+        # Yedek başlamadan commit edilen her şey kopyada olmalı
+        restored = os.path.join(tmpdir, "restored.db")
+        restore_report = backup.restore(report["path"], target_path=restored, safety=False)
+        common.use_database(restored)
+        copied_last = db.fetch_value("SELECT MAX(id) FROM transactions")
+        print(f"\n  geri yükleme {restore_report['seconds']:.1f} sn; kopyadaki son ödünç {copied_last:,} "
+              f"(yedek başlarken {marker['last_loan']:,})")
+        return 0 if copied_last >= marker["last_loan"] else 1
+    finally:
+        db.reset_pool()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks import common
+from modules import branches
+from modules import db_manager as db
+
+# --- ŞUBELER ARASI (FEDERE) SORGU BENCHMARKI ---
+# Kullanım:
+#   python -m benchmarks.bench_branches                       # 100k fikstürün 3 kopyası = 3 şube
+#   python -m benchmarks.bench_branches --scale 1M --branches 4
+#
+# Fikstür her şube için ayrı bir dosyaya kopyalanır. Her sorgu için önce şubeler
+# tek tek ölçülür (en yavaş şube ve şubelerin toplamı; toplam, ATTACH'lı tek
+# bağlantının ya da sıralı okumanın maliyetidir), ardından aynı sorgu
+# branches.federate ile tüm şubelerde paralel çalıştırılır. Paralel okuma
+# işlemci çekirdeği kadar ölçeklenir: tek çekirdekte federe süre toplama yaklaşır.
+
+MEMBER_TEXT = "ay"
+SEARCH_TEXT = "suç ceza"
+
+
+def build_cases(phone):
+    # (ad, fonksiyon(şube adları))
+    return [
+        ("kpis", lambda names: branches.kpis(names)),
+        ("search_books", lambda names: branches.search_books(SEARCH_TEXT, names=names)),
+        ("find_members", lambda names: branches.find_members(MEMBER_TEXT, names=names)),
+        ("member_loans", lambda names: branches.member_loans(phone, names=names)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Şubeler arası sorgu: en yavaş şube / toplam / federe süre.")
+    parser.add_argument("--scale", default="100k", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp(prefix="akyurt_branches_")
+    try:
+        source = common.ensure_fixture(args.scale)
+        paths = {}
+        for i in range(args.branches):
+            paths[f"Şube{i + 1}"] = os.path.join(tmpdir, f"branch{i + 1}.db")
+            shutil.copyfile(source, paths[f"Şube{i + 1}"])
+        names = list(paths)
+        common.use_database(paths[names[0]])
+        branches.configure(paths, local=names[0])
+        phone = db.fetch_value("SELECT phone FROM members m WHERE EXISTS "
+                               "(SELECT 1 FROM transactions t WHERE t.member_id = m.id AND t.status = 'Aktif')")
+        print(f"{args.branches} şube × {args.scale} ({os.cpu_count()} çekirdek)\n")
+        print(f"{'Sorgu':<14} {'en yavaş':>9} {'toplam':>9} {'federe':>9}  federe / en yavaş")
+        for name, run in build_cases(phone):
+            single = [common.measure(lambda n=n: run([n]), iterations=args.iterations)["p50"] for n in names]
+            federated = common.measure(lambda: run(names), iterations=args.iterations)["p50"]
+            print(f"{name:<14} {max(single):>9.2f} {sum(single):>9.2f} {federated:>9.2f}  "
+                  f"{federated / max(single):.2f}x")
+        return 0
+    finally:
+        branches.reset()
+        db.reset_pool()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import argparse
+import os
+import sys
+
+from benchmarks import common
+from modules import db_manager as db
+from modules import analytics, lookup, recommend, stats
+from modules import search as catalog_search
+from modules.tables import PAGE_SIZES, create_custom_table, fetch_page, rows_table
+from modules.views import analytics as analytics_view
+from modules.views import books, dashboard, members, reservations
+
+# --- SAYFA BAŞINA VERİ YÜKLEME / ÇİZİM BENCHMARKI ---
+# Kullanım:
+#   python -m benchmarks.bench_pages                      # 10k ve 100k, temel değerlerle karşılaştır
+#   python -m benchmarks.bench_pages --scales 10k,100k,1M --save-baseline
+#
+# Her menünün çalıştırdığı sorgular ve HTML tablo üretimi, görünümlerin
+# kullandığı tanımların aynısıyla ölçülür. Typeahead aramaları önbelleksiz
+# (her çalıştırmadan önce lookup.clear_cache) ölçülür.
+# Temel değerlerden belirgin yavaşlama varsa çıkış kodu 1 olur.
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+SEARCH_TEXT = "suç"
+MEMBER_PREFIX = "ay"
+
+
+def _middle_key(source, sort_expr, id_expr, where=""):
+    # Derin sayfa ölçümü için listenin ortasındaki (sıralama, id) anahtarı
+    where_sql = f"WHERE {where}" if where else ""
+    count = db.fetch_value(f"SELECT COUNT(*) FROM {source} {where_sql}", default=0)
+    row = db.fetch_one(f"""
+        SELECT {sort_expr}, {id_expr} FROM {source} {where_sql}
+        ORDER BY {sort_expr}, {id_expr} LIMIT 1 OFFSET ?
+    """, (count // 2,))
+    return tuple(row) if row else None
+
+
+def build_cases():
+    # (menü, ad, fonksiyon, setup)
+    cases = []
+
+    def add(screen, name, func, setup=None):
+        cases.append((screen, name, func, setup))
+
+    # 1. Operasyon Merkezi
+    overdue = stats.overdue_loans(limit=dashboard.OVERDUE_PREVIEW)
+    add("Operasyon Merkezi", "get_kpis", stats.get_kpis)
+    add("Operasyon Merkezi", "overdue_loans", lambda: stats.overdue_loans(limit=dashboard.OVERDUE_PREVIEW))
+    add("Operasyon Merkezi", "overdue_table_html", lambda: rows_table(
+        dashboard.OVERDUE_COLUMNS, dashboard.overdue_display_rows(overdue), alert_col="Gecikme Süresi"))
+    add("Operasyon Merkezi", "find_overdue_loans", lambda: lookup.find_active_loans("", overdue=True),
+        lookup.clear_cache)
+
+    # 2. Ödünç ve İade (typeahead seçicileri)
+    cold = lookup.clear_cache
+    add("Ödünç ve İade", "find_members", lambda: lookup.find_members(""), cold)
+    add("Ödünç ve İade", "find_members_prefix", lambda: lookup.find_members(MEMBER_PREFIX), cold)
+    add("Ödünç ve İade", "find_books_available", lambda: lookup.find_books("", status="Müsait"), cold)
+    add("Ödünç ve İade", "find_books_search", lambda: lookup.find_books(SEARCH_TEXT, status="Müsait"), cold)
+    add("Ödünç ve İade", "find_active_loans", lambda: lookup.find_active_loans(""), cold)
+    add("Ödünç ve İade", "find_active_loans_search", lambda: lookup.find_active_loans(SEARCH_TEXT), cold)
+    # Öneriler: komşu tablosu ölçümden önce güncellenir (ilk çalıştırmada tam hesap)
+    recommend.refresh()
+    popular = [row[0] for row in db.fetch_all("SELECT book_id FROM book_readers ORDER BY readers DESC, book_id LIMIT 3")]
+    add("Ödünç ve İade", "cart_suggestions", lambda: recommend.suggest(popular, member_id=1))
+
+    # 3. Rezervasyon
+    add("Rezervasyon", "find_books_loaned", lambda: lookup.find_books("", status="Ödünçte"), cold)
+    add("Rezervasyon", "waiting_reservations", reservations.load_waiting_reservations)
+
+    # 4. Kitap Yönetimi
+    title_sort = books.INVENTORY_SORTS["Eser"]
+    middle = _middle_key("books", title_sort, "id")
+    add("Kitap Yönetimi", "inventory_first_page",
+        lambda: fetch_page("books", books.INVENTORY_COLUMNS, title_sort, "id"))
+    add("Kitap Yönetimi", "inventory_middle_page",
+        lambda: fetch_page("books", books.INVENTORY_COLUMNS, title_sort, "id", after=middle))
+    add("Kitap Yönetimi", "inventory_search", lambda: catalog_search.search_books(SEARCH_TEXT))
+    add("Kitap Yönetimi", "book_suggestions", lambda: recommend.suggest(popular[:1]))
+    # Aynı sayfalar süreç geneli katalog önbelleğinden (ilk yükleme ısınma turunda)
+    add("Kitap Yönetimi", "inventory_first_page_cached", lambda: books.inventory_page("Eser", None, False, 25))
+    add("Kitap Yönetimi", "inventory_middle_page_cached", lambda: books.inventory_page("Eser", middle, False, 25))
+
+    due_sort = books.LOANED_SORTS["Dönüş Tarihi"]
+    loaned_middle = _middle_key(books.LOANED_SOURCE, due_sort, "t.id", books.LOANED_WHERE)
+    add("Kitap Yönetimi", "loaned_first_page",
+        lambda: fetch_page(books.LOANED_SOURCE, books.LOANED_COLUMNS, due_sort, "t.id",
+                           where=books.LOANED_WHERE))
+    add("Kitap Yönetimi", "loaned_middle_page",
+        lambda: fetch_page(books.LOANED_SOURCE, books.LOANED_COLUMNS, due_sort, "t.id",
+                           after=loaned_middle, where=books.LOANED_WHERE))
+
+    # 5. Üye Yönetimi
+    name_sort = members.MEMBER_SORTS["Ad Soyad"]
+    add("Üye Yönetimi", "members_first_page",
+        lambda: fetch_page("members", members.MEMBER_COLUMNS, name_sort, "id"))
+    add("Üye Yönetimi", "members_first_page_cached", lambda: members.member_page("Ad Soyad", None, False, 25))
+    # Ödünç geçmişi: sıcak + arşiv (loan_history); 1 numaralı üye en çok geçmişi olanlardan
+    history_sort = members.HISTORY_SORTS["Veriliş Tarihi"]
+    add("Üye Yönetimi", "member_history_page",
+        lambda: fetch_page(members.HISTORY_SOURCE, members.HISTORY_COLUMNS, history_sort, "h.id",
+                           descending=True, where="h.member_id = ?", params=(1,)))
+
+    # 6. İstatistikler: özetler ölçümden önce güncellenir (ilk çalıştırmada tüm geçmiş)
+    analytics.refresh()
+    month = (analytics.months() or [""])[0]
+
+    def month_report():
+        daily = analytics.daily_df(month)
+        analytics_view.daily_series(daily, month)
+        analytics.top_titles_df(month)
+        analytics.active_members(month)
+        analytics_view.location_rates(daily, analytics.overdue_by_location_df())
+
+    add("İstatistikler", "analytics_needs_refresh", analytics.needs_refresh)
+    add("İstatistikler", "analytics_month_report", month_report)
+
+    # HTML tablo üretimi (sayfa boyutları)
+    for size in PAGE_SIZES:
+        page_df, _ = fetch_page(books.LOANED_SOURCE, books.LOANED_COLUMNS, due_sort, "t.id",
+                                page_size=size, where=books.LOANED_WHERE)
+        page_df = books.format_waiting(page_df) if not page_df.empty else page_df
+        add("Tablo Çizimi", f"create_custom_table_{size}",
+            lambda df=page_df: create_custom_table(df, alert_col="Sırada Bekleyen"))
+        rows = list(page_df.itertuples(index=False, name=None))
+        add("Tablo Çizimi", f"rows_table_{size}",
+            lambda cols=list(page_df.columns), rows=rows: rows_table(cols, rows, alert_col="Sırada Bekleyen"))
+    return cases
+
+
+def run_scale(scale, iterations, warmup, workers, verbose):
+    common.use_database(common.ensure_fixture(scale, workers=workers, verbose=verbose))
+    results = {}
+    for screen, name, func, setup in build_cases():
+        results[name] = common.measure(func, iterations=iterations, warmup=warmup, setup=setup)
+        results[name]["screen"] = screen
+    return results
+
+
+def print_report(scale, results, baseline):
+    old = baseline.get("results", {}).get(scale, {})
+    print(f"\n=== {scale} ({common.fixture_path(scale)}) ===")
+    print(f"{'Menü':<20} {'Ölçüm':<28} {'p50':>9} {'p90':>9} {'p99':>9} {'temel p50':>10}")
+    for name, r in results.items():
+        base = f"{old[name]['p50']:.2f}" if name in old else "-"
+        print(f"{r['screen']:<20} {name:<28} {r['p50']:>9.2f} {r['p90']:>9.2f} {r['p99']:>9.2f} {base:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Menü bazında veri yükleme ve tablo çizim süreleri (ms).")
+    parser.add_argument("--scales", default="10k,100k", help=f"Virgülle ayrılmış: {','.join(common.SCALES)}")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1, help="Fikstür üretimi için işçi süreç sayısı")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları temel değer olarak kaydet")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen p50 artışı (oran)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in common.SCALES]
+    if unknown:
+        parser.error(f"Bilinmeyen ölçek: {', '.join(unknown)}")
+
+    baseline = common.load_baseline(args.baseline)
+    results = {}
+    for scale in scales:
+        results[scale] = run_scale(scale, args.iterations, args.warmup, args.workers, not args.quiet)
+        print_report(scale, results[scale], baseline)
+
+    if args.save_baseline:
+        common.save_baseline(args.baseline, results, baseline)
+        print(f"\nTemel değerler kaydedildi: {args.baseline}")
+        return 0
+
+    regressions = common.compare(results, baseline, tolerance=args.tolerance)
+    for scale, name, old_ms, new_ms in regressions:
+        print(f"GERİLEME [{scale}] {name}: {old_ms:.2f} ms -> {new_ms:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import common
+from modules import db_manager as db
+from modules import recommend
+
+# --- ÖNERİ (KOMŞU TABLOSU) BENCHMARKI ---
+# Kullanım:
+#   python -m benchmarks.bench_recommend                  # 100k
+#   python -m benchmarks.bench_recommend --scale 1M --loans 20
+#
+# Fikstürün geçici bir kopyasında: tam hesap (rebuild), --loans yeni ödünç
+# sonrası artımlı güncelleme (refresh) ve ekran sorgusu ölçülür. Ekran sorgusu,
+# aynı öneriyi geçmiş üzerinde self-join ile o an hesaplayan sorguyla
+# karşılaştırılır (en çok okunan kitap için).
+
+LIVE_SQL = """
+    SELECT b.title, b.author, coalesce(b.location, '-'), b.status, COUNT(DISTINCT o.member_id)
+    FROM (SELECT DISTINCT member_id FROM loan_history WHERE book_id = :book) r
+    JOIN loan_history o ON o.member_id = r.member_id AND o.book_id <> :book
+    JOIN books b ON b.id = o.book_id
+    GROUP BY o.book_id
+    ORDER BY COUNT(DISTINCT o.member_id) DESC, o.book_id
+    LIMIT :limit
+"""
+
+
+def _add_loans(count, seed):
+    # datagen ile aynı çarpık dağılım: popüler kitap / çok okuyan üye
+    rng = random.Random(seed)
+    books = db.fetch_value("SELECT MAX(id) FROM books")
+    members = db.fetch_value("SELECT MAX(id) FROM members")
+    with db.transaction() as conn:
+        conn.executemany("""
+            INSERT INTO transactions (book_id, member_id, issue_date, due_date, return_date, status)
+            VALUES (?, ?, DATE('now'), DATE('now', '+14 days'), DATE('now'), 'Tamamlandı')
+        """, [(int(books * rng.random() ** 2.5) + 1, int(members * rng.random() ** 2.5) + 1)
+              for _ in range(count)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Öneri tablosu: tam / artımlı hesap ve ekran sorgusu.")
+    parser.add_argument("--scale", default="100k", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--loans", type=int, default=20, help="Artımlı güncelleme başına yeni ödünç")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--live-iterations", type=int, default=3,
+                        help="Self-join karşılaştırması (tek çalıştırma 100k ~13 sn, 1M ~9 dk); 0: atla")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp(prefix="akyurt_recommend_")
+    try:
+        path = os.path.join(tmpdir, "recommend.db")
+        shutil.copyfile(common.ensure_fixture(args.scale), path)
+        common.use_database(path)
+
+        result = recommend.rebuild()
+        print(f"{args.scale}: {result['pairs']:,} (üye, kitap) çifti, {result['books']:,} kitap")
+        print(f"  rebuild                {result['seconds'] * 1000:>10.1f} ms  ({result['rows']:,} komşu satırı)")
+
+        times = []
+        for i in range(args.rounds):
+            _add_loans(args.loans, seed=i)
+            start = time.perf_counter()
+            report = recommend.refresh()
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"  refresh ({args.loans} ödünç)    p50 {common.percentile(times, 50):>6.1f} ms  "
+              f"(en kötü {max(times):.1f} ms, son turda {report['books']:,} kitap)")
+
+        book = db.fetch_value("SELECT book_id FROM book_readers ORDER BY readers DESC, book_id LIMIT 1")
+        stats = common.measure(lambda: recommend.suggest([book]), iterations=args.iterations)
+        print(f"  {'suggest (tablo)':<22} p50 {stats['p50']:>8.2f} ms  p90 {stats['p90']:>8.2f} ms")
+        if args.live_iterations:
+            params = {"book": book, "limit": 5}
+            stats = common.measure(lambda: db.fetch_all(LIVE_SQL, params), iterations=args.live_iterations, warmup=0)
+            print(f"  {'canlı self-join':<22} p50 {stats['p50']:>8.2f} ms  p90 {stats['p90']:>8.2f} ms")
+        return 0
+    finally:
+        db.reset_pool()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import common
+
+# --- AÇILIŞ VE YENİDEN ÇİZİM (RERUN) BENCHMARKI ---
+# Kullanım:
+#   python -m benchmarks.bench_startup                  # 10k fikstür, 5 soğuk açılış, sayfa başına 10 rerun
+#   python -m benchmarks.bench_startup --scale 100k --cold 3 --reruns 20
+#
+# Soğuk açılış: her ölçüm yeni bir Python sürecidir; Streamlit hazırlandıktan
+# sonra app.py'nin içe aktarımları ve ilk sayfanın (Operasyon Merkezi) ilk çizimi
+# (streamlit.testing AppTest ile) ölçülür, pandas'ın ilk çizimde yüklenip
+# yüklenmediği raporlanır.
+# Rerun: aynı süreçte her menü seçilip art arda yeniden çalıştırılır; app.py'nin
+# her rerun'da tekrarlanan işi (logo, CSS, menü) + sayfanın kendisi.
+# Rerun süreleri AppTest'in kendi yükünü de içerir ("sayfa" sütunu yalnızca menü
+# fonksiyonudur); karşılaştırma aynı makinede, art arda yapılmalı.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _child():
+    # Soğuk süreç: tek ölçüm, JSON olarak stdout'a
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest'in kendi ilk çalıştırma yükü (bileşen taraması) boş bir betikle ödenir
+    AppTest.from_string("import streamlit as st").run()
+    imported = time.perf_counter()
+    pandas_before = "pandas" in sys.modules
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    done = time.perf_counter()
+    print(json.dumps({"streamlit_import": imported - start, "first_render": done - imported,
+                      "total": done - start, "pandas": "pandas" in sys.modules and not pandas_before,
+                      "error": str(at.exception[0].message) if at.exception else None}))
+
+
+def cold_start(path, runs):
+    env = dict(os.environ, AKYURT_DB_PATH=path, PYTHONPATH=os.path.dirname(APP_PATH))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child"], env=env,
+                             cwd=os.path.dirname(APP_PATH), capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def reruns(path, count):
+    # Dönüş: {menü: ([rerun ms], [sayfa gövdesi ms])}; gövde süresi app.py'nin kendi
+    # ölçümünden (instrumentation.section) okunur, AppTest'in bekleme yükünü içermez
+    os.environ["AKYURT_DB_PATH"] = path
+    from streamlit.testing.v1 import AppTest
+    from modules import instrumentation
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    results = {}
+    for page in at.sidebar.radio[0].options:
+        at.sidebar.radio[0].set_value(page).run()
+        samples, bodies = [], []
+        for _ in range(count):
+            start = time.perf_counter()
+            at.run()
+            samples.append((time.perf_counter() - start) * 1000)
+            body = next((s for s in instrumentation.sections() if s["name"] == page), None)
+            if body: bodies.append(body["last_ms"])
+        results[page] = (samples, bodies)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soğuk açılış (ilk çizim) ve sayfa başına rerun süresi.")
+    parser.add_argument("--scale", default="10k", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--cold", type=int, default=5, help="Soğuk açılış ölçüm sayısı (ayrı süreçler)")
+    parser.add_argument("--reruns", type=int, default=10, help="Sayfa başına rerun sayısı")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child()
+        return 0
+
+    path = common.ensure_fixture(args.scale)
+    print(f"Fikstür: {path}")
+    cold = cold_start(path, args.cold)
+    errors = [s["error"] for s in cold if s["error"]]
+    med = {key: statistics.median(s[key] for s in cold) * 1000
+           for key in ("streamlit_import", "first_render", "total")}
+    print(f"\nSoğuk açılış ({len(cold)} süreç, medyan): streamlit hazırlığı {med['streamlit_import']:.0f} ms, "
+          f"ilk çizim {med['first_render']:.0f} ms, toplam {med['total']:.0f} ms; "
+          f"pandas ilk çizimde {'YÜKLENDİ' if any(s['pandas'] for s in cold) else 'yüklenmedi'}")
+
+    print(f"\n{'Menü':<22} {'p50 ms':>8} {'p90 ms':>8} {'sayfa p50':>10}")
+    for page, (samples, bodies) in reruns(path, args.reruns).items():
+        body = f"{common.percentile(bodies, 50):>10.1f}" if bodies else f"{'-':>10}"
+        print(f"{page:<22} {common.percentile(samples, 50):>8.1f} {common.percentile(samples, 90):>8.1f} {body}")
+    if errors:
+        print(f"\n❌ İlk çizimde hata: {errors[0]}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import time
+from datetime import datetime
+
+from modules import datagen
+from modules import db_manager as db
+
+# --- ORTAK BENCHMARK YARDIMCILARI ---
+# Fikstür veritabanları modules.datagen ile sabit tohumla üretilir ve
+# benchmarks/fixtures/ altında saklanır; parametreler değişmedikçe yeniden
+# üretilmez. Ölçek adı, ödünç (transactions) satır sayısını belirtir; diğer
+# tablolar aynı oranlarla büyür.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_SEED = 42
+
+SCALES = {
+    "10k": dict(books=2_000, members=500, transactions=10_000, reservations=200),
+    "100k": dict(books=20_000, members=5_000, transactions=100_000, reservations=2_000),
+    "1M": dict(books=200_000, members=50_000, transactions=1_000_000, reservations=20_000),
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def fixture_path(scale):
+    sizes = SCALES[scale]
+    tag = "-".join(str(sizes[k]) for k in ("books", "members", "transactions", "reservations"))
+    return os.path.join(FIXTURE_DIR, f"bench_{scale}_s{FIXTURE_SEED}_{tag}.db")
+
+
+def ensure_fixture(scale, workers=1, verbose=True):
+    path = fixture_path(scale)
+    if not os.path.exists(path):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        if verbose: print(f"[{scale}] fikstür üretiliyor: {path}")
+        datagen.generate(path, seed=FIXTURE_SEED, workers=workers, verbose=verbose, **SCALES[scale])
+    return path
+
+
+def use_database(path):
+    # Havuz ve önbellekler bir önceki fikstüre bağlı kalmasın
+    db.DB_PATH = path
+    db.reset_pool()
+    db.bump_write_generation()
+
+
+# --- ZAMANLAMA ---
+def percentile(samples, pct):
+    # Doğrusal ara değerli yüzdelik (numpy'nin varsayılanı ile aynı)
+    data = sorted(samples)
+    if len(data) == 1: return data[0]
+    pos = (len(data) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (pos - lo)
+
+
+def measure(func, iterations=20, warmup=2, setup=None):
+    # setup her çalıştırmadan önce çağrılır ve süreye dahil edilmez (ör. önbellek temizliği)
+    for _ in range(warmup):
+        if setup: setup()
+        func()
+    samples = []
+    for _ in range(iterations):
+        if setup: setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    result = {f"p{p}": percentile(samples, p) for p in PERCENTILES}
+    result.update(mean=statistics.fmean(samples), min=min(samples), max=max(samples), n=len(samples))
+    return result
+
+
+# --- TEMEL DEĞERLER (BASELINE) ---
+def load_baseline(path):
+    if not os.path.exists(path): return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, previous=None):
+    # Sadece bu çalıştırmada ölçülen ölçekler güncellenir
+    data = dict(previous or {})
+    data.setdefault("results", {}).update(results)
+    data["meta"] = {
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, metric="p50", tolerance=0.25, min_delta_ms=1.0):
+    # Hem oransal (tolerance) hem mutlak (min_delta_ms) eşiği aşanlar gerileme sayılır;
+    # çok hızlı ölçümlerdeki gürültü böylece alarm üretmez.
+    regressions = []
+    for scale, benches in results.items():
+        old_scale = baseline.get("results", {}).get(scale, {})
+        for name, stats in benches.items():
+            old = old_scale.get(name)
+            if old is None: continue
+            new_ms, old_ms = stats[metric], old[metric]
+            if new_ms > old_ms * (1 + tolerance) and new_ms - old_ms > min_delta_ms:
+                regressions.append((scale, name, old_ms, new_ms))
+    return regressions
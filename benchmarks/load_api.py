@@ -0,0 +1,155 @@
+import argparse
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import common
+from modules import db_manager as db
+
+# --- HTTP API YÜK TESTİ: ÖDÜNÇ / İADE ---
+# Kullanım:
+#   python -m benchmarks.load_api                          # 100k fikstür kopyası, süreç içi sunucu
+#   python -m benchmarks.load_api --clients 16 --seconds 20
+#   python -m benchmarks.load_api --url http://127.0.0.1:8600 --db library.db
+#
+# Her istemci kalıcı (keep-alive) bir HTTP bağlantısı açar ve kendine ayrılmış
+# müsait kitaplar üzerinde döngüyle POST /checkout ve POST /checkin (barkod =
+# kayıt no) gönderir. Fikstür yazıldığı için geçici bir kopya kullanılır;
+# --url verilirse dışarıda çalışan sunucu ve --db ile gösterilen veritabanı
+# kullanılır (kitap seçimi için okunur).
+
+BOOKS_PER_CLIENT = 4
+
+
+class _Client:
+    def __init__(self, url, token):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.headers = {"Content-Type": "application/json"}
+        if token: self.headers["Authorization"] = f"Bearer {token}"
+
+    def post(self, path, payload):
+        self.conn.request("POST", path, json.dumps(payload), self.headers)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+
+def _pick_books(count):
+    # Sırası olmayan müsait kitaplar; istemcilere ayrık dağıtılır
+    return [row[0] for row in db.fetch_all("""
+        SELECT id FROM books WHERE status = 'Müsait' ORDER BY id LIMIT ?
+    """, (count,))]
+
+
+def run_load(url, clients, seconds, token=""):
+    members = [row[0] for row in db.fetch_all("SELECT id FROM members ORDER BY id LIMIT ?", (clients,))]
+    books = _pick_books(clients * BOOKS_PER_CLIENT)
+    if len(members) < clients or len(books) < clients * BOOKS_PER_CLIENT:
+        raise SystemExit("Yeterli üye / müsait kitap yok")
+
+    latencies = {"checkout": [], "checkin": []}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    start_barrier = threading.Barrier(clients + 1)
+
+    def worker(index):
+        client = _Client(url, token)
+        member_id = members[index]
+        own_books = books[index * BOOKS_PER_CLIENT:(index + 1) * BOOKS_PER_CLIENT]
+        local = {"checkout": [], "checkin": []}
+        local_errors = []
+        start_barrier.wait()
+        i = 0
+        while time.perf_counter() < deadline:
+            book_id = own_books[i % len(own_books)]
+            i += 1
+            for op, payload in (("checkout", {"member_id": member_id, "book_ids": [book_id]}),
+                                ("checkin", {"codes": [str(book_id)]})):
+                t0 = time.perf_counter()
+                status, body = client.post(f"/{op}", payload)
+                local[op].append((time.perf_counter() - t0) * 1000)
+                if status >= 300:
+                    local_errors.append((op, status, body.get("error")))
+        client.conn.close()
+        with lock:
+            for op in local: latencies[op].extend(local[op])
+            errors.extend(local_errors)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads: t.start()
+    start_barrier.wait()
+    began = time.perf_counter()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - began
+
+    report = {"clients": clients, "seconds": elapsed, "errors": errors, "ops": {}}
+    for op, samples in latencies.items():
+        if not samples: continue
+        stats = {f"p{p}": common.percentile(samples, p) for p in common.PERCENTILES}
+        stats.update(n=len(samples), rps=len(samples) / elapsed)
+        report["ops"][op] = stats
+    report["rps"] = sum(len(s) for s in latencies.values()) / elapsed
+    return report
+
+
+def print_report(report):
+    print(f"\n{report['clients']} istemci, {report['seconds']:.1f} sn — toplam {report['rps']:,.0f} istek/sn")
+    print(f"  {'işlem':<10} {'istek':>8} {'istek/sn':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for op, s in report["ops"].items():
+        print(f"  {op:<10} {s['n']:>8,} {s['rps']:>10,.1f} {s['p50']:>8.2f} {s['p90']:>8.2f} {s['p99']:>8.2f}")
+    if report["errors"]:
+        print(f"  ❌ {len(report['errors'])} hatalı yanıt, ilki: {report['errors'][0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API ödünç / iade yük testi (istek/sn, gecikme).")
+    parser.add_argument("--scale", default="100k", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--url", default=None, help="Dışarıda çalışan API (verilmezse süreç içi sunucu)")
+    parser.add_argument("--db", default=None, help="--url ile: sunucunun kullandığı veritabanı")
+    parser.add_argument("--clients", default="1,4,16", help="Virgülle ayrılmış eşzamanlı istemci sayıları")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--token", default=os.environ.get("AKYURT_API_TOKEN", ""))
+    args = parser.parse_args(argv)
+    client_counts = [int(c) for c in args.clients.split(",") if c.strip()]
+
+    tmpdir = server = None
+    try:
+        if args.url:
+            common.use_database(args.db or db.DB_PATH)
+            url = args.url
+        else:
+            from modules import api
+
+            tmpdir = tempfile.mkdtemp(prefix="akyurt_load_")
+            path = os.path.join(tmpdir, "load.db")
+            shutil.copyfile(common.ensure_fixture(args.scale), path)
+            common.use_database(path)
+            server = api.serve("127.0.0.1", 0, token=args.token)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_port}"
+        print(f"Hedef: {url}  veritabanı: {db.DB_PATH}")
+
+        failed = False
+        for clients in client_counts:
+            report = run_load(url, clients, args.seconds, args.token)
+            print_report(report)
+            failed |= bool(report["errors"])
+        return 1 if failed else 0
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if tmpdir is not None:
+            db.reset_pool()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import common
+from modules import checkout
+from modules import db_manager as db
+
+# --- EŞZAMANLI ÖDÜNÇ / İADE STRES TESTİ ---
+# Kullanım:
+#   python -m benchmarks.stress_checkout                         # 32 iş parçacığı, 20 sıcak kitap
+#   python -m benchmarks.stress_checkout --processes 4 --threads 16 --busy-timeout-ms 50
+#   python -m benchmarks.stress_checkout --naive                 # eski oku-sonra-yaz yolu (karşılaştırma)
+#
+# Çok sayıda masa (iş parçacığı / süreç) aynı küçük kitap kümesini ödünç vermeye
+# çalışır; alan masa bir süre sonra iade eder. Fikstürün geçici kopyası kullanılır.
+# Sonunda şunlar doğrulanır:
+#   * hiçbir kitabın birden fazla aktif ödüncü yok,
+#   * books.status ile aktif ödünçler tutarlı,
+#   * başarılı ödünç / iade sayıları veritabanındaki değişimle aynı.
+# Tek süreçte ayrıca canlı sahiplik kontrolü yapılır (aynı anda iki sahip = ihlal).
+
+HOT_BOOKS = 20
+HOLD_OPS = 3  # Masa, aldığı kitabı en fazla bu kadar işlem sonra iade eder
+
+
+def _naive_checkout(member_id, book_ids, days=14):
+    # Düzeltme öncesi davranış: durum kilitsiz okunur, yazma koşulsuz yapılır
+    book_id = book_ids[0]
+    status = db.fetch_value("SELECT status FROM books WHERE id = ?", (book_id,))
+    if status != 'Müsait':
+        return False, [(book_id, status)]
+    time.sleep(0)  # ekranın çizildiği ile düğmeye basılan an arası
+    due_date = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO transactions (book_id, member_id, issue_date, due_date) "
+                     "VALUES (?, ?, DATE('now'), ?)", (book_id, member_id, due_date))
+        conn.execute("UPDATE books SET status = 'Ödünçte' WHERE id = ?", (book_id,))
+    return True, []
+
+
+def _loan_id(book_id, member_id):
+    return db.fetch_value("SELECT id FROM transactions WHERE book_id = ? AND member_id = ? AND status = 'Aktif'",
+                          (book_id, member_id))
+
+
+def run_worker(path, threads, seconds, books, members, seed, naive=False, busy_timeout_ms=None):
+    # Bir süreçteki tüm masalar; dönüş: sayaçlar + süre
+    if busy_timeout_ms is not None:
+        db.BUSY_TIMEOUT_MS = busy_timeout_ms
+    common.use_database(path)
+    lend = _naive_checkout if naive else checkout.checkout
+    counts = {"checkout": 0, "checkin": 0, "rejected": 0, "busy": 0, "errors": 0, "violations": 0}
+    owners = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    barrier = threading.Barrier(threads)
+
+    def desk(index):
+        rng = random.Random(seed * 1000 + index)
+        member_id = members[index % len(members)]
+        local = dict.fromkeys(counts, 0)
+        holding = []  # [(book_id, kalan işlem)]
+        barrier.wait()
+        while time.perf_counter() < deadline:
+            try:
+                if holding and (holding[0][1] <= 0 or rng.random() < 0.3):
+                    book_id, _ = holding.pop(0)
+                    loan_id = _loan_id(book_id, member_id)
+                    with lock:
+                        owners.pop(book_id, None)
+                    returned, _ = checkout.checkin([loan_id] if loan_id else [])
+                    local["checkin"] += returned
+                    continue
+                holding = [(b, n - 1) for b, n in holding]
+                book_id = rng.choice(books)
+                ok, _ = lend(member_id, [book_id])
+                if not ok:
+                    local["rejected"] += 1
+                    continue
+                local["checkout"] += 1
+                holding.append((book_id, HOLD_OPS))
+                with lock:
+                    if book_id in owners:
+                        local["violations"] += 1
+                    owners[book_id] = member_id
+            except db.DatabaseBusy:
+                local["busy"] += 1
+            except Exception:
+                local["errors"] += 1
+        # Kalanları iade et (son durum kontrolü temiz başlasın)
+        for book_id, _ in holding:
+            loan_id = _loan_id(book_id, member_id)
+            with lock:
+                owners.pop(book_id, None)
+            if loan_id:
+                local["checkin"] += checkout.checkin([loan_id])[0]
+        with lock:
+            for key, value in local.items(): counts[key] += value
+
+    workers = [threading.Thread(target=desk, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers: t.start()
+    for t in workers: t.join()
+    counts["seconds"] = time.perf_counter() - start
+    counts.update({f"busy_{k}": v for k, v in db.busy_stats().items()})
+    db.reset_pool()
+    return counts
+
+
+def _run_worker_args(args):
+    return run_worker(*args)
+
+
+def check_invariants():
+    # Dönüş: [(kontrol, ihlal sayısı)]
+    return [
+        ("Birden çok aktif ödüncü olan kitap", db.fetch_value("""
+            SELECT COUNT(*) FROM (SELECT book_id FROM transactions WHERE status = 'Aktif'
+                                  GROUP BY book_id HAVING COUNT(*) > 1)""")),
+        ("Aktif ödüncü olduğu halde 'Ödünçte' olmayan kitap", db.fetch_value("""
+            SELECT COUNT(*) FROM books b WHERE b.status != 'Ödünçte'
+            AND EXISTS (SELECT 1 FROM transactions t WHERE t.book_id = b.id AND t.status = 'Aktif')""")),
+        ("Aktif ödüncü olmadığı halde 'Ödünçte' görünen kitap", db.fetch_value("""
+            SELECT COUNT(*) FROM books b WHERE b.status = 'Ödünçte'
+            AND NOT EXISTS (SELECT 1 FROM transactions t WHERE t.book_id = b.id AND t.status = 'Aktif')""")),
+    ]
+
+
+def _loan_counts():
+    return db.fetch_one("SELECT COUNT(*), SUM(status = 'Tamamlandı') FROM transactions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eşzamanlı ödünç / iade doğruluk ve işlem/sn testi.")
+    parser.add_argument("--scale", default="10k", help=f"Fikstür ölçeği: {','.join(common.SCALES)}")
+    parser.add_argument("--threads", type=int, default=32, help="Süreç başına masa (iş parçacığı)")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--hot-books", type=int, default=HOT_BOOKS, help="Çekişilen kitap sayısı")
+    parser.add_argument("--busy-timeout-ms", type=int, default=None,
+                        help="Kısa tutulursa kilit hataları ve tekrar yolu zorlanır")
+    parser.add_argument("--naive", action="store_true", help="Kilitsiz oku-sonra-yaz (eski) ödünç yolu")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp(prefix="akyurt_stress_")
+    try:
+        path = os.path.join(tmpdir, "stress.db")
+        shutil.copyfile(common.ensure_fixture(args.scale), path)
+        common.use_database(path)
+        # Sırası olmayan müsait kitaplar; masa sayısı kadar üye
+        books = [row[0] for row in db.fetch_all("""
+            SELECT id FROM books b WHERE status = 'Müsait'
+            AND NOT EXISTS (SELECT 1 FROM reservations r WHERE r.book_id = b.id AND r.status IN ('Bekliyor', 'Ayrıldı'))
+            ORDER BY id LIMIT ?""", (args.hot_books,))]
+        desks = args.threads * args.processes
+        members = [row[0] for row in db.fetch_all("SELECT id FROM members ORDER BY id LIMIT ?", (desks,))]
+        before_invariants = dict(check_invariants())
+        loans_before, completed_before = _loan_counts()
+        db.reset_pool()
+
+        mode = "kilitsiz (eski)" if args.naive else "BEGIN IMMEDIATE + koşullu UPDATE"
+        print(f"{args.processes} süreç x {args.threads} masa, {len(books)} sıcak kitap, {args.seconds:.0f} sn — {mode}")
+        jobs = [(path, args.threads, args.seconds, books, members[i * args.threads:(i + 1) * args.threads],
+                 args.seed + i, args.naive, args.busy_timeout_ms) for i in range(args.processes)]
+        if args.processes == 1:
+            results = [run_worker(*jobs[0])]
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                results = pool.map(_run_worker_args, jobs)
+
+        total = {key: sum(r[key] for r in results) for key in results[0] if key != "seconds"}
+        elapsed = max(r["seconds"] for r in results)
+        common.use_database(path)
+        loans_after, completed_after = _loan_counts()
+        commits = total["checkout"] + total["checkin"]
+
+        print(f"\n  ödünç: {total['checkout']:,}  iade: {total['checkin']:,}  reddedilen: {total['rejected']:,}")
+        print(f"  kilit tekrarı: {total['busy_retries']:,}  tükenen (meşgul): {total['busy']:,}  "
+              f"diğer hata: {total['errors']:,}")
+        print(f"  {commits / elapsed:,.0f} yazma işlemi/sn ({elapsed:.1f} sn)")
+
+        failures = []
+        if args.processes == 1 and total["violations"]:
+            failures.append(("Aynı anda iki sahipli kitap (canlı)", total["violations"]))
+        for name, count in check_invariants():
+            # Fikstürde önceden var olan tutarsızlıklar testin sonucu sayılmaz
+            if count > before_invariants[name]:
+                failures.append((name, count - before_invariants[name]))
+        if loans_after - loans_before != total["checkout"]:
+            failures.append(("Yazılan ödünç kaydı ≠ başarılı ödünç", loans_after - loans_before - total["checkout"]))
+        if (completed_after or 0) - (completed_before or 0) != total["checkin"]:
+            failures.append(("Tamamlanan kayıt ≠ başarılı iade", completed_after - completed_before - total["checkin"]))
+        if total["errors"]:
+            failures.append(("Beklenmeyen hata", total["errors"]))
+
+        print()
+        for name, count in failures:
+            print(f"  ❌ {name}: {count:,}")
+        if not failures:
+            print("  ✅ Tutarlı: çift ödünç yok, durumlar ve sayılar eşleşiyor.")
+        return 1 if failures else 0
+    finally:
+        db.reset_pool()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
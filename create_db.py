@@ -3,6 +3,8 @@ from faker import Faker
 import random
 from datetime import datetime, timedelta
 
+from modules import migrations
+
 # Türkçe sahte veri üretici
 fake = Faker('tr_TR')
 
@@ -14,46 +16,8 @@ def create_connection():
 
 
 def create_tables(conn):
-    cursor = conn.cursor()
-
-    # 1. Kitaplar Tablosu
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS books (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT NOT NULL,
-        author TEXT NOT NULL,
-        isbn TEXT,
-        location TEXT,
-        status TEXT DEFAULT 'Müsait' -- Müsait, Ödünçte, Kayıp
-    )
-    ''')
-
-    # 2. Üyeler Tablosu
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS members (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        phone TEXT,
-        email TEXT,
-        join_date DATE
-    )
-    ''')
-
-    # 3. Hareketler (İşlemler) Tablosu
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS transactions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        book_id INTEGER,
-        member_id INTEGER,
-        issue_date DATE,
-        due_date DATE,
-        return_date DATE,
-        status TEXT DEFAULT 'Aktif', -- Aktif, Tamamlandı
-        FOREIGN KEY (book_id) REFERENCES books (id),
-        FOREIGN KEY (member_id) REFERENCES members (id)
-    )
-    ''')
-    conn.commit()
+    # Şema tek kaynaktan: modules/migrations.py (PRAGMA user_version ile sürümlü)
+    migrations.migrate(conn, verbose=True)
 
 
 def generate_mock_data(conn):
@@ -85,8 +49,8 @@ def generate_mock_data(conn):
     book_ids = [row[0] for row in cursor.execute("SELECT id FROM books").fetchall()]
     member_ids = [row[0] for row in cursor.execute("SELECT id FROM members").fetchall()]
 
-    for _ in range(15):  # 15 tane aktif işlem
-        book_id = random.choice(book_ids)
+    # Aynı kitap iki kez ödünç verilmesin (books.status ile aktif ödünç tutarlı kalır)
+    for book_id in random.sample(book_ids, 15):  # 15 tane aktif işlem
         member_id = random.choice(member_ids)
 
         # Senaryo: %40 ihtimalle teslim tarihi geçmiş olsun
@@ -0,0 +1,240 @@
+import argparse
+import sys
+import threading
+import time
+
+from modules import db_manager as db
+
+# --- DOLAŞIM İSTATİSTİKLERİ (GÜNLÜK ÖZETLER) ---
+# Belediye raporları (günlük ödünç, en çok okunanlar, aktif üye, raf bazında
+# gecikme oranı) tüm ödünç geçmişi üzerinde GROUP BY yerine göç 12'deki özet
+# tablolardan okunur:
+#   rollup_daily        (gün, raf)   -> ödünç, iade, geç iade
+#   rollup_book_month   (ay, kitap)  -> ödünç
+#   rollup_member_month (ay, üye)    -> ödünç  (aylık aktif üye = satır sayısı)
+#
+# refresh() artımlıdır ve her adımı ayrı, kısa bir yazma işlemidir:
+#   1. analytics_returns günlüğündeki iadeler: ödüncü daha önce sayılmışsa
+#      (id <= filigran) iadesi eklenir; değilse 2. adım zaten iade edilmiş görür.
+#   2. filigrandan sonraki en fazla REFRESH_CHUNK ödünç: veriliş gününe ödünç,
+#      iade edilmişse iade gününe iade yazılır; filigran ilerler.
+# İlk çalıştırma tüm geçmişi (arşiv dahil, loan_history) parça parça işler.
+
+REFRESH_CHUNK = 20_000
+# Arka plan yenilemesinde adımlar arası bekleme: masalardaki ödünç / iade işlemleri
+# BEGIN IMMEDIATE zincirinin arasında yazma kilidini alabilsin
+BACKGROUND_PAUSE = 0.05
+NO_LOCATION = '-'
+
+# Parça: (filigran, üst sınır] aralığındaki ödünçler
+_CHUNK_SOURCE = """
+    FROM loan_history h LEFT JOIN books b ON b.id = h.book_id
+    WHERE h.id > :lo AND h.id <= :hi
+"""
+
+
+def _upsert_daily(select_sql):
+    return f"""
+        INSERT INTO rollup_daily (day, location, loans, returns, late_returns)
+        {select_sql}
+        ON CONFLICT (day, location) DO UPDATE SET
+            loans = loans + excluded.loans,
+            returns = returns + excluded.returns,
+            late_returns = late_returns + excluded.late_returns
+    """
+
+
+def _upsert_month(table, key):
+    return f"""
+        INSERT INTO {table} (month, {key}, loans)
+        SELECT substr(h.issue_date, 1, 7), h.{key}, COUNT(*) {_CHUNK_SOURCE} AND h.issue_date IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (month, {key}) DO UPDATE SET loans = loans + excluded.loans
+    """
+
+
+_LOANS_DAILY_SQL = _upsert_daily(f"""
+    SELECT day, location, SUM(loans), SUM(returns), SUM(late) FROM (
+        SELECT h.issue_date AS day, coalesce(b.location, '{NO_LOCATION}') AS location,
+               1 AS loans, 0 AS returns, 0 AS late {_CHUNK_SOURCE}
+        UNION ALL
+        SELECT h.return_date, coalesce(b.location, '{NO_LOCATION}'), 0, 1, h.return_date > h.due_date
+        {_CHUNK_SOURCE} AND h.return_date IS NOT NULL
+    ) WHERE day IS NOT NULL
+    GROUP BY day, location
+""")
+
+_RETURNS_DAILY_SQL = _upsert_daily(f"""
+    SELECT h.return_date, coalesce(b.location, '{NO_LOCATION}'), 0, COUNT(*), SUM(h.return_date > h.due_date)
+    FROM analytics_returns r
+    JOIN transactions h ON h.id = r.loan_id
+    LEFT JOIN books b ON b.id = h.book_id
+    WHERE r.seq <= :seq AND r.loan_id <= :watermark AND h.return_date IS NOT NULL
+    GROUP BY 1, 2
+""")
+
+
+def _max_loan_id(conn):
+    return conn.execute("""
+        SELECT max(coalesce((SELECT MAX(id) FROM transactions), 0),
+                   coalesce((SELECT MAX(id) FROM transactions_archive), 0))
+    """).fetchone()[0]
+
+
+@db.retry_on_busy
+def _refresh_step(chunk):
+    # Dönüş: (işlenen ödünç id aralığı genişliği, günlükten okunan iade sayısı)
+    with db.transaction(immediate=True) as conn:
+        watermark = conn.execute("SELECT last_loan_id FROM analytics_state WHERE id = 1").fetchone()[0]
+        seq = conn.execute("SELECT MAX(seq) FROM analytics_returns").fetchone()[0]
+        returns = 0
+        if seq is not None:
+            # İadeler yakın tarihlidir; arşive taşınmış olamaz (sıcak tablo yeterli)
+            conn.execute(_RETURNS_DAILY_SQL, {"seq": seq, "watermark": watermark})
+            returns = conn.execute("DELETE FROM analytics_returns WHERE seq <= ?", (seq,)).rowcount
+        top = min(_max_loan_id(conn), watermark + chunk)
+        if top > watermark:
+            bounds = {"lo": watermark, "hi": top}
+            conn.execute(_LOANS_DAILY_SQL, bounds)
+            conn.execute(_upsert_month("rollup_book_month", "book_id"), bounds)
+            conn.execute(_upsert_month("rollup_member_month", "member_id"), bounds)
+        conn.execute("UPDATE analytics_state SET last_loan_id = ?, refreshed_at = CURRENT_TIMESTAMP WHERE id = 1",
+                     (max(top, watermark),))
+    return max(top - watermark, 0), returns
+
+
+def refresh(chunk=REFRESH_CHUNK, progress=None, pause=0.0):
+    # Yeni ödünç / iade yoksa tek küçük işlem. Dönüş: rapor sözlüğü
+    start = time.perf_counter()
+    loans = returns = 0
+    while True:
+        span, step_returns = _refresh_step(chunk)
+        loans += span
+        returns += step_returns
+        if progress: progress(loans, time.perf_counter() - start)
+        if span < chunk: break
+        if pause: time.sleep(pause)
+    return {"loans": loans, "returns": returns, "seconds": time.perf_counter() - start}
+
+
+def needs_refresh():
+    # Ucuz kontrol (iki indeks araması): yazma işlemi açmaya gerek var mı?
+    row = db.fetch_one("""
+        SELECT (SELECT last_loan_id FROM analytics_state WHERE id = 1),
+               (SELECT MAX(id) FROM transactions),
+               EXISTS (SELECT 1 FROM analytics_returns)
+    """)
+    watermark, max_hot, pending_returns = row
+    return bool(pending_returns) or (max_hot or 0) > (watermark or 0)
+
+
+_background = threading.Lock()
+
+
+def refresh_running():
+    return _background.locked()
+
+
+def refresh_in_background():
+    # Rapor sayfası beklemesin: ilk doldurma (1M geçmişte ~20 sn) veya biriken
+    # fark arka planda işlenir, sayfa mevcut özetleri gösterir. Süreç başına tek iş.
+    # Dönüş: yenileme sürüyorsa True.
+    if refresh_running(): return True
+    if not needs_refresh() or not _background.acquire(blocking=False): return refresh_running()
+
+    def run():
+        try:
+            refresh(pause=BACKGROUND_PAUSE)
+        finally:
+            _background.release()
+
+    threading.Thread(target=run, name="analytics-refresh", daemon=True).start()
+    return True
+
+
+def rebuild(progress=None):
+    # Özetleri sıfırdan üretir (tutarsızlık şüphesinde)
+    with db.transaction(immediate=True) as conn:
+        for table in ("rollup_daily", "rollup_book_month", "rollup_member_month", "analytics_returns"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("UPDATE analytics_state SET last_loan_id = 0 WHERE id = 1")
+    return refresh(progress=progress)
+
+
+# --- RAPOR SORGULARI (özet tablolardan, geçmiş uzunluğundan bağımsız) ---
+def months():
+    # Verisi olan aylar, yeniden eskiye ('YYYY-AA')
+    return [row[0] for row in db.fetch_all("""
+        SELECT DISTINCT substr(day, 1, 7) FROM rollup_daily ORDER BY 1 DESC
+    """)]
+
+
+def daily_df(month):
+    # Gün x raf satırları; gün bazında toplama görünüm tarafında (pandas)
+    return db.read_df("""
+        SELECT day, location, loans, returns, late_returns FROM rollup_daily
+        WHERE day >= ? AND day < ?
+    """, (f"{month}-01", f"{month}-32"))
+
+
+def top_titles_df(month, limit=10):
+    # Aynı eserin kopyaları tek başlık altında toplanır
+    return db.read_df("""
+        SELECT coalesce(b.title, '(silinmiş kitap)') AS title, coalesce(b.author, '-') AS author,
+               SUM(r.loans) AS loans, COUNT(*) AS copies
+        FROM rollup_book_month r LEFT JOIN books b ON b.id = r.book_id
+        WHERE r.month = ?
+        GROUP BY 1, 2 ORDER BY loans DESC, title LIMIT ?
+    """, (month, int(limit)))
+
+
+def active_members(month):
+    return db.fetch_value("SELECT COUNT(*) FROM rollup_member_month WHERE month = ?", (month,), default=0)
+
+
+def overdue_by_location_df():
+    # Şu an geciken ödünçler raf bazında (aktif ödünçler küçük kümedir; kısmi indeks)
+    return db.read_df(f"""
+        SELECT coalesce(b.location, '{NO_LOCATION}') AS location, COUNT(*) AS overdue_now
+        FROM transactions t LEFT JOIN books b ON b.id = t.book_id
+        WHERE t.status = 'Aktif' AND t.due_date <= DATE('now')
+        GROUP BY 1
+    """)
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dolaşım istatistikleri özet tabloları.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("refresh", help="Yeni ödünç / iadeleri özetlere ekle")
+    sub.add_parser("rebuild", help="Özetleri sıfırdan üret")
+    report = sub.add_parser("report", help="Aylık özet")
+    report.add_argument("--month", default=None, help="YYYY-AA (varsayılan: en son ay)")
+    args = parser.parse_args(argv)
+
+    def progress(loans, seconds):
+        print(f"\r  {loans:,} ödünç işlendi ({seconds:.1f} sn)", end="", file=sys.stderr, flush=True)
+
+    if args.command in ("refresh", "rebuild"):
+        result = (refresh if args.command == "refresh" else rebuild)(progress=progress)
+        print(file=sys.stderr)
+        print(f"✅ {result['loans']:,} ödünç, {result['returns']:,} iade kaydı "
+              f"({result['seconds']:.1f} sn)", file=sys.stderr)
+        return 0
+
+    if needs_refresh():
+        refresh()
+    month = args.month or (months() or [None])[0]
+    if month is None:
+        print("Veri yok.", file=sys.stderr)
+        return 1
+    daily = daily_df(month)
+    returns, late = daily["returns"].sum(), daily["late_returns"].sum()
+    print(f"{month}: {daily['loans'].sum():,} ödünç, {returns:,} iade "
+          f"(%{100 * late / max(returns, 1):.1f} geç), {active_members(month):,} aktif üye")
+    print(top_titles_df(month).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+import argparse
+import json
+import os
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from modules import catalog_cache
+from modules import db_manager as db
+from modules import search
+from modules import services
+
+# --- YEREL HTTP / JSON API ---
+# Kiosk ve barkod istasyonları Streamlit arayüzünden geçmeden aynı servis
+# katmanını (modules/services.py) kullanır. Her istek ayrı bir iş parçacığında
+# çalışır ve veritabanı bağlantısını süreç geneli havuzdan alır. HTTP/1.1
+# keep-alive açıktır: istemci tek TCP bağlantısı üzerinden art arda istek atar.
+#
+#   python -m modules.api --port 8600
+#   curl -X POST localhost:8600/checkout -d '{"member_id": 1, "codes": ["9789750718533"]}'
+#
+# AKYURT_API_TOKEN tanımlıysa her istek "Authorization: Bearer <token>" taşımalıdır.
+
+API_HOST = os.environ.get("AKYURT_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("AKYURT_API_PORT", "8600"))
+API_TOKEN = os.environ.get("AKYURT_API_TOKEN", "")
+MAX_BODY = 1 << 20
+MAX_LIMIT = 500
+
+BOOK_FIELDS = ("id", "title", "author", "isbn", "location", "status")
+MEMBER_FIELDS = ("id", "name", "phone", "email", "join_date")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {"error": message, **extra}
+
+
+# --- İSTEK YARDIMCILARI ---
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' sayı olmalı")
+
+
+def _ids(body, name):
+    values = body.get(name) or []
+    if not isinstance(values, list):
+        raise ApiError(400, f"'{name}' liste olmalı")
+    return [_int(v, name) for v in values]
+
+
+def _codes(body):
+    # Barkodlar liste olmalı (metin tek tek karakterlere bölünüp kitap no sanılmasın)
+    values = body.get("codes") or []
+    if not isinstance(values, list):
+        raise ApiError(400, "'codes' liste olmalı")
+    return [str(v) for v in values]
+
+
+def _limit(query, default=20):
+    return max(1, min(_int(query.get("limit", default), "limit"), MAX_LIMIT))
+
+
+def _record(row, fields, name):
+    if row is None:
+        raise ApiError(404, f"{name} bulunamadı")
+    return dict(zip(fields, row))
+
+
+def _require(body, *names):
+    missing = [name for name in names if not body.get(name)]
+    if missing:
+        raise ApiError(400, "Eksik alan: " + ", ".join(missing))
+
+
+# --- KİTAP ---
+def list_books(query, body):
+    status = query.get("status")
+    rows = services.find_books(query.get("q", ""), status.split(",") if status else None, _limit(query))
+    return 200, [dict(zip(BOOK_FIELDS, services.get_book(book_id))) for book_id, _ in rows]
+
+
+def get_book(query, body, book_id):
+    return 200, _record(services.get_book(book_id), BOOK_FIELDS, "Kitap")
+
+
+def add_book(query, body):
+    ok, result = services.add_book(body.get("title"), body.get("author"),
+                                   body.get("location", ""), body.get("isbn", ""))
+    if not ok:
+        raise ApiError(400, result)
+    return 201, {"id": result}
+
+
+def update_book(query, body, book_id):
+    current = _record(services.get_book(book_id), BOOK_FIELDS, "Kitap")
+    ok, message = services.update_book(book_id, body.get("title", current["title"]),
+                                       body.get("author", current["author"]),
+                                       body.get("location", current["location"]))
+    if not ok:
+        raise ApiError(404 if services.get_book(book_id) is None else 400, message)
+    return 200, {"id": book_id}
+
+
+def delete_book(query, body, book_id):
+    ok, message = services.delete_book(book_id)
+    if not ok:
+        raise ApiError(404 if services.get_book(book_id) is None else 409, message)
+    return 200, {"id": book_id}
+
+
+# --- ÜYE ---
+def list_members(query, body):
+    rows = services.find_members(query.get("q", ""), _limit(query))
+    return 200, [dict(zip(MEMBER_FIELDS, services.get_member(member_id))) for member_id, _ in rows]
+
+
+def get_member(query, body, member_id):
+    return 200, _record(services.get_member(member_id), MEMBER_FIELDS, "Üye")
+
+
+def add_member(query, body):
+    ok, result = services.add_member(body.get("name"), body.get("phone"), body.get("email", ""))
+    if not ok:
+        raise ApiError(400, result)
+    return 201, {"id": result}
+
+
+def update_member(query, body, member_id):
+    current = _record(services.get_member(member_id), MEMBER_FIELDS, "Üye")
+    ok, message = services.update_member(member_id, body.get("name", current["name"]),
+                                         body.get("phone", current["phone"]),
+                                         body.get("email", current["email"]))
+    if not ok:
+        raise ApiError(404 if services.get_member(member_id) is None else 400, message)
+    return 200, {"id": member_id}
+
+
+def delete_member(query, body, member_id):
+    ok, message = services.delete_member(member_id)
+    if not ok:
+        raise ApiError(404 if services.get_member(member_id) is None else 409, message)
+    return 200, {"id": member_id}
+
+
+# --- ÖDÜNÇ / İADE ---
+def list_loans(query, body):
+    rows = services.find_active_loans(query.get("q", ""), _limit(query))
+    return 200, [{"loan_id": loan_id, "book_id": book_id, "label": label} for (loan_id, book_id), label in rows]
+
+
+def checkout(query, body):
+    # {"member_id": 1, "book_ids": [..]} veya {"member_id": 1, "codes": ["ISBN / kayıt no", ..]}
+    _require(body, "member_id")
+    member_id = _int(body["member_id"], "member_id")
+    if services.get_member(member_id) is None:
+        raise ApiError(404, "Üye bulunamadı")
+    book_ids = _ids(body, "book_ids")
+    for code in _codes(body):
+        item, error = services.resolve_checkout(code, exclude=set(book_ids))
+        if error:
+            raise ApiError(409, error, code=code)
+        book_ids.append(item["book_id"])
+    if not book_ids:
+        raise ApiError(400, "Eksik alan: book_ids / codes")
+    ok, problems = services.checkout(member_id, book_ids, _int(body.get("days", services.MAX_LOAN_DAYS), "days"))
+    if not ok and problems == [(None, services.LOAN_DAYS_ERROR)]:
+        raise ApiError(400, services.LOAN_DAYS_ERROR)
+    if not ok:
+        raise ApiError(409, "Ödünç verilemedi",
+                       problems=[{"book_id": book_id, "message": message} for book_id, message in problems])
+    return 201, {"member_id": member_id, "book_ids": book_ids}
+
+
+def checkin(query, body):
+    # {"loan_ids": [..]} veya {"codes": [..]}
+    loan_ids = _ids(body, "loan_ids")
+    for code in _codes(body):
+        item, error = services.resolve_return(code, exclude=set(loan_ids))
+        if error:
+            raise ApiError(409, error, code=code)
+        loan_ids.append(item["loan_id"])
+    if not loan_ids:
+        raise ApiError(400, "Eksik alan: loan_ids / codes")
+    returned, held = services.checkin(loan_ids)
+    return 200, {"returned": returned,
+                 "held": [{"title": t, "member": m, "phone": p, "hold_until": h} for t, m, p, h in held]}
+
+
+# --- REZERVASYON ---
+def list_reservations(query, body):
+    return 200, services.reservations().to_dict("records")
+
+
+def reserve(query, body):
+    _require(body, "book_id", "member_id")
+    ok, message = services.reserve(_int(body["book_id"], "book_id"), _int(body["member_id"], "member_id"))
+    if not ok:
+        raise ApiError(409, message)
+    return 201, {"message": message}
+
+
+def cancel_reservation(query, body, reservation_id):
+    held = services.cancel_reservation(reservation_id)
+    return 200, {"id": reservation_id,
+                 "held": [{"title": t, "member": m, "phone": p, "hold_until": h} for t, m, p, h in held]}
+
+
+# --- DİĞER ---
+def health(query, body):
+    return 200, {"status": "ok", "catalog_cache": catalog_cache.available("books")}
+
+
+def stats(query, body):
+    return 200, services.kpis()
+
+
+def search_catalog(query, body):
+    return 200, search.search_books(query.get("q", ""), _limit(query)).to_dict("records")
+
+
+# (yöntem, yol deseni, işleyici); desendeki gruplar tam sayı olarak işleyiciye geçer
+ROUTES = [
+    ("GET", r"/health", health),
+    ("GET", r"/stats", stats),
+    ("GET", r"/search", search_catalog),
+    ("GET", r"/books", list_books),
+    ("POST", r"/books", add_book),
+    ("GET", r"/books/(\d+)", get_book),
+    ("PUT", r"/books/(\d+)", update_book),
+    ("DELETE", r"/books/(\d+)", delete_book),
+    ("GET", r"/members", list_members),
+    ("POST", r"/members", add_member),
+    ("GET", r"/members/(\d+)", get_member),
+    ("PUT", r"/members/(\d+)", update_member),
+    ("DELETE", r"/members/(\d+)", delete_member),
+    ("GET", r"/loans", list_loans),
+    ("POST", r"/checkout", checkout),
+    ("POST", r"/checkin", checkin),
+    ("GET", r"/reservations", list_reservations),
+    ("POST", r"/reservations", reserve),
+    ("DELETE", r"/reservations/(\d+)", cancel_reservation),
+]
+_ROUTES = [(method, re.compile(pattern + "/?"), handler) for method, pattern, handler in ROUTES]
+
+
+def route(method, path):
+    # Dönüş: (işleyici, yol parametreleri); yol var ama yöntem yoksa 405
+    path_found = False
+    for route_method, pattern, handler in _ROUTES:
+        match = pattern.fullmatch(path)
+        if match is None: continue
+        if route_method == method:
+            return handler, [int(group) for group in match.groups()]
+        path_found = True
+    raise ApiError(405 if path_found else 404, "Yöntem desteklenmiyor" if path_found else "Bulunamadı")
+
+
+# --- SUNUCU ---
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: Content-Length her yanıtta gönderilir
+    server_version = "AkyurtAPI/1.0"
+    # Başlık ve gövde ayrı yazılır; Nagle + gecikmeli ACK her yanıta ~40 ms ekler
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        self.body_read = False
+        try:
+            if self.server.token and self.headers.get("Authorization") != f"Bearer {self.server.token}":
+                raise ApiError(401, "Yetkisiz")
+            url = urlsplit(self.path)
+            handler, args = route(self.command, url.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            status, payload = handler(query, self._body(), *args)
+        except ApiError as e:
+            status, payload = e.status, e.payload
+        except db.DatabaseBusy:
+            status, payload = 503, {"error": "Veritabanı meşgul, tekrar deneyin"}
+        except Exception as e:
+            self.log_error("%s %s: %r", self.command, self.path, e)
+            status, payload = 500, {"error": "Sunucu hatası"}
+        if not self.body_read and self.headers.get("Content-Length", "0") != "0":
+            # Okunmamış gövde bağlantıda kalırsa sonraki istek bozulur
+            self.close_connection = True
+        self._reply(status, payload)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "İstek çok büyük")
+        if not length: return {}
+        data = self.rfile.read(length)
+        self.body_read = True
+        try:
+            body = json.loads(data)
+        except ValueError:
+            raise ApiError(400, "Geçersiz JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Gövde JSON nesnesi olmalı")
+        return body
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+def serve(host=API_HOST, port=API_PORT, token=API_TOKEN, verbose=False):
+    # Sunucuyu oluşturur; çağıran serve_forever() / shutdown() ile yönetir
+    server = ThreadingHTTPServer((host, port), _ApiHandler)
+    server.daemon_threads = True
+    server.token = token
+    server.verbose = verbose
+    return server
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kütüphane işlemleri için yerel HTTP/JSON API.")
+    parser.add_argument("--host", default=API_HOST, help="Dinlenecek adres (varsayılan sadece yerel)")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--verbose", action="store_true", help="Her isteği stderr'e yaz")
+    args = parser.parse_args(argv)
+
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not API_TOKEN:
+        print("⚠️ Yerel olmayan adreste AKYURT_API_TOKEN olmadan çalışıyor.", file=sys.stderr)
+    catalog_cache.warm()
+    server = serve(args.host, args.port, verbose=args.verbose)
+    print(f"API: http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from modules import db_manager as db
+
+# --- ÖDÜNÇ ARŞİVİ (SICAK / SOĞUK) ---
+# transactions sadece büyür; iade edilmiş eski kayıtlar aktif ödünçlerin yanında
+# durdukça indeksler ve sayfa önbelleği de büyür. Arşiv işi, iade tarihi
+# ARCHIVE_AFTER_DAYS günden eski tamamlanmış ödünçleri küçük partiler halinde
+# transactions_archive tablosuna taşır (göç 11). Her parti ayrı ve kısa bir yazma
+# işlemidir; masalardaki ödünç / iade işlemleri arşiv sürerken beklemez.
+#
+# Geçmiş okuyan her yer (üye geçmişi, raporlar) loan_history görünümünü kullanır;
+# görünüm iki tabloyu UNION ALL ile birleştirir, hangi kaydın nerede olduğu
+# okuyan için fark etmez. Günlük işlemler (aktif ödünç, iade, gecikme) sadece
+# sıcak tabloya bakar.
+#
+#   python -m modules.archive status
+#   python -m modules.archive run --days 365 --batch 5000
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get("AKYURT_ARCHIVE_DAYS", "365"))
+BATCH_SIZE = 5000
+COLUMNS = "id, book_id, member_id, issue_date, due_date, return_date, status"
+
+
+def _horizon(days):
+    return f"-{int(days)} days"
+
+
+def pending(days=ARCHIVE_AFTER_DAYS):
+    # Arşivlenmeyi bekleyen kayıt sayısı (idx_transactions_done_return üzerinde aralık)
+    return db.fetch_value("""
+        SELECT COUNT(*) FROM transactions
+        WHERE status = 'Tamamlandı' AND return_date < DATE('now', ?)
+    """, (_horizon(days),), default=0)
+
+
+def status():
+    hot_total, hot_active = db.fetch_one("SELECT COUNT(*), coalesce(SUM(status = 'Aktif'), 0) FROM transactions")
+    cold_total, cold_oldest, cold_newest = db.fetch_one(
+        "SELECT COUNT(*), MIN(return_date), MAX(return_date) FROM transactions_archive")
+    return {"hot": hot_total, "hot_active": hot_active, "cold": cold_total,
+            "cold_oldest": cold_oldest, "cold_newest": cold_newest}
+
+
+@db.retry_on_busy
+def _archive_batch(days, batch_size):
+    # Bir parti: seç, kopyala, sil — hepsi tek işlemde. Dönüş: taşınan sayı
+    with db.transaction(immediate=True) as conn:
+        ids = [row[0] for row in conn.execute("""
+            SELECT id FROM transactions
+            WHERE status = 'Tamamlandı' AND return_date < DATE('now', ?)
+            ORDER BY return_date LIMIT ?
+        """, (_horizon(days), int(batch_size))).fetchall()]
+        if not ids: return 0
+        id_list = json.dumps(ids)
+        conn.execute(f"""
+            INSERT INTO transactions_archive ({COLUMNS})
+            SELECT {COLUMNS} FROM transactions WHERE id IN (SELECT value FROM json_each(?))
+        """, (id_list,))
+        conn.execute("DELETE FROM transactions WHERE id IN (SELECT value FROM json_each(?))", (id_list,))
+    return len(ids)
+
+
+def run(days=ARCHIVE_AFTER_DAYS, batch_size=BATCH_SIZE, pause=0.0, max_batches=None, progress=None):
+    # Bekleyenleri parti parti taşır. pause: partiler arası bekleme (sn), yoğun
+    # saatlerde masalara nefes aldırmak için. Dönüş: rapor sözlüğü
+    start = time.perf_counter()
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = _archive_batch(days, batch_size)
+        if not count: break
+        moved += count
+        batches += 1
+        if progress: progress(moved, time.perf_counter() - start)
+        if count < batch_size: break
+        if pause: time.sleep(pause)
+    if moved:
+        # Planlayıcı istatistikleri yeni tablo boyutlarına göre güncellensin
+        with db.connection() as conn:
+            conn.execute("PRAGMA optimize")
+    return {"moved": moved, "batches": batches, "seconds": time.perf_counter() - start}
+
+
+def member_history_count(member_id):
+    return db.fetch_value("SELECT COUNT(*) FROM loan_history WHERE member_id = ?", (member_id,), default=0)
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eski tamamlanmış ödünçleri arşiv tablosuna taşır.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Sıcak / soğuk kayıt sayıları")
+    run_cmd = sub.add_parser("run", help="Arşivlemeyi çalıştır")
+    run_cmd.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                         help="Bu günden daha önce iade edilmişler taşınır")
+    run_cmd.add_argument("--batch", type=int, default=BATCH_SIZE, help="Parti (işlem) başına kayıt")
+    run_cmd.add_argument("--pause", type=float, default=0.0, help="Partiler arası bekleme (sn)")
+    run_cmd.add_argument("--dry-run", action="store_true", help="Sadece taşınacak sayıyı göster")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        info = status()
+        print(f"Sıcak (transactions):  {info['hot']:,} kayıt, {info['hot_active']:,} aktif")
+        print(f"Soğuk (arşiv):         {info['cold']:,} kayıt"
+              + (f", iade {info['cold_oldest']} – {info['cold_newest']}" if info["cold"] else ""))
+        print(f"Arşivlenmeyi bekleyen: {pending():,} ({ARCHIVE_AFTER_DAYS} günden eski)")
+        return 0
+
+    waiting = pending(args.days)
+    print(f"Taşınacak: {waiting:,} kayıt ({args.days} günden eski iadeler)", file=sys.stderr)
+    if args.dry_run or not waiting:
+        return 0
+
+    def progress(moved, seconds):
+        print(f"\r  {moved:,} / {waiting:,}  ({moved / max(seconds, 1e-9):,.0f} kayıt/sn)",
+              end="", file=sys.stderr, flush=True)
+
+    report = run(args.days, args.batch, args.pause, progress=progress)
+    print(file=sys.stderr)
+    print(f"✅ {report['moved']:,} kayıt {report['batches']} partide arşivlendi ({report['seconds']:.1f} sn)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
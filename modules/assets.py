@@ -0,0 +1,42 @@
+import base64
+import mimetypes
+import os
+import re
+from functools import lru_cache
+
+# --- STATİK VARLIKLAR (SÜREÇ BAŞINA BİR KEZ) ---
+# app.py her rerun'da baştan çalışır; logo dosyasını okuyup base64'e çevirmek ve
+# CSS bloğunu hazırlamak her seferinde tekrarlanmasın diye sonuçlar bu modülde
+# (süreç boyunca yaşayan) önbellekte tutulur. Dosya değişirse (mtime) yeniden okunur.
+
+
+def image_data_uri(path):
+    # Dosya yoksa "" (çağıran yazıyla yetinir)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ""
+    return _encode_file(path, mtime)
+
+
+@lru_cache(maxsize=16)
+def _encode_file(path, mtime):
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};:,>])\s*")
+
+
+@lru_cache(maxsize=16)
+def minify_css(markup):
+    # <style> blokları her rerun'da tarayıcıya yeniden gönderilir: yorumlar ve
+    # gereksiz boşluklar bir kez atılır (içerik aynı kalır)
+    def shrink(match):
+        css = _CSS_COMMENT.sub("", match.group(1))
+        css = _CSS_SPACE.sub(r"\1", " ".join(css.split()))
+        return f"<style>{css}</style>"
+
+    return re.sub(r"<style>(.*?)</style>", shrink, markup, flags=re.S).strip()
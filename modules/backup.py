@@ -0,0 +1,271 @@
+import argparse
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from modules import db_manager as db
+
+# --- ÇEVRİMİÇİ YEDEK (ANLIK GÖRÜNTÜ) ---
+# library.db uygulama çalışırken kopyalanırsa yarım yazılmış sayfalar veya WAL'da
+# kalmış işlemler kopyaya girmeyebilir. Yedek, SQLite'ın çevrimiçi yedek API'si
+# (sqlite3.Connection.backup) ile küçük adımlar halinde alınır:
+#   * Kaynak bağlantı yedek boyunca tek bir okuma işlemi açık tutar. WAL'da
+#     okuyucu yazıcıyı beklemez, masalar durmaz; kopya da yedeğin başladığı ana
+#     ait tutarlı bir görüntü olur. (İşlem açık tutulmazsa başka bağlantının her
+#     commit'i yedeği baştan başlatır; yoğun saatte yedek hiç bitmeyebilir.)
+#   * Yedek sürerken WAL, okuma noktasının ötesine checkpoint edilemediği için
+#     büyür; yedek bitince ilk checkpoint'te geri kazanılır.
+#   * Kopya PRAGMA integrity_check ile doğrulanır, gzip ile sıkıştırılır; en yeni
+#     BACKUP_KEEP anlık görüntü tutulur, eskiler silinir.
+#
+#   python -m modules.backup snapshot
+#   python -m modules.backup list
+#   python -m modules.backup restore backups/akyurt-20261018-0300.db.gz --yes
+
+BACKUP_DIR = os.environ.get("AKYURT_BACKUP_DIR", "backups")
+BACKUP_KEEP = int(os.environ.get("AKYURT_BACKUP_KEEP", "7"))
+PAGES_PER_STEP = 4096  # 4 KB sayfayla adım başına ~16 MB
+PREFIX = "akyurt-"
+SUFFIX = ".db.gz"
+COPY_CHUNK = 1 << 20
+# gzip 1: 1M fikstürde 6'ya göre 3,7 kat hızlı, dosya %14 büyük. Sıkıştırma masalarla
+# aynı işlemciyi paylaşır; kısa sürmesi küçük dosyadan önemli.
+COMPRESS_LEVEL = 1
+# Doğrulama bağlantısı: büyük sayfa önbelleği + mmap (1M fikstürde 9,7 sn → 6,2 sn)
+CHECK_PRAGMAS = ("PRAGMA cache_size=-262144", "PRAGMA mmap_size=1073741824")
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+def _open(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={db.BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def integrity_check(path, quick=False):
+    # Dönüş: sorun listesi (boş = sağlam). quick: indeks / tablo çaprazlaması yok (~10 kat hızlı)
+    conn = _open(path)
+    try:
+        for pragma in CHECK_PRAGMAS:
+            conn.execute(pragma)
+        rows = [row[0] for row in conn.execute("PRAGMA quick_check" if quick else "PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as exc:
+        return [str(exc)]
+    finally:
+        conn.close()
+    return [] if rows == ["ok"] else rows
+
+
+def _copy_online(source_path, target_path, pages, pause, progress):
+    # Dönüş: (adım sayısı, toplam sayfa)
+    steps = [0, 0]
+
+    def on_step(status, remaining, total):
+        steps[0] += 1
+        steps[1] = total
+        if progress: progress(total - remaining, total)
+        if pause and remaining: time.sleep(pause)
+
+    source = _open(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        # Okuma işlemi: backup() bunu kullanır, adımlar arasında bırakmaz
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_schema").fetchone()
+        source.backup(target, pages=pages, progress=on_step)
+        source.execute("COMMIT")
+        # Anlık görüntü tek dosya olsun (-wal / -shm gerekmesin)
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    return steps[0], steps[1]
+
+
+def _gzip(source_path, target_path, level):
+    with open(source_path, "rb") as src, gzip.open(target_path, "wb", compresslevel=level) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+
+
+def _gunzip(source_path, target_path):
+    opener = gzip.open if source_path.endswith(".gz") else open
+    with opener(source_path, "rb") as src, open(target_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+
+
+def snapshots(directory=BACKUP_DIR):
+    # Yeniden eskiye (aynı saniyede alınmış etiketli görüntüler için dosya zamanına göre)
+    return sorted(glob.glob(os.path.join(directory, f"{PREFIX}*{SUFFIX}")), key=os.path.getmtime, reverse=True)
+
+
+def rotate(directory=BACKUP_DIR, keep=BACKUP_KEEP):
+    removed = snapshots(directory)[max(keep, 1):]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def snapshot(directory=BACKUP_DIR, keep=BACKUP_KEEP, pages=PAGES_PER_STEP, pause=0.0,
+             source_path=None, label="", quick=False, level=COMPRESS_LEVEL, progress=None):
+    # Dönüş: rapor sözlüğü. Doğrulanamayan kopya saklanmaz (BackupError)
+    source_path = source_path or db.DB_PATH
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{PREFIX}{stamp}{'-' + label if label else ''}"
+    raw_path = os.path.join(directory, name + ".db.tmp")
+    final_path = os.path.join(directory, name + SUFFIX)
+    report = {"path": final_path}
+    start = time.perf_counter()
+    try:
+        report["steps"], report["pages"] = _copy_online(source_path, raw_path, pages, pause, progress)
+        report["copy_seconds"] = time.perf_counter() - start
+
+        mark = time.perf_counter()
+        problems = integrity_check(raw_path, quick)
+        report["check_seconds"] = time.perf_counter() - mark
+        if problems:
+            raise BackupError(f"Kopya doğrulanamadı: {problems[0]}")
+
+        mark = time.perf_counter()
+        report["db_bytes"] = os.path.getsize(raw_path)
+        _gzip(raw_path, final_path + ".tmp", level)
+        os.replace(final_path + ".tmp", final_path)
+        report["gz_bytes"] = os.path.getsize(final_path)
+        report["compress_seconds"] = time.perf_counter() - mark
+    finally:
+        for leftover in (raw_path, final_path + ".tmp"):
+            if os.path.exists(leftover): os.remove(leftover)
+    report["removed"] = rotate(directory, keep)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def verify(path):
+    # Sıkıştırılmış anlık görüntüyü geçici dosyaya açıp doğrular
+    tmp_path = path + ".verify.tmp"
+    try:
+        _gunzip(path, tmp_path)
+        return integrity_check(tmp_path)
+    except (OSError, EOFError) as exc:
+        return [f"Dosya okunamadı: {exc}"]
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+
+def restore(path, target_path=None, safety=True, directory=BACKUP_DIR):
+    # Anlık görüntüyü çalışan veritabanının üzerine yazar. Dosya değiştirilmez,
+    # yedek API'si hedefe sayfa sayfa yazar: açık bağlantılar (diğer süreçler)
+    # geri yüklenen içeriği sonraki okumalarında görür.
+    # safety: önce mevcut veritabanının anlık görüntüsü alınır ("-pre-restore").
+    target_path = target_path or db.DB_PATH
+    report = {"safety": None}
+    start = time.perf_counter()
+    tmp_path = os.path.join(os.path.dirname(os.path.abspath(target_path)),
+                            f".{os.path.basename(target_path)}.restore.tmp")
+    try:
+        try:
+            _gunzip(path, tmp_path)
+        except (OSError, EOFError) as exc:
+            raise BackupError(f"Anlık görüntü okunamadı: {exc}")
+        problems = integrity_check(tmp_path)
+        if problems:
+            raise BackupError(f"Anlık görüntü bozuk: {problems[0]}")
+        if safety and os.path.exists(target_path):
+            # Döndürme bu anlık görüntü için eskileri silmez
+            report["safety"] = snapshot(directory, keep=len(snapshots(directory)) + 1,
+                                        source_path=target_path, label="pre-restore")["path"]
+        source = _open(tmp_path)
+        target = _open(target_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+    if os.path.abspath(target_path) == os.path.abspath(db.DB_PATH):
+        # Havuz bağlantıları yeni içeriği görsün; eski bir şema sürümü geri
+        # yüklendiyse göçler havuz yeniden açılırken uygulanır
+        db.reset_pool()
+        db.bump_write_generation()
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+# --- KOMUT SATIRI ---
+def _mb(size):
+    return f"{size / 1e6:,.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çevrimiçi yedek: anlık görüntü, doğrulama, geri yükleme.")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="Anlık görüntü klasörü")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="Anlık görüntü al (uygulama çalışırken)")
+    snap.add_argument("--keep", type=int, default=BACKUP_KEEP, help="Saklanacak anlık görüntü sayısı")
+    snap.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="Adım başına kopyalanan sayfa")
+    snap.add_argument("--pause", type=float, default=0.0, help="Adımlar arası bekleme (sn), disk yükü için")
+    snap.add_argument("--quick", action="store_true", help="integrity_check yerine quick_check")
+    snap.add_argument("--level", type=int, default=COMPRESS_LEVEL, help="gzip seviyesi (1-9)")
+    sub.add_parser("list", help="Anlık görüntüleri listele")
+    check = sub.add_parser("verify", help="Anlık görüntüyü doğrula")
+    check.add_argument("path")
+    back = sub.add_parser("restore", help="Anlık görüntüyü geri yükle")
+    back.add_argument("path")
+    back.add_argument("--no-safety", action="store_true", help="Önce mevcut veritabanının yedeğini alma")
+    back.add_argument("--yes", action="store_true", help="Onay: mevcut veriler anlık görüntüyle değişir")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for path in snapshots(args.dir):
+            print(f"{path}  {_mb(os.path.getsize(path))}")
+        return 0
+
+    if args.command == "verify":
+        problems = verify(args.path)
+        for problem in problems[:20]:
+            print(f"❌ {problem}", file=sys.stderr)
+        if not problems:
+            print(f"✅ {args.path}: integrity_check ok", file=sys.stderr)
+        return 1 if problems else 0
+
+    try:
+        if args.command == "restore":
+            if not args.yes:
+                print(f"{db.DB_PATH} içeriği {args.path} ile değiştirilecek; onay için --yes ekleyin.",
+                      file=sys.stderr)
+                return 1
+            report = restore(args.path, safety=not args.no_safety, directory=args.dir)
+            if report["safety"]:
+                print(f"Önceki hali: {report['safety']}", file=sys.stderr)
+            print(f"✅ {args.path} → {db.DB_PATH} ({report['seconds']:.1f} sn)", file=sys.stderr)
+            return 0
+
+        def progress(done, total):
+            print(f"\r  {done:,} / {total:,} sayfa", end="", file=sys.stderr, flush=True)
+
+        report = snapshot(args.dir, args.keep, args.pages, args.pause, quick=args.quick, level=args.level,
+                          progress=progress)
+    except BackupError as exc:
+        print(f"\n❌ {exc}", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(f"✅ {report['path']}: {_mb(report['db_bytes'])} → {_mb(report['gz_bytes'])}  "
+          f"kopya {report['copy_seconds']:.1f} sn ({report['steps']} adım), "
+          f"doğrulama {report['check_seconds']:.1f} sn, sıkıştırma {report['compress_seconds']:.1f} sn",
+          file=sys.stderr)
+    for path in report["removed"]:
+        print(f"  silindi: {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,545 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from modules import db_manager as db
+from modules import migrations
+from modules import reservation_queue as rq
+from modules import stats
+from modules.search import BM25_WEIGHTS, SEARCH_LIMIT, build_match, fold_tr
+
+# --- ŞUBELER (ÇOK ŞUBELİ KULLANIM) ---
+# Her okuma salonu kendi library.db dosyasıyla çalışır (yerel hız, ağ kesilse de
+# masa durmaz). Diğer şubelerin dosyaları AKYURT_BRANCHES ile tanıtılır:
+#   AKYURT_BRANCH=Merkez
+#   AKYURT_BRANCHES="Merkez=library.db,Yeşiltepe=/srv/yesiltepe/library.db"
+# Yerel şube her zaman db_manager.DB_PATH'tir (havuzu uygulamayla ortaktır).
+#
+# Ortak sorgular (katalog arama, üye arama, üyenin ödünçleri, gösterge toplamları)
+# ATTACH ile tek bağlantıda değil, şube başına ayrı havuzdan paralel iş
+# parçacıklarında çalışır: ATTACH'lı UNION ALL şubeleri tek tek sırayla okur
+# (süre = toplam), sqlite3 ise sorgu çalışırken GIL'i bıraktığı için paralel
+# okuma en yavaş şube kadar sürer. Sonuçlar Python'da birleştirilir; ulaşılamayan
+# veya BRANCH_TIMEOUT_S içinde yanıt vermeyen şube sonucu bozmaz, hata olarak
+# raporlanır.
+#
+# Transfer (kitabın başka şubeye gönderilmesi) iki dosyaya yazar; WAL'da ATTACH'lı
+# işlem bile dosyalar arasında atomik değildir. Bu yüzden adımlar ayrı işlemlerdir
+# ve her transferin iki şubede ortak bir anahtarı vardır (transfers.transfer_key):
+#   gönder:     kaynak kitap 'Transferde' + 'Giden' satırı  ->  hedefte 'Gelen' satırı
+#   teslim al:  hedefte kitap eklenir (+ talep eden üyeye ayrılır)  ->  kaynaktaki kitap silinir
+#   iptal:      önce hedef satırı kapatılır (teslimle yarışı hedef kazanır)  ->  kaynakta kitap rafa döner
+# İkinci adım yarıda kalırsa (şube kapalı, ağ yok) sync() eksik tarafı tamamlar.
+#
+#   python -m modules.branches list
+#   python -m modules.branches search "kürk mantolu"
+#   python -m modules.branches sync
+
+LOCAL_BRANCH = os.environ.get("AKYURT_BRANCH", "Merkez")
+BRANCH_POOL_SIZE = 4
+BRANCH_WORKERS = int(os.environ.get("AKYURT_BRANCH_WORKERS", "8"))
+BRANCH_TIMEOUT_S = float(os.environ.get("AKYURT_BRANCH_TIMEOUT", "5"))
+MEMBER_LIMIT = 20
+
+OUTGOING = 'Giden'
+INCOMING = 'Gelen'
+IN_TRANSIT = 'Yolda'
+RECEIVED = 'Teslim Alındı'
+CANCELLED = 'İptal'
+
+
+class BranchError(RuntimeError):
+    pass
+
+
+def _parse(spec):
+    # "Ad=yol,Ad2=yol2" -> {ad: yol}
+    result = {}
+    for item in (spec or "").split(","):
+        if not item.strip(): continue
+        name, sep, path = item.partition("=")
+        if not sep or not name.strip() or not path.strip():
+            raise BranchError(f"Geçersiz şube tanımı: '{item.strip()}' (beklenen: Ad=yol)")
+        result[name.strip()] = path.strip()
+    return result
+
+
+_configured = _parse(os.environ.get("AKYURT_BRANCHES", ""))
+
+
+def branches():
+    # {şube adı: veritabanı yolu}; yerel şube ilk sırada
+    result = {LOCAL_BRANCH: db.DB_PATH}
+    result.update((name, path) for name, path in _configured.items() if name != LOCAL_BRANCH)
+    return result
+
+
+def enabled():
+    return len(branches()) > 1
+
+
+def configure(paths, local=None):
+    # Benchmark / test: şube listesini değiştirir (yerel şubenin yolu db.DB_PATH'ten gelir)
+    global _configured, LOCAL_BRANCH
+    reset()
+    _configured = dict(paths)
+    if local is not None:
+        LOCAL_BRANCH = local
+
+
+# --- ŞUBE HAVUZLARI ---
+_pools = {}
+_pools_lock = threading.Lock()
+_executor = None
+
+
+def _pool(name):
+    if name == LOCAL_BRANCH:
+        return db.get_pool()
+    path = branches().get(name)
+    if path is None:
+        raise BranchError(f"Tanımsız şube: {name}")
+    pool = _pools.get(name)
+    if pool is not None and pool.pid == os.getpid() and pool.path == path:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None or pool.pid != os.getpid() or pool.path != path:
+            # sqlite3.connect olmayan dosyayı boş veritabanı olarak yaratırdı
+            if not os.path.exists(path):
+                raise BranchError(f"veritabanı bulunamadı ({path})")
+            pool = db.ConnectionPool(path, BRANCH_POOL_SIZE)
+            conn = pool.acquire()
+            try:
+                migrations.migrate(conn)
+            finally:
+                pool.release(conn)
+            _pools[name] = pool
+        return pool
+
+
+def reset():
+    global _executor
+    with _pools_lock:
+        for pool in _pools.values():
+            if pool.pid == os.getpid():
+                pool.close_all()
+        _pools.clear()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+@contextmanager
+def connection(name):
+    pool = _pool(name)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(name, immediate=False):
+    # db.transaction ile aynı; yerel şubede doğrudan onu kullanır (yazma sayacı artsın)
+    if name == LOCAL_BRANCH:
+        with db.transaction(immediate=immediate) as conn:
+            yield conn
+        return
+    with connection(name) as conn:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+
+# --- PARALEL (FEDERE) OKUMA ---
+def _get_executor():
+    global _executor
+    with _pools_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BRANCH_WORKERS, thread_name_prefix="akyurt-branch")
+        return _executor
+
+
+def federate(func, names=None, timeout=BRANCH_TIMEOUT_S):
+    # func(conn) her şubede (names: sadece bu şubelerde) ayrı iş parçacığında çalışır.
+    # Dönüş: ({şube: sonuç}, {şube: hata mesajı}); sözlükler şube sırasıyla
+    names = list(names or branches())
+
+    def run(name):
+        with connection(name) as conn:
+            return func(conn)
+
+    futures = {name: _get_executor().submit(run, name) for name in names}
+    wait(futures.values(), timeout=timeout)
+    results, errors = {}, {}
+    for name, future in futures.items():
+        if not future.done():
+            errors[name] = f"{timeout:g} sn içinde yanıt yok"
+            continue
+        try:
+            results[name] = future.result()
+        except (sqlite3.Error, BranchError) as exc:
+            errors[name] = str(exc)
+    return results, errors
+
+
+def kpis(names=None):
+    # Dönüş: ({şube: (kitap, üye, ödünçteki, geciken)}, toplam demeti, hatalar)
+    results, errors = federate(lambda conn: tuple(conn.execute(stats.KPI_SQL).fetchone() or (0, 0, 0, 0)), names)
+    total = tuple(sum(values) for values in zip(*results.values())) if results else (0, 0, 0, 0)
+    return results, total, errors
+
+
+def search_books(text, limit=SEARCH_LIMIT, names=None):
+    # Dönüş: ([(şube, id, eser, yazar, raf, durum)], hatalar); bm25 sırasıyla birleştirilir
+    match = build_match(text)
+    if match is None:
+        return [], {}
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+
+    def query(conn):
+        return conn.execute(f"""
+            SELECT b.id, b.title, b.author, b.location, b.status, bm25(books_fts, {weights})
+            FROM books_fts f
+            JOIN books b ON b.id = f.rowid
+            WHERE books_fts MATCH ?
+            ORDER BY bm25(books_fts, {weights})
+            LIMIT ?
+        """, (match, int(limit))).fetchall()
+
+    results, errors = federate(query, names)
+    rows = [(name,) + tuple(row) for name, part in results.items() for row in part]
+    rows.sort(key=lambda row: row[-1])
+    return [row[:-1] for row in rows[:limit]], errors
+
+
+def find_members(text, limit=MEMBER_LIMIT, names=None):
+    # lookup.find_members ile aynı arama (ad öneki, üye no / telefon öneki), her şubede.
+    # Dönüş: ([(şube, id, ad, telefon)], hatalar)
+    text = (text or "").strip()
+    if not text:
+        return [], {}
+    if text.isdigit():
+        sql = "SELECT id, name, phone FROM members WHERE id = ? OR (phone >= ? AND phone < ?) ORDER BY id LIMIT ?"
+        params = (int(text), text, text + "\uffff", int(limit))
+    else:
+        key = fold_tr(text)
+        sql = "SELECT id, name, phone FROM members WHERE name_key >= ? AND name_key < ? ORDER BY id LIMIT ?"
+        params = (key, key + "\uffff", int(limit))
+    results, errors = federate(lambda conn: conn.execute(sql, params).fetchall(), names)
+    return [(name,) + tuple(row) for name, part in results.items() for row in part], errors
+
+
+def member_loans(phone, names=None):
+    # Aynı telefonla kayıtlı üyenin tüm şubelerdeki aktif ödünçleri (idx_members_phone).
+    # Dönüş: ([(şube, üye, eser, veriliş, teslim, gecikme günü)], hatalar)
+    def query(conn):
+        return conn.execute("""
+            SELECT m.name, b.title, t.issue_date, t.due_date,
+                   max(CAST(julianday('now') - julianday(t.due_date) AS INTEGER), 0)
+            FROM members m
+            JOIN transactions t ON t.member_id = m.id AND t.status = 'Aktif'
+            JOIN books b ON b.id = t.book_id
+            WHERE m.phone = ?
+            ORDER BY t.due_date
+        """, (phone,)).fetchall()
+
+    results, errors = federate(query, names)
+    return [(name,) + tuple(row) for name, part in results.items() for row in part], errors
+
+
+# --- TRANSFER ---
+def _check_pair(source, target):
+    known = branches()
+    for name in (source, target):
+        if name not in known:
+            raise BranchError(f"Tanımsız şube: {name}")
+    if source == target:
+        raise BranchError("Kaynak ve hedef şube aynı.")
+
+
+@db.retry_on_busy
+def _push(source, key):
+    # Kaynaktaki 'Giden' satırını hedefe 'Gelen' olarak yazar (varsa dokunmaz)
+    with connection(source) as conn:
+        row = conn.execute("""
+            SELECT peer, title, author, isbn, hold_member_id FROM transfers
+            WHERE transfer_key = ? AND direction = ?
+        """, (key, OUTGOING)).fetchone()
+    if row is None: return False
+    target, title, author, isbn, hold_member_id = row
+    with transaction(target) as conn:
+        return conn.execute("""
+            INSERT OR IGNORE INTO transfers (transfer_key, direction, peer, title, author, isbn, hold_member_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (key, INCOMING, source, title, author, isbn, hold_member_id)).rowcount > 0
+
+
+@db.retry_on_busy
+def _settle(source, key, outcome):
+    # Kaynak tarafı kapatır: teslim alındıysa kitap silinir, iptalse rafa (veya sırasına) döner
+    with transaction(source, immediate=True) as conn:
+        row = conn.execute("""
+            SELECT t.book_id, b.status FROM transfers t
+            LEFT JOIN books b ON b.id = t.book_id
+            WHERE t.transfer_key = ? AND t.direction = ? AND t.status = ?
+        """, (key, OUTGOING, IN_TRANSIT)).fetchone()
+        if row is None: return False
+        book_id, status = row
+        if status == rq.BOOK_IN_TRANSIT:
+            if outcome == RECEIVED:
+                conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+            else:
+                rq.hand_off(conn, [book_id])
+        conn.execute("""
+            UPDATE transfers SET status = ?, closed_at = CURRENT_TIMESTAMP
+            WHERE transfer_key = ? AND direction = ?
+        """, (outcome, key, OUTGOING))
+    return True
+
+
+@db.retry_on_busy
+def _start(source, target, book_id, hold_member_id):
+    with transaction(source, immediate=True) as conn:
+        row = conn.execute("SELECT title, author, isbn, status FROM books WHERE id = ?", (book_id,)).fetchone()
+        if row is None:
+            return None, "Kitap bulunamadı."
+        title, author, isbn, status = row
+        # 'Müsait' kitabın sırası yoktur (rezervasyon sadece ödünçteki / ayrılmış kitaba alınır)
+        if status != rq.BOOK_AVAILABLE:
+            return None, f"Kitap şu an {status}; gönderilemez."
+        key = uuid.uuid4().hex
+        conn.execute("UPDATE books SET status = ? WHERE id = ?", (rq.BOOK_IN_TRANSIT, book_id))
+        conn.execute("""
+            INSERT INTO transfers (transfer_key, direction, peer, book_id, title, author, isbn, hold_member_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (key, OUTGOING, target, book_id, title, author, isbn, hold_member_id))
+    return key, title
+
+
+def send(book_id, target, source=None, hold_member_id=None):
+    # Kitabı başka şubeye gönderir. hold_member_id: hedef şubedeki üye (kitap gelince ona ayrılır).
+    # Dönüş: (başarılı mı, mesaj)
+    source = source or LOCAL_BRANCH
+    try:
+        _check_pair(source, target)
+    except BranchError as exc:
+        return False, str(exc)
+    try:
+        key, title = _start(source, target, int(book_id), hold_member_id)
+    except (sqlite3.Error, BranchError) as exc:
+        return False, f"{source}: {exc}"
+    if key is None:
+        return False, title
+    try:
+        _push(source, key)
+    except (sqlite3.Error, BranchError) as exc:
+        return True, f"'{title}' {target} şubesine yola çıktı; karşı kayıt yazılamadı ({exc}), sync tamamlayacak."
+    return True, f"'{title}' {target} şubesine yola çıktı."
+
+
+def request_copy(source, book_id, member_id):
+    # Şubeler arası talep: başka şubedeki müsait kopya bu şubeye, üyeye ayrılmak üzere gönderilir
+    return send(book_id, LOCAL_BRANCH, source=source, hold_member_id=member_id)
+
+
+@db.retry_on_busy
+def _receive(target, key, location):
+    with transaction(target, immediate=True) as conn:
+        row = conn.execute("""
+            SELECT peer, title, author, isbn, hold_member_id, status FROM transfers
+            WHERE transfer_key = ? AND direction = ?
+        """, (key, INCOMING)).fetchone()
+        if row is None:
+            return None, "Transfer bulunamadı.", []
+        source, title, author, isbn, hold_member_id, status = row
+        if status != IN_TRANSIT:
+            return None, f"Transfer zaten {status}.", []
+        book_id = conn.execute("INSERT INTO books (title, author, isbn, location) VALUES (?, ?, ?, ?)",
+                               (title, author, isbn, location or None)).lastrowid
+        held = []
+        member = conn.execute("SELECT 1 FROM members WHERE id = ?", (hold_member_id,)).fetchone() \
+            if hold_member_id else None
+        if member:
+            conn.execute("INSERT INTO reservations (book_id, member_id, request_date) VALUES (?, ?, DATE('now'))",
+                         (book_id, hold_member_id))
+            held = rq.hand_off(conn, [book_id])
+        conn.execute("""
+            UPDATE transfers SET status = ?, book_id = ?, closed_at = CURRENT_TIMESTAMP
+            WHERE transfer_key = ? AND direction = ?
+        """, (RECEIVED, book_id, key, INCOMING))
+    return source, title, held
+
+
+def receive(key, location="", target=None):
+    # Gelen kitabı kataloğa ekler. Dönüş: (başarılı mı, mesaj)
+    target = target or LOCAL_BRANCH
+    try:
+        source, title, held = _receive(target, key, location)
+    except (sqlite3.Error, BranchError) as exc:
+        return False, f"{target}: {exc}"
+    if source is None:
+        return False, title
+    message = f"'{title}' teslim alındı."
+    for held_title, name, phone, hold_until in held:
+        message += f" {name} ({phone}) adına ayrıldı, son alma {hold_until}."
+    try:
+        _settle(source, key, RECEIVED)
+    except (sqlite3.Error, BranchError) as exc:
+        message += f" {source} kaydı kapatılamadı ({exc}), sync tamamlayacak."
+    return True, message
+
+
+@db.retry_on_busy
+def _cancel_target(target, key, source, row):
+    # Hedef satırı 'Yolda' ise kapatır; hiç yazılmamışsa iptal kaydı bırakır (sync tekrar göndermesin)
+    with transaction(target, immediate=True) as conn:
+        status = conn.execute("SELECT status FROM transfers WHERE transfer_key = ? AND direction = ?",
+                              (key, INCOMING)).fetchone()
+        if status is None:
+            conn.execute("""
+                INSERT INTO transfers (transfer_key, direction, peer, title, author, isbn, status, closed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (key, INCOMING, source) + tuple(row) + (CANCELLED,))
+            return None
+        if status[0] != IN_TRANSIT:
+            return status[0]
+        conn.execute("""
+            UPDATE transfers SET status = ?, closed_at = CURRENT_TIMESTAMP
+            WHERE transfer_key = ? AND direction = ?
+        """, (CANCELLED, key, INCOMING))
+    return None
+
+
+def cancel(key, source=None):
+    # Yoldaki transferi kaynak şubeden iptal eder. Dönüş: (başarılı mı, mesaj)
+    source = source or LOCAL_BRANCH
+    try:
+        with connection(source) as conn:
+            row = conn.execute("""
+                SELECT peer, title, author, isbn, status FROM transfers WHERE transfer_key = ? AND direction = ?
+            """, (key, OUTGOING)).fetchone()
+        if row is None:
+            return False, "Transfer bulunamadı."
+        target, title, author, isbn, status = row
+        if status != IN_TRANSIT:
+            return False, f"Transfer zaten {status}."
+        closed = _cancel_target(target, key, source, (title, author, isbn))
+        if closed == RECEIVED:
+            # Hedef teslim almış: kaynak tarafı iptal değil teslim olarak kapanır
+            _settle(source, key, RECEIVED)
+            return False, f"'{title}' {target} şubesinde teslim alınmış; iptal edilemez."
+        _settle(source, key, CANCELLED)
+    except (sqlite3.Error, BranchError) as exc:
+        return False, f"İptal edilemedi: {exc}"
+    return True, f"'{title}' transferi iptal edildi, kitap rafa döndü."
+
+
+def transfers(name=None, status=IN_TRANSIT, limit=200):
+    # Bir şubenin transferleri (varsayılan: yoldakiler, yeniden eskiye).
+    # Satırlar: (anahtar, yön, karşı şube, eser, yazar, talep eden üye, tarih, durum)
+    with connection(name or LOCAL_BRANCH) as conn:
+        return conn.execute("""
+            SELECT t.transfer_key, t.direction, t.peer, t.title, t.author,
+                   CASE WHEN t.direction = 'Gelen' THEN m.name END, t.created_at, t.status
+            FROM transfers t
+            LEFT JOIN members m ON m.id = t.hold_member_id
+            WHERE ? IS NULL OR t.status = ?
+            ORDER BY t.id DESC LIMIT ?
+        """, (status, status, int(limit))).fetchall()
+
+
+def sync():
+    # Yarıda kalmış transferleri tamamlar: hedefe yazılmamış 'Giden' satırlarını gönderir,
+    # hedefte kapanmış olanların kaynak tarafını kapatır. Dönüş: sayaçlar + hatalar
+    report = {"pushed": 0, "received": 0, "cancelled": 0, "errors": {}}
+    for source in branches():
+        try:
+            with connection(source) as conn:
+                open_rows = conn.execute("SELECT transfer_key, peer FROM transfers WHERE direction = ? AND status = ?",
+                                         (OUTGOING, IN_TRANSIT)).fetchall()
+        except (sqlite3.Error, BranchError) as exc:
+            report["errors"][source] = str(exc)
+            continue
+        by_target = {}
+        for key, target in open_rows:
+            by_target.setdefault(target, []).append(key)
+        for target, keys in by_target.items():
+            try:
+                with connection(target) as conn:
+                    remote = dict(conn.execute("""
+                        SELECT transfer_key, status FROM transfers
+                        WHERE direction = ? AND transfer_key IN (SELECT value FROM json_each(?))
+                    """, (INCOMING, json.dumps(keys))).fetchall())
+                for key in keys:
+                    status = remote.get(key)
+                    if status is None:
+                        report["pushed"] += _push(source, key)
+                    elif status == RECEIVED:
+                        report["received"] += _settle(source, key, RECEIVED)
+                    elif status == CANCELLED:
+                        report["cancelled"] += _settle(source, key, CANCELLED)
+            except (sqlite3.Error, BranchError) as exc:
+                report["errors"][target] = str(exc)
+    return report
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Şubeler arası arama, toplamlar ve transfer eşitleme.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Şubeler ve gösterge toplamları")
+    p_search = sub.add_parser("search", help="Tüm şubelerde katalog araması")
+    p_search.add_argument("text")
+    p_search.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    p_member = sub.add_parser("member", help="Üyenin (telefon) tüm şubelerdeki aktif ödünçleri")
+    p_member.add_argument("phone")
+    sub.add_parser("transfers", help="Bu şubenin yoldaki transferleri")
+    sub.add_parser("sync", help="Yarıda kalmış transferleri tamamla")
+    args = parser.parse_args(argv)
+
+    errors = {}
+    if args.command == "list":
+        per_branch, total, errors = kpis()
+        paths = branches()
+        print(f"{'Şube':<16} {'Kitap':>10} {'Üye':>9} {'Ödünçte':>9} {'Geciken':>9}  Yol")
+        for name, values in per_branch.items():
+            print(f"{name:<16} {values[0]:>10,} {values[1]:>9,} {values[2]:>9,} {values[3]:>9,}  {paths[name]}")
+        print(f"{'TOPLAM':<16} {total[0]:>10,} {total[1]:>9,} {total[2]:>9,} {total[3]:>9,}")
+    elif args.command == "search":
+        rows, errors = search_books(args.text, args.limit)
+        for name, book_id, title, author, location, status in rows:
+            print(f"{name:<14} #{book_id:<7} {title} — {author} [{location or '-'}] {status}")
+    elif args.command == "member":
+        rows, errors = member_loans(args.phone)
+        for name, member, title, issued, due, late in rows:
+            print(f"{name:<14} {member}: {title} (teslim {due}{f', {late} gün gecikti' if late else ''})")
+        if not rows: print("Aktif ödünç yok.")
+    elif args.command == "transfers":
+        for key, direction, peer, title, author, member, created, status in transfers():
+            print(f"{key[:8]} {direction:<5} {peer:<14} {title} — {author}{f' (→ {member})' if member else ''} {created}")
+    else:
+        report = sync()
+        errors = report.pop("errors")
+        print(f"Gönderilen {report['pushed']}, teslimi kapatılan {report['received']}, "
+              f"iptali kapatılan {report['cancelled']}")
+    for name, message in errors.items():
+        print(f"⚠️ {name}: {message}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
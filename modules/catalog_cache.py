@@ -0,0 +1,400 @@
+import bisect
+import heapq
+import os
+import sys
+import threading
+from array import array
+from itertools import islice
+
+from modules import db_manager as db
+from modules.search import fold_tr
+
+# --- SÜREÇ GENELİ KATALOG ÖNBELLEĞİ ---
+# Kitap ve üye tabloları süreç başına bir kez belleğe alınır; tüm oturumlar
+# (masadaki tüm terminaller) aynı kopyayı okur. Saklama DataFrame değil kolon
+# dizileridir: id'ler array('q'), metinler liste, tekrar eden değerler (durum,
+# raf, tarih) sys.intern ile tek nesne.
+#
+# Her okumada önce db.data_version() (PRAGMA data_version, ~5 µs) bakılır;
+# veritabanı değişmediyse hiç sorgu çalışmaz. Değiştiyse sadece fark okunur:
+#   - yeni satırlar: id > bilinen en büyük id (AUTOINCREMENT)
+#   - güncellenen / silinen satırlar: catalog_changes günlüğü (göç 10)
+# Ödünç / iade gibi yazmalar bu tabloları (kitap durumu dışında) değiştirmediği
+# için önbellek tek satır okumayla güncel kalır. Günlük budanıp geride kalınırsa
+# veya havuz sıfırlanırsa tamamı yeniden yüklenir.
+#
+# Bellek sınırı: satır sayısı AKYURT_CACHE_MAX_ROWS değerini aşan tablo
+# önbelleğe alınmaz; çağıranlar SQL yoluna döner.
+
+MAX_ROWS = int(os.environ.get("AKYURT_CACHE_MAX_ROWS", "300000"))
+ENABLED = os.environ.get("AKYURT_CATALOG_CACHE", "1") != "0"
+_CHUNK = 500  # IN (...) başına id
+_LOAD_BATCH = 20_000
+
+# tablo -> (kolonlar, intern edilecek kolonlar); kayıt sırası SELECT * ile aynı
+TABLES = {
+    "books": (("title", "author", "isbn", "location", "status"), ("location", "status")),
+    "members": (("name", "phone", "email", "join_date"), ("join_date",)),
+}
+# Bellekte hesaplanan kolonlar: members.name_key üretilmiş (sanal) kolon, SQL'de
+# okumak her satırda katlama ifadesini çalıştırır; fold_tr aynı sonucu verir.
+DERIVED = {
+    "members": {"name_key": ("name", fold_tr)},
+}
+
+
+class _Table:
+    # Satırlar id sırasıyla eklenir (bisect ile konum bulunur); silinen satır alive=0.
+    # Yayımlanmış tablo (_state içindeki) bir daha değiştirilmez: fark copy() ile alınan
+    # özel kopyaya uygulanır ve kopya yeni görüntü olarak yayımlanır. Okuyucular kilitsiz
+    # okur; elindeki tablo okuma boyunca tutarlı kalır. Kopya kapsayıcıları (ids, alive,
+    # kolonlar) ilk değişiklikte kopyalar; değişmeyen kolonlar ve sıralama dizinleri paylaşılır.
+    __slots__ = ("name", "ids", "columns", "alive", "live", "version", "_sorted", "_sort_lock", "_owned")
+
+    def __init__(self, name):
+        self.name = name
+        self.ids = array("q")
+        self.columns = {col: [] for col in TABLES[name][0]}
+        for col in DERIVED.get(name, ()):
+            self.columns[col] = []
+        self.alive = bytearray()
+        self.live = 0
+        self.version = 0
+        self._sorted = {}
+        self._sort_lock = threading.Lock()
+        self._owned = {"ids", "alive", *self.columns}
+
+    def copy(self):
+        table = _Table.__new__(_Table)
+        table.name = self.name
+        table.ids, table.alive = self.ids, self.alive
+        table.columns = dict(self.columns)
+        table.live, table.version = self.live, self.version
+        table._sorted = dict(self._sorted)
+        table._sort_lock = threading.Lock()
+        table._owned = set()
+        return table
+
+    def _own(self, *keys):
+        # Paylaşılan kapsayıcıyı değiştirmeden önce kopyala (yalnızca özel kopyada çağrılır)
+        for key in keys:
+            if key in self._owned: continue
+            if key == "ids":
+                self.ids = array("q", self.ids)
+            elif key == "alive":
+                self.alive = bytearray(self.alive)
+            else:
+                self.columns[key] = list(self.columns[key])
+            self._owned.add(key)
+
+    def position(self, row_id):
+        i = bisect.bisect_left(self.ids, row_id)
+        if i < len(self.ids) and self.ids[i] == row_id and self.alive[i]:
+            return i
+        return None
+
+    def max_id(self):
+        return self.ids[-1] if self.ids else 0
+
+    def extend(self, rows):
+        # Kolon kolon toplu ekleme (satır başına Python döngüsünden ~3 kat hızlı)
+        if not rows: return
+        self._own("ids", "alive", *self.columns)
+        interned = TABLES[self.name][1]
+        columns = list(zip(*rows))
+        self.ids.extend(columns[0])
+        for col, values in zip(self.columns, columns[1:]):
+            if col in interned:
+                values = [sys.intern(v) if isinstance(v, str) else v for v in values]
+            self.columns[col].extend(values)
+        for col, (source, func) in DERIVED.get(self.name, {}).items():
+            self.columns[col].extend(map(func, self.columns[source][-len(rows):]))
+        self.alive.extend(b"\x01" * len(rows))
+        self.live += len(rows)
+        self._sorted.clear()
+
+    def update(self, pos, row):
+        # Değişen kolonların sıralama dizinleri atılır; durum değişikliği ad sırasını bozmaz
+        interned = TABLES[self.name][1]
+        for col, value in zip(self.columns, row[1:]):
+            if self.columns[col][pos] != value:
+                self._own(col)
+                self.columns[col][pos] = sys.intern(value) if col in interned and isinstance(value, str) else value
+                self._sorted.pop(col, None)
+                for derived, (source, func) in DERIVED.get(self.name, {}).items():
+                    if source == col:
+                        self._own(derived)
+                        self.columns[derived][pos] = func(value)
+                        self._sorted.pop(derived, None)
+
+    def remove(self, pos):
+        self._own("alive")
+        self.alive[pos] = 0
+        self.live -= 1
+        self._sorted.clear()
+
+    def record(self, pos):
+        return (self.ids[pos],) + tuple(self.columns[col][pos] for col in TABLES[self.name][0])
+
+    def sort_value(self, col, pos):
+        if col == "id": return self.ids[pos]
+        value = self.columns[col][pos]
+        return "" if value is None else value
+
+    def sorted_positions(self, col):
+        # (kolon, id) sırasındaki canlı satır konumları; ilk istekte kurulur. Tablo
+        # değişmediği için dizin hep bu tablonun verisinden kurulur; kilit aynı dizinin
+        # iki okuyucu tarafından birden kurulmasını önler.
+        order = self._sorted.get(col)
+        if order is None:
+            with self._sort_lock:
+                order = self._sorted.get(col)
+                if order is None:
+                    alive = [pos for pos in range(len(self.ids)) if self.alive[pos]]
+                    if col != "id":
+                        values, ids = self.columns[col], self.ids
+                        alive.sort(key=lambda pos: ("" if values[pos] is None else values[pos], ids[pos]))
+                    order = self._sorted[col] = array("q", alive)
+        return order
+
+    def prefix_positions(self, col, prefix):
+        # col değeri prefix ile başlayan canlı satırlar (sıralama dizini üzerinde aralık)
+        order = self.sorted_positions(col)
+        values = self.columns[col]
+        key = lambda pos: "" if values[pos] is None else values[pos]
+        lo = bisect.bisect_left(order, prefix, key=key)
+        hi = bisect.bisect_left(order, prefix + "\uffff", key=key)
+        return islice(order, lo, hi)
+
+
+class _Snapshot:
+    __slots__ = ("token", "seq", "tables")
+
+    def __init__(self, token):
+        self.token = token
+        self.seq = 0
+        self.tables = {}
+
+
+_state = None
+_lock = threading.Lock()
+
+
+def _select(name):
+    return f"SELECT id, {', '.join(TABLES[name][0])} FROM {name}"
+
+
+def _load(token):
+    snapshot = _Snapshot(token)
+    with db.connection() as conn:
+        # Tek okuma işlemi: günlük sırası ve tablolar aynı ana ait
+        conn.execute("BEGIN")
+        try:
+            snapshot.seq = conn.execute("SELECT coalesce(MAX(seq), 0) FROM catalog_changes").fetchone()[0]
+            for name in TABLES:
+                if conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] > MAX_ROWS:
+                    snapshot.tables[name] = None
+                    continue
+                table = _Table(name)
+                cur = conn.execute(_select(name) + " ORDER BY id")
+                while True:
+                    rows = cur.fetchmany(_LOAD_BATCH)
+                    if not rows: break
+                    table.extend(rows)
+                snapshot.tables[name] = table
+        finally:
+            conn.rollback()
+    return snapshot
+
+
+def _apply_changes(snapshot, token):
+    # Farkı yeni bir görüntüye uygular (yayımlanmış görüntü ve tabloları değişmez:
+    # değişen tablo kopyalanır). Günlük budanıp geride kaldıysak None (tam yükleme gerekir).
+    updated = _Snapshot(token)
+    updated.tables = dict(snapshot.tables)
+    with db.connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            first = conn.execute("SELECT MIN(seq) FROM catalog_changes").fetchone()[0]
+            if first is not None and first > snapshot.seq + 1:
+                return None
+            changed = {name: set() for name in TABLES}
+            seq = snapshot.seq
+            for seq, tbl, row_id in conn.execute(
+                    "SELECT seq, tbl, row_id FROM catalog_changes WHERE seq > ? ORDER BY seq", (snapshot.seq,)):
+                if tbl in changed: changed[tbl].add(row_id)
+            for name, table in snapshot.tables.items():
+                if table is None: continue
+                last_id = table.max_id()
+                new_rows = conn.execute(_select(name) + " WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+                if table.live + len(new_rows) > MAX_ROWS:
+                    updated.tables[name] = None  # Sınır aşıldı: bellek bırakılır, SQL'e dönülür
+                    continue
+                ids = sorted(row_id for row_id in changed[name] if row_id <= last_id)
+                if not ids and not new_rows: continue
+                current = {}
+                for i in range(0, len(ids), _CHUNK):
+                    chunk = ids[i:i + _CHUNK]
+                    for row in conn.execute(_select(name) + f" WHERE id IN ({','.join('?' * len(chunk))})", chunk):
+                        current[row[0]] = row
+                table = table.copy()
+                for row_id in ids:
+                    pos = table.position(row_id)
+                    if pos is None: continue
+                    if row_id in current:
+                        table.update(pos, current[row_id])
+                    else:
+                        table.remove(pos)
+                table.extend(new_rows)
+                table.version += 1
+                updated.tables[name] = table
+            updated.seq = seq
+        finally:
+            conn.rollback()
+    return updated
+
+
+def _table(name):
+    # Güncel tablo veya None (kapalı / sınırı aşmış)
+    global _state
+    if not ENABLED: return None
+    token = db.data_version()
+    state = _state
+    if state is None or state.token != token:
+        with _lock:
+            state = _state
+            if state is None or state.token != token:
+                # Aynı gözcü bağlantısı: fark yeterli; değilse (havuz sıfırlandı) tam yükleme.
+                # Yeni görüntü tek atamayla yayımlanır (okuyucular eskisini okumaya devam eder)
+                if state is not None and state.token[0] == token[0]:
+                    state = _apply_changes(state, token)
+                else:
+                    state = None
+                _state = state = state or _load(token)
+    return state.tables.get(name)
+
+
+_warm_pid = None
+
+
+def warm():
+    # İlk yükleme (büyük katalogda ~1 sn) ilk kullanıcının isteğini bekletmesin:
+    # süreç başına bir kez arka planda başlatılır.
+    global _warm_pid
+    if not ENABLED or _warm_pid == os.getpid(): return
+    _warm_pid = os.getpid()
+    threading.Thread(target=_table, args=("books",), name="catalog-cache-warm", daemon=True).start()
+
+
+def available(name):
+    return _table(name) is not None
+
+
+def version(name):
+    # Tablo değiştikçe artar (önbellek anahtarlarında write_generation yerine)
+    table = _table(name)
+    return None if table is None else table.version
+
+
+def clear():
+    global _state
+    with _lock:
+        _state = None
+
+
+# --- KAYIT OKUMA (SQL yedekli) ---
+def get_book(book_id):
+    # (id, title, author, isbn, location, status) — SELECT * FROM books ile aynı sıra
+    table = _table("books")
+    if table is None:
+        return db.fetch_one(_select("books") + " WHERE id = ?", (book_id,))
+    pos = table.position(book_id)
+    return None if pos is None else table.record(pos)
+
+
+def get_member(member_id):
+    # (id, name, phone, email, join_date)
+    table = _table("members")
+    if table is None:
+        return db.fetch_one(_select("members") + " WHERE id = ?", (member_id,))
+    pos = table.position(member_id)
+    return None if pos is None else table.record(pos)
+
+
+def book_label(title, author, location, status):
+    label = f"{title} | {author} (Raf: {location})"
+    return f"{label} — {status}" if status == 'Ayrıldı' else label
+
+
+def member_label(name, phone):
+    return f"{name} ({phone})"
+
+
+def get_books_dict(status=None, limit=None):
+    # {id: etiket} id sırasıyla; status: None veya durum demeti
+    table = _table("books")
+    if table is None:
+        status_sql = "" if status is None else f"WHERE status IN ({','.join('?' * len(status))})"
+        limit_sql = "" if limit is None else f"LIMIT {int(limit)}"
+        rows = db.fetch_all(f"SELECT id, title, author, location, status FROM books {status_sql} "
+                            f"ORDER BY id {limit_sql}", tuple(status or ()))
+        return {row[0]: book_label(*row[1:]) for row in rows}
+    titles, authors = table.columns["title"], table.columns["author"]
+    locations, statuses = table.columns["location"], table.columns["status"]
+    positions = (pos for pos in range(len(table.ids))
+                 if table.alive[pos] and (status is None or statuses[pos] in status))
+    return {table.ids[pos]: book_label(titles[pos], authors[pos], locations[pos], statuses[pos])
+            for pos in islice(positions, limit)}
+
+
+def get_members_dict(limit=None):
+    table = _table("members")
+    if table is None:
+        limit_sql = "" if limit is None else f"LIMIT {int(limit)}"
+        return {row[0]: member_label(row[1], row[2])
+                for row in db.fetch_all(f"SELECT id, name, phone FROM members ORDER BY id {limit_sql}")}
+    names, phones = table.columns["name"], table.columns["phone"]
+    positions = (pos for pos in range(len(table.ids)) if table.alive[pos])
+    return {table.ids[pos]: member_label(names[pos], phones[pos]) for pos in islice(positions, limit)}
+
+
+def find_members(text, limit):
+    # lookup.find_members ile aynı kurallar; önbellek yoksa None
+    table = _table("members")
+    if table is None: return None
+    if not text:
+        return list(get_members_dict(limit).items())
+    if text.isdigit():
+        # Üye numarası veya telefon öneki
+        positions = set(table.prefix_positions("phone", text))
+        exact = table.position(int(text))
+        if exact is not None: positions.add(exact)
+    else:
+        positions = table.prefix_positions("name_key", fold_tr(text))
+    names, phones = table.columns["name"], table.columns["phone"]
+    # Eşleşenlerden id sırasıyla ilk `limit` tanesi (konum sırası = id sırası)
+    return [(table.ids[pos], member_label(names[pos], phones[pos])) for pos in heapq.nsmallest(limit, positions)]
+
+
+# --- SAYFALI LİSTE ---
+def page(name, columns, sort, after=None, descending=False, page_size=25):
+    # tables.fetch_page ile aynı sözleşme: (DataFrame, sonraki anahtar) veya önbellek yoksa None.
+    # columns: {"Görünen ad": kolon}; sort: kolon adı veya "id". Anahtar (sıralama değeri, id).
+    table = _table(name)
+    if table is None: return None
+    order = table.sorted_positions(sort)
+    key = lambda pos: (table.sort_value(sort, pos), table.ids[pos])
+    if descending:
+        end = len(order) if after is None else bisect.bisect_left(order, tuple(after), key=key)
+        positions = [order[i] for i in range(end - 1, max(end - page_size - 2, -1), -1)]
+    else:
+        start = 0 if after is None else bisect.bisect_right(order, tuple(after), key=key)
+        positions = list(order[start:start + page_size + 1])
+    next_key = None
+    if len(positions) > page_size:
+        positions = positions[:page_size]
+        next_key = key(positions[-1])
+    import pandas as pd
+
+    df = pd.DataFrame({label: [table.columns[col][pos] for pos in positions] for label, col in columns.items()})
+    return df, next_key
@@ -0,0 +1,419 @@
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+
+from modules import db_manager as db
+from modules.search import fold_tr, search_fold_sql, search_isbn_sql
+
+# --- TOPLU KATALOG AKTARIMI (CSV / MARC21) ---
+# Kullanım:
+#   python -m modules.catalog_import kitaplar.csv --dry-run
+#   python -m modules.catalog_import eski_katalog.mrc --chunk-size 5000 --rejects hatalar.csv
+#
+# Dosya kayıt kayıt okunur (generator); hiçbir aşamada tamamı belleğe alınmaz.
+# Her kayıt doğrulanır, ISBN-13'e normalleştirilir, dosya içinde ve
+# veritabanında (idx_books_isbn_key, parça başına tek sorgu) tekilleştirilir ve
+# CHUNK_SIZE kayıtlık işlemlerle (executemany) yazılır. Satır başına FTS
+# tetikleyicisi işlem içinde duraklatılır, parça tek sorguyla indekslenir (göç 7).
+# Hatalı bir parça sadece kendi işlemini geri alır; önceki parçalar kalıcıdır.
+
+DEFAULT_CHUNK_SIZE = 10_000  # ~1 sn yazma kilidi; masadaki işlemler busy_timeout içinde bekler
+MAX_REPORTED_ERRORS = 200
+
+INSERT_SQL = "INSERT INTO books (title, author, isbn, location, status) VALUES (?, ?, ?, ?, 'Müsait')"
+FTS_BULK_SQL = f"""
+    INSERT INTO books_fts(rowid, title, author, isbn, location)
+    SELECT id, {search_fold_sql("title")}, {search_fold_sql("author")},
+           {search_isbn_sql("isbn")}, {search_fold_sql("location")}
+    FROM books WHERE id > ?
+"""
+
+# CSV başlık eşleştirmesi (Türkçe katlanmış, küçük harf)
+CSV_COLUMNS = {
+    "title": ("title", "kitap adi", "kitap", "eser", "eser adi", "baslik"),
+    "author": ("author", "yazar", "yazar adi"),
+    "isbn": ("isbn", "isbn13", "isbn-13", "isbn10"),
+    "location": ("location", "raf", "raf no", "raf numarasi", "raf yeri", "konum"),
+}
+CSV_EXTENSIONS = (".csv", ".tsv", ".txt")
+MARC_EXTENSIONS = (".mrc", ".marc", ".iso", ".dat")
+
+_ISBN_HEAD = re.compile(r"[0-9Xx][0-9Xx\s-]*")
+_ISBN_SEP = re.compile(r"[\s-]")
+
+# MARC21 (ISO 2709) ayraçları
+_FIELD_END = b"\x1e"
+_SUBFIELD = "\x1f"
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# --- ISBN ---
+def _isbn13_check(digits12):
+    total = sum(map(int, digits12[0::2])) + 3 * sum(map(int, digits12[1::2]))
+    return str((10 - total % 10) % 10)
+
+
+def _isbn10_sum(digits):
+    # Ağırlıklar 10, 9, ..., 1: ağırlıklı toplam = önek toplamlarının toplamı
+    total = running = 0
+    for d in digits:
+        running += 10 if d == "X" else ord(d) - 48
+        total += running
+    return total
+
+
+def normalize_isbn(raw):
+    # "978-605-360-200-1 (ciltli)" / "0-14-044913-6" -> ISBN-13 rakamları; geçersizse ValueError
+    match = _ISBN_HEAD.match((raw or "").strip())
+    if not match:
+        raise ValueError("ISBN okunamadı")
+    isbn = _ISBN_SEP.sub("", match.group()).upper()
+    if len(isbn) == 10:
+        if not isbn[:9].isdigit() or not (isbn[9].isdigit() or isbn[9] == "X"):
+            raise ValueError("ISBN-10 biçimi hatalı")
+        if _isbn10_sum(isbn) % 11:
+            raise ValueError("ISBN-10 kontrol basamağı hatalı")
+        body = "978" + isbn[:9]
+        return body + _isbn13_check(body)
+    if len(isbn) == 13 and isbn.isdigit():
+        if _isbn13_check(isbn[:12]) != isbn[12]:
+            raise ValueError("ISBN-13 kontrol basamağı hatalı")
+        return isbn
+    raise ValueError("ISBN 10 veya 13 haneli olmalı")
+
+
+def isbn_variants(isbn13):
+    # Veritabanında ISBN-10 olarak kayıtlı eski kayıtlar da eşleşsin
+    if not isbn13.startswith("978"): return (isbn13,)
+    body = isbn13[3:12]
+    # Kontrol basamağı yerine 0 konarak 10..2 ağırlıklı toplam alınır
+    check = (11 - _isbn10_sum(body + "0") % 11) % 11
+    return isbn13, body + ("X" if check == 10 else str(check))
+
+
+# --- OKUYUCULAR (generator) ---
+# Her kayıt: {"line", "title", "author", "isbn", "location"} veya {"line", "error"}
+def _pick_delimiter(header):
+    return max(",;\t|", key=header.count)
+
+
+def iter_csv(text_stream, delimiter=None):
+    header_line = text_stream.readline()
+    if not header_line.strip():
+        return
+    delimiter = delimiter or _pick_delimiter(header_line)
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    keys = [fold_tr(h).strip() for h in header]
+    index = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for pos, key in enumerate(keys):
+            if key in aliases:
+                index[field] = pos
+                break
+    if "title" not in index or "author" not in index:
+        raise ImportFormatError(f"CSV başlığında kitap adı / yazar kolonu bulunamadı: {header}")
+
+    reader = csv.reader(text_stream, delimiter=delimiter)
+    for row in reader:
+        if not any(row): continue
+        record = {"line": reader.line_num + 1}
+        for field, pos in index.items():
+            record[field] = row[pos].strip() if pos < len(row) else ""
+        yield record
+
+
+def _marc_fields(record):
+    # ISO 2709: 24 bayt lider + 12 baytlık dizin girdileri + veri alanları.
+    # Metin UTF-8 kabul edilir (lider[9] = 'a'); MARC-8 kayıtlarda ASCII dışı harfler bozulabilir.
+    leader = record[:24]
+    try:
+        base = int(leader[12:17])
+    except ValueError:
+        raise ValueError("MARC lideri hatalı")
+    directory = record[24:base - 1]
+    fields = {}
+    for pos in range(0, len(directory) - 11, 12):
+        entry = directory[pos:pos + 12]
+        tag = entry[:3].decode("ascii", "replace")
+        length, start = int(entry[3:7]), int(entry[7:12])
+        data = record[base + start: base + start + length].rstrip(_FIELD_END).decode("utf-8", "replace")
+        fields.setdefault(tag, []).append(data)
+    return fields
+
+
+def _subfields(data, codes):
+    # "10\x1faSuç ve ceza /\x1fcDostoyevski" -> {"a": "Suç ve ceza /", "c": ...} (ilk geçen)
+    found = {}
+    for part in data.split(_SUBFIELD)[1:]:
+        if part and part[0] in codes and part[0] not in found:
+            found[part[0]] = part[1:].strip()
+    return found
+
+
+def _clean_marc_text(text):
+    # ISBD noktalaması: "Suç ve ceza /" -> "Suç ve ceza"
+    return text.strip().rstrip(" /:;,.=").strip()
+
+
+def _marc_record(fields):
+    title = author = isbn = location = ""
+    for data in fields.get("245", [])[:1]:
+        sub = _subfields(data, "ab")
+        title = " ".join(_clean_marc_text(sub[c]) for c in "ab" if sub.get(c))
+    for tag in ("100", "110", "111", "700"):
+        if fields.get(tag):
+            author = _clean_marc_text(_subfields(fields[tag][0], "a").get("a", ""))
+            break
+    for data in fields.get("020", []):
+        isbn = _subfields(data, "a").get("a", "")
+        if isbn: break
+    for data in fields.get("852", [])[:1]:
+        sub = _subfields(data, "chij")
+        location = " ".join(sub[c] for c in "hij" if sub.get(c)) or sub.get("c", "")
+    return {"title": title, "author": author, "isbn": isbn, "location": location}
+
+
+def iter_marc(binary_stream):
+    number = 0
+    while True:
+        head = binary_stream.read(5)
+        # Bazı dışa aktarımlar kayıtlar arasına satır sonu koyar
+        while head[:1] in (b"\r", b"\n", b" "):
+            head = head[1:] + binary_stream.read(1)
+        if not head:
+            return
+        number += 1
+        if len(head) < 5 or not head.isdigit():
+            raise ImportFormatError(f"{number}. MARC kaydının uzunluk alanı okunamadı")
+        length = int(head)
+        record = head + binary_stream.read(length - 5)
+        if len(record) < length:
+            yield {"line": number, "error": "MARC kaydı yarım kesilmiş"}
+            return
+        try:
+            yield dict(_marc_record(_marc_fields(record)), line=number)
+        except (ValueError, IndexError) as exc:
+            yield {"line": number, "error": f"MARC kaydı çözülemedi: {exc}"}
+
+
+def detect_format(binary_stream, name=""):
+    ext = os.path.splitext(name.lower())[1]
+    if ext in CSV_EXTENSIONS: return "csv"
+    if ext in MARC_EXTENSIONS: return "marc"
+    pos = binary_stream.tell()
+    head = binary_stream.read(5)
+    binary_stream.seek(pos)
+    return "marc" if len(head) == 5 and head.isdigit() else "csv"
+
+
+# --- DOĞRULAMA / YAZMA ---
+def _validated(records, report, require_isbn, reject):
+    seen = set()
+    for record in records:
+        report["read"] += 1
+        if "error" in record:
+            reject(record, record["error"], "invalid")
+            continue
+        title, author = record.get("title", ""), record.get("author", "")
+        if not title or not author:
+            reject(record, "Kitap adı ve yazar zorunlu", "invalid")
+            continue
+        isbn = record.get("isbn", "")
+        if isbn:
+            try:
+                isbn = normalize_isbn(isbn)
+            except ValueError as exc:
+                reject(record, str(exc), "invalid")
+                continue
+            if isbn in seen:
+                reject(record, "Dosyada tekrar eden ISBN", "duplicates_file")
+                continue
+            seen.add(isbn)
+        elif require_isbn:
+            reject(record, "ISBN zorunlu", "invalid")
+            continue
+        yield record["line"], (title, author, isbn or None, record.get("location") or None)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _existing_isbns(conn, isbns):
+    if not isbns: return set()
+    variants = {}
+    for isbn in isbns:
+        for v in isbn_variants(isbn):
+            variants[v] = isbn
+    found = set()
+    keys = list(variants)
+    # SQLite parametre sınırının altında kal
+    for start in range(0, len(keys), 900):
+        part = keys[start:start + 900]
+        rows = conn.execute(f"""
+            SELECT {search_isbn_sql('isbn')} FROM books
+            WHERE {search_isbn_sql('isbn')} IN ({','.join('?' * len(part))})
+        """, part).fetchall()
+        found.update(variants[row[0].upper()] for row in rows if row[0].upper() in variants)
+    return found
+
+
+def _insert_chunk(conn, rows):
+    # Yeni satırların id'leri mevcut en büyük id'den sonra gelir (INTEGER PRIMARY KEY)
+    last_id = conn.execute("SELECT coalesce(max(id), 0) FROM books").fetchone()[0]
+    conn.execute("INSERT INTO fts_sync_paused (id) VALUES (1)")
+    conn.executemany(INSERT_SQL, rows)
+    conn.execute(FTS_BULK_SQL, (last_id,))
+    conn.execute("DELETE FROM fts_sync_paused")
+
+
+@db.retry_on_busy
+def _store_chunk(chunk, dry_run):
+    # Dönüş: (eklenen satırlar, [(satır no, satır)] veritabanında kayıtlı ISBN'ler).
+    # Yazma kilidi baştan alınır (BEGIN IMMEDIATE): ISBN kontrolü ile ekleme arasında
+    # başka bir yazma araya girip işlemi SQLITE_BUSY_SNAPSHOT ile düşüremez. Kilit
+    # hatasında parça baştan çalışır (rapor ancak parça bittikten sonra güncellenir).
+    # Deneme modunda yazma işlemi açılmaz (yazma sayacı ve önbellekler etkilenmez).
+    scope = db.connection if dry_run else lambda: db.transaction(immediate=True)
+    with scope() as conn:
+        existing = _existing_isbns(conn, [row[2] for _, row in chunk if row[2]])
+        rows = [row for _, row in chunk if row[2] not in existing]
+        if rows and not dry_run:
+            _insert_chunk(conn, rows)
+    return rows, [(line, row) for line, row in chunk if row[2] in existing]
+
+
+def new_report():
+    return {"read": 0, "inserted": 0, "duplicates_file": 0, "duplicates_db": 0, "invalid": 0,
+            "errors": [], "seconds": 0.0, "dry_run": False}
+
+
+def import_records(records, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, require_isbn=False,
+                   progress=None, on_reject=None):
+    # records: iter_csv / iter_marc çıktısı. progress(report) her parçadan sonra çağrılır.
+    # on_reject(record, sebep) reddedilen her kayıt için (ör. hata dosyasına yazmak).
+    report = new_report()
+    report["dry_run"] = dry_run
+    started = time.perf_counter()
+
+    def reject(record, reason, counter):
+        report[counter] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append((record.get("line"), reason, record.get("title", "")))
+        if on_reject: on_reject(record, reason)
+
+    for chunk in _chunks(_validated(records, report, require_isbn, reject), chunk_size):
+        rows, duplicates = _store_chunk(chunk, dry_run)
+        for line, row in duplicates:
+            reject({"line": line, "title": row[0], "isbn": row[2]}, "ISBN veritabanında kayıtlı",
+                   "duplicates_db")
+        report["inserted"] += len(rows)
+        report["seconds"] = time.perf_counter() - started
+        if progress: progress(report)
+
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def import_file(binary_stream, name="", fmt="auto", encoding="utf-8-sig", delimiter=None, **options):
+    # binary_stream: ikili (rb) dosya veya yüklenen dosya. options: import_records parametreleri.
+    if fmt == "auto":
+        fmt = detect_format(binary_stream, name)
+    progress = options.pop("progress", None)
+    start, total = binary_stream.tell(), _stream_size(binary_stream)
+
+    def _progress(report):
+        if progress:
+            fraction = (binary_stream.tell() - start) / total if total else 0.0
+            progress(report, min(fraction, 1.0))
+
+    if fmt == "marc":
+        return import_records(iter_marc(binary_stream), progress=_progress, **options)
+    text = io.TextIOWrapper(binary_stream, encoding=encoding, newline="")
+    try:
+        return import_records(iter_csv(text, delimiter), progress=_progress, **options)
+    finally:
+        # Çağıranın dosyası açık kalsın
+        text.detach()
+
+
+def _stream_size(stream):
+    try:
+        pos = stream.tell()
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(pos)
+        return size - pos
+    except (OSError, AttributeError):
+        return 0
+
+
+def rate(report):
+    return report["read"] / report["seconds"] if report["seconds"] else 0.0
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV veya MARC21 dosyasından toplu kitap aktarımı.")
+    parser.add_argument("path", help="Aktarılacak dosya (.csv / .mrc)")
+    parser.add_argument("--format", choices=("auto", "csv", "marc"), default="auto")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV karakter kodlaması")
+    parser.add_argument("--delimiter", default=None, help="CSV ayracı (varsayılan: başlıktan tahmin)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="İşlem başına kayıt")
+    parser.add_argument("--require-isbn", action="store_true", help="ISBN'siz kayıtları reddet")
+    parser.add_argument("--dry-run", action="store_true", help="Doğrula ama veritabanına yazma")
+    parser.add_argument("--rejects", default=None, help="Reddedilen kayıtların yazılacağı CSV")
+    args = parser.parse_args(argv)
+
+    rejects_file = rejects_writer = None
+    if args.rejects:
+        rejects_file = open(args.rejects, "w", newline="", encoding="utf-8-sig")
+        rejects_writer = csv.writer(rejects_file)
+        rejects_writer.writerow(["satir", "sebep", "kitap_adi", "yazar", "isbn", "raf"])
+
+    def on_reject(record, reason):
+        if rejects_writer:
+            rejects_writer.writerow([record.get("line"), reason, record.get("title", ""),
+                                     record.get("author", ""), record.get("isbn", ""), record.get("location", "")])
+
+    def progress(report, fraction):
+        print(f"\r  %{fraction * 100:5.1f}  okunan {report['read']:,}  eklenen {report['inserted']:,}  "
+              f"tekrar {report['duplicates_file'] + report['duplicates_db']:,}  hatalı {report['invalid']:,}  "
+              f"({rate(report):,.0f} kayıt/sn)", end="", file=sys.stderr, flush=True)
+
+    try:
+        with open(args.path, "rb") as f:
+            report = import_file(f, name=args.path, fmt=args.format, encoding=args.encoding,
+                                 delimiter=args.delimiter, chunk_size=args.chunk_size,
+                                 require_isbn=args.require_isbn, dry_run=args.dry_run,
+                                 progress=progress, on_reject=on_reject)
+    except ImportFormatError as exc:
+        print(f"\n❌ {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if rejects_file: rejects_file.close()
+
+    print(file=sys.stderr)
+    label = "eklenecek (deneme)" if args.dry_run else "eklendi"
+    print(f"✅ {report['read']:,} kayıt okundu, {report['inserted']:,} {label}; "
+          f"dosyada tekrar {report['duplicates_file']:,}, veritabanında kayıtlı {report['duplicates_db']:,}, "
+          f"hatalı {report['invalid']:,}. Süre {report['seconds']:.1f} sn ({rate(report):,.0f} kayıt/sn)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
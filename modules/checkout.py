@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from modules import db_manager as db
+from modules import reservation_queue
+from modules.catalog_import import isbn_variants, normalize_isbn
+from modules.search import search_isbn_sql
+
+# --- BARKOD SEPETİ: TOPLU ÖDÜNÇ / İADE ---
+# Okutulan her barkod (ISBN veya kayıt no) bir kitaba / aktif ödünce çözülür ve
+# sepete eklenir. Onayda tüm sepet tek işlemde doğrulanır (tek kümesel sorgu)
+# ve ya hepsi ya hiçbiri yazılır.
+
+MAX_COPIES = 50
+# Ödünç süresi (gün); ekran kaydırıcısı ve API aynı aralığı kullanır
+MIN_LOAN_DAYS, MAX_LOAN_DAYS = 1, 14
+LOAN_DAYS_ERROR = f"Ödünç süresi {MIN_LOAN_DAYS}-{MAX_LOAN_DAYS} gün olmalı."
+
+
+def _code_filter(code, alias="b"):
+    # Barkod -> (WHERE parçası, parametreler); ISBN-10/13 veya kayıt numarası
+    code = (code or "").strip()
+    try:
+        isbn_keys = isbn_variants(normalize_isbn(code))
+    except ValueError:
+        isbn_keys = ()
+    parts, args = [], []
+    if isbn_keys:
+        parts.append(f"{search_isbn_sql(alias + '.isbn')} IN ({','.join('?' * len(isbn_keys))})")
+        args.extend(isbn_keys)
+    if code.isdigit() and len(code) < 10:
+        parts.append(f"{alias}.id = ?")
+        args.append(int(code))
+    if not parts: return None, ()
+    return " OR ".join(parts), tuple(args)
+
+
+def _in(values):
+    return ",".join("?" * len(values))
+
+
+# --- BARKOD ÇÖZÜMLEME ---
+def resolve_checkout(code, exclude=()):
+    # Ödünç verilebilecek ilk kopya: {"book_id", "title", "author"} veya hata metni.
+    # Ayrılmış kopya da sepete alınır; kime ayrıldığı onayda kontrol edilir.
+    where, args = _code_filter(code)
+    if where is None: return None, "Barkod okunamadı"
+    rows = db.fetch_all(f"""
+        SELECT b.id, b.title, b.author, b.status FROM books b
+        WHERE {where}
+        ORDER BY b.status = 'Müsait' DESC, b.status = 'Ayrıldı' DESC, b.id LIMIT {MAX_COPIES}
+    """, args)
+    if not rows: return None, "Kitap bulunamadı"
+    for book_id, title, author, status in rows:
+        if book_id in exclude: continue
+        if status not in reservation_queue.LENDABLE:
+            return None, f"'{title}' şu an {status}"
+        return {"book_id": book_id, "title": title, "author": author}, None
+    return None, f"'{rows[0][1]}' zaten sepette"
+
+
+def resolve_return(code, member_id=None, exclude=()):
+    # Aynı ISBN'den birden çok kopya dışarıdaysa önce seçili üyeninki, sonra en erken teslim
+    where, args = _code_filter(code, alias="bk")
+    if where is None: return None, "Barkod okunamadı"
+    rows = db.fetch_all(f"""
+        SELECT t.id, t.book_id, b.title, m.name, t.member_id, t.due_date FROM transactions t
+        JOIN books b ON t.book_id = b.id
+        JOIN members m ON t.member_id = m.id
+        WHERE t.status = 'Aktif' AND t.book_id IN (SELECT bk.id FROM books bk WHERE {where})
+        ORDER BY t.member_id = ? DESC, t.due_date LIMIT {MAX_COPIES}
+    """, args + (member_id or 0,))
+    for loan_id, book_id, title, member, loan_member_id, due_date in rows:
+        if loan_id in exclude: continue
+        return {"loan_id": loan_id, "book_id": book_id, "title": title, "member": member,
+                "member_id": loan_member_id, "due_date": due_date}, None
+    return None, "Bu barkod için aktif ödünç yok" if not rows else f"'{rows[0][2]}' zaten sepette"
+
+
+# --- ONAY (TEK İŞLEM) ---
+# Ekranda "müsait" görünen kitap, düğmeye basılana kadar başka bir masada verilmiş
+# olabilir. Yazma kilidi baştan alınır (BEGIN IMMEDIATE), durum kilit altında tekrar
+# okunur ve kitap yalnızca hâlâ verilebilir durumdaysa koşullu UPDATE ile alınır;
+# etkilenen satır sayısı eksikse tüm işlem geri alınır. Kilit hatası tüm işlemi
+# retry_on_busy ile sınırlı sayıda tekrarlatır.
+class _LostRace(Exception):
+    def __init__(self, book_ids):
+        super().__init__(book_ids)
+        self.book_ids = book_ids
+
+
+@db.retry_on_busy
+def checkout(member_id, book_ids, days=14):
+    # Dönüş: (başarılı mı, [(book_id, sorun)]). Sorun varsa hiçbir şey yazılmaz.
+    # Süre aralık dışıysa tek sorun (None, LOAN_DAYS_ERROR) döner (ekran, sepet ve API aynı kontrol).
+    book_ids = list(dict.fromkeys(book_ids))
+    if not book_ids: return False, []
+    if not MIN_LOAN_DAYS <= days <= MAX_LOAN_DAYS:
+        return False, [(None, LOAN_DAYS_ERROR)]
+    due_date = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+    try:
+        with db.transaction(immediate=True) as conn:
+            # Kitap durumu + her kitap için ayrılan / sıradaki ilk üye: tek sorgu
+            problems, fulfil_ids = reservation_queue.lend_check(conn, member_id, book_ids)
+            if problems:
+                return False, problems
+            claimed = {row[0] for row in conn.execute(f"""
+                UPDATE books SET status = 'Ödünçte'
+                WHERE id IN ({_in(book_ids)}) AND status IN ('Müsait', 'Ayrıldı')
+                RETURNING id
+            """, book_ids).fetchall()}
+            if len(claimed) != len(book_ids):
+                raise _LostRace([book_id for book_id in book_ids if book_id not in claimed])
+            conn.executemany(
+                "INSERT INTO transactions (book_id, member_id, issue_date, due_date) VALUES (?, ?, DATE('now'), ?)",
+                [(book_id, member_id, due_date) for book_id in book_ids])
+            reservation_queue.fulfil(conn, fulfil_ids)
+    except _LostRace as e:
+        return False, [(book_id, "Kitap az önce başka bir işlemde ödünç verildi") for book_id in e.book_ids]
+    return True, []
+
+
+@db.retry_on_busy
+def checkin(loan_ids):
+    # Dönüş: (iade edilen sayısı, [(kitap, üye, telefon, son tarih)] sıradakine ayrılan kitaplar)
+    loan_ids = list(dict.fromkeys(loan_ids))
+    if not loan_ids: return 0, []
+    with db.transaction(immediate=True) as conn:
+        book_ids = [row[0] for row in conn.execute(f"""
+            UPDATE transactions SET return_date=DATE('now'), status='Tamamlandı'
+            WHERE status = 'Aktif' AND id IN ({_in(loan_ids)})
+            RETURNING book_id
+        """, loan_ids).fetchall()]
+        # Sırası olan kitap aynı işlemde sıradaki üyeye ayrılır, diğerleri rafa döner
+        held = reservation_queue.hand_off(conn, book_ids)
+    return len(book_ids), held
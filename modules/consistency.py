@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules import db_manager as db
+from modules import reservation_queue as rq
+
+# --- TUTARLILIK TARAMASI VE ONARIM ---
+# books.status ve ayrılmış rezervasyonlar, ödünç / iade / rezervasyon yollarında
+# transactions ve reservations ile aynı işlemde güncellenir; ama eski sürümler,
+# elle yapılan düzeltmeler ve create_db.py'nin eski örnek verisi aynı kitabı iki
+# kez ödünç vermiş, 'Ödünçte' görünüp aktif ödüncü olmayan kitaplar bırakmıştır.
+#
+# Tarama kitap başına birkaç toplama sorgusu (aktif ödünç, ayırma, bekleyen) ve
+# pandas üzerinde sütun karşılaştırmasıdır; satır satır döngü yoktur. Kitabın
+# olması gereken durumu:
+#   aktif ödüncü var            -> 'Ödünçte'
+#   değilse ayrılmış talebi var -> 'Ayrıldı'
+#   değilse sırada bekleyen var -> sıradaki ilk üyeye ayrılır (hand_off)
+#   hiçbiri                     -> 'Müsait'
+# 'Kayıp' ve başka şubeye yolda ('Transferde') olan kitaplara dokunulmaz. Onarım,
+# taramanın bulduğu kitapları BATCH_SIZE'lık partiler halinde, her partiyi BEGIN
+# IMMEDIATE altında yeniden tarayarak düzeltir (tarama ile onarım arasında masada
+# değişen kitap yanlışlıkla ezilmez).
+#
+#   python -m modules.consistency scan
+#   python -m modules.consistency repair [--fix-duplicates]
+
+BATCH_SIZE = 1000
+LOG_PATH = os.environ.get("AKYURT_CONSISTENCY_LOG", os.path.join("logs", "consistency.jsonl"))
+
+LENT = 'Ödünçte'
+LOST = 'Kayıp'
+HAND_OFF = '(sıradakine ayır)'
+
+# Sorun türleri (rapor anahtarları)
+DOUBLE_LOAN = "Birden çok aktif ödünç"
+LOAN_NOT_LENT = "Aktif ödünç var, kitap 'Ödünçte' değil"
+LENT_NO_LOAN = "'Ödünçte' ama aktif ödünç yok"
+HOLD_NOT_HELD = "Ayrılmış talep var, kitap 'Ayrıldı' değil"
+HELD_NO_HOLD = "'Ayrıldı' ama ayrılmış talep yok"
+QUEUE_ON_SHELF = "Rafta ama sırada bekleyen var"
+BAD_STATUS = "Geçersiz kitap durumu"
+HOLD_FULFILLED = "Ayrılan üye kitabı almış, talep açık"
+HOLD_WHILE_LENT = "Kitap başkasında, ayırma açık"
+EXTRA_HOLD = "Aynı kitapta birden çok ayırma"
+
+ISSUE_COLUMNS = ["kind", "book_id", "ref_id", "current", "target"]
+
+
+# --- OLGULAR (SET TABANLI SQL) ---
+def _facts(conn, book_ids=None):
+    # book_ids verilirse sadece o kitaplar (parti doğrulaması, json_each ile)
+    params = () if book_ids is None else (json.dumps([int(b) for b in book_ids]),)
+
+    def read(sql, column="book_id"):
+        only = "" if book_ids is None else f"AND {column} IN (SELECT value FROM json_each(?))"
+        return pd.read_sql(sql.format(only=only), conn, params=params)
+
+    return {
+        "books": read("SELECT id AS book_id, status FROM books WHERE 1 {only}", column="id"),
+        "loans": read("""SELECT id AS loan_id, book_id, member_id FROM transactions
+                         WHERE status = 'Aktif' {only}"""),
+        "holds": read("SELECT id AS res_id, book_id, member_id FROM reservations WHERE status = 'Ayrıldı' {only}"),
+        "waiting": read("""SELECT book_id, COUNT(*) AS waiting FROM reservations
+                           WHERE status = 'Bekliyor' {only} GROUP BY book_id"""),
+    }
+
+
+# --- KARŞILAŞTIRMA (VEKTÖREL) ---
+def diagnose(facts):
+    # Dönüş: ISSUE_COLUMNS sütunlu DataFrame (ref_id: ödünç / rezervasyon id)
+    books, loans, holds = facts["books"], facts["loans"], facts["holds"]
+    status = books.set_index("book_id")["status"]
+    index = status.index
+    active = loans.groupby("book_id").size().reindex(index, fill_value=0)
+    held = holds.groupby("book_id").size().reindex(index, fill_value=0)
+    waiting = facts["waiting"].set_index("book_id")["waiting"].reindex(index, fill_value=0)
+
+    target = pd.Series(np.select([active > 0, held > 0, waiting > 0], [LENT, rq.BOOK_HELD, HAND_OFF],
+                                 default=rq.BOOK_AVAILABLE), index=index)
+    known = status.isin([LENT, rq.BOOK_HELD, rq.BOOK_AVAILABLE])
+    wrong = ~status.isin([LOST, rq.BOOK_IN_TRANSIT]) & ((status != target) | (target == HAND_OFF))
+    kind = np.select([
+        ~known,
+        target == LENT,
+        status == LENT,
+        target == rq.BOOK_HELD,
+        status == rq.BOOK_HELD,
+    ], [BAD_STATUS, LOAN_NOT_LENT, LENT_NO_LOAN, HOLD_NOT_HELD, HELD_NO_HOLD], default=QUEUE_ON_SHELF)
+    book_issues = pd.DataFrame({"kind": kind, "book_id": index, "ref_id": None,
+                                "current": status.values, "target": target.values})[wrong.values]
+
+    # Aynı kitabın birden çok aktif ödüncü: en yenisi kalır, eskiler kapatılır
+    ordered = loans.sort_values("loan_id")
+    older = ordered[ordered.duplicated("book_id", keep="last")]
+    doubles = pd.DataFrame({"kind": DOUBLE_LOAN, "book_id": older["book_id"], "ref_id": older["loan_id"],
+                            "current": "Aktif", "target": "Tamamlandı"})
+
+    # Ödünçteki kitabın açık ayırması: alan ayıran üyeyse talep tamamlanmıştır,
+    # başkasıysa talep sıraya geri döner (kitap dönünce yeniden ayrılır)
+    on_loan = holds.merge(loans[["book_id", "member_id"]], on="book_id", how="inner", suffixes=("", "_loan"))
+    same = on_loan["member_id"] == on_loan["member_id_loan"]
+    lent_holds = on_loan.drop_duplicates("res_id")
+    fulfilled_ids = set(on_loan.loc[same, "res_id"])
+    hold_fixes = pd.DataFrame({
+        "kind": np.where(lent_holds["res_id"].isin(fulfilled_ids), HOLD_FULFILLED, HOLD_WHILE_LENT),
+        "book_id": lent_holds["book_id"], "ref_id": lent_holds["res_id"], "current": rq.HELD,
+        "target": np.where(lent_holds["res_id"].isin(fulfilled_ids), rq.FULFILLED, rq.WAITING)})
+    # Rafta bekleyen kitapta birden çok ayırma: en eskisi kalır
+    free_holds = holds[~holds["res_id"].isin(on_loan["res_id"])].sort_values("res_id")
+    extra = free_holds[free_holds.duplicated("book_id", keep="first")]
+    extras = pd.DataFrame({"kind": EXTRA_HOLD, "book_id": extra["book_id"], "ref_id": extra["res_id"],
+                           "current": rq.HELD, "target": rq.WAITING})
+
+    parts = [frame for frame in (book_issues, doubles, hold_fixes, extras) if not frame.empty]
+    if not parts:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[ISSUE_COLUMNS]
+
+
+def scan():
+    # Dönüş: (sorunlar DataFrame, süre sn)
+    start = time.perf_counter()
+    with db.connection() as conn:
+        conn.execute("BEGIN")  # dört sorgu aynı anlık görüntüyü okusun
+        try:
+            issues = diagnose(_facts(conn))
+        finally:
+            conn.rollback()
+    return issues, time.perf_counter() - start
+
+
+def summarize(issues):
+    return {kind: int(n) for kind, n in issues["kind"].value_counts().items()}
+
+
+# --- ONARIM (PARTİLER) ---
+def _apply(conn, issues, fix_duplicates):
+    # Dönüş: uygulanan sorunlar (aynı sütunlar)
+    applied = []
+    if fix_duplicates:
+        doubles = issues[issues["kind"] == DOUBLE_LOAN]
+        if not doubles.empty:
+            # Eski ödünç, aynı kitabın en yeni ödüncü verildiğinde iade edilmiş sayılır
+            conn.executemany("""
+                UPDATE transactions SET status = 'Tamamlandı', return_date = max(issue_date, (
+                    SELECT issue_date FROM transactions WHERE book_id = ? AND status = 'Aktif'
+                    ORDER BY id DESC LIMIT 1))
+                WHERE id = ? AND status = 'Aktif'
+            """, [(int(b), int(r)) for b, r in zip(doubles["book_id"], doubles["ref_id"])])
+            applied.append(doubles)
+
+    holds = issues[issues["kind"].isin([HOLD_FULFILLED, HOLD_WHILE_LENT, EXTRA_HOLD])]
+    if not holds.empty:
+        conn.executemany("""
+            UPDATE reservations SET status = ?, hold_until = CASE WHEN ? = 'Bekliyor' THEN NULL ELSE hold_until END
+            WHERE id = ? AND status = 'Ayrıldı'
+        """, [(t, t, int(r)) for t, r in zip(holds["target"], holds["ref_id"])])
+        applied.append(holds)
+
+    books = issues[issues["ref_id"].isna()]
+    direct = books[books["target"] != HAND_OFF]
+    if not direct.empty:
+        conn.executemany("UPDATE books SET status = ? WHERE id = ?",
+                         [(t, int(b)) for t, b in zip(direct["target"], direct["book_id"])])
+        applied.append(direct)
+    queued = books[books["target"] == HAND_OFF]
+    if not queued.empty:
+        rq.hand_off(conn, [int(b) for b in queued["book_id"]])
+        applied.append(queued.assign(target=rq.BOOK_HELD))
+    return pd.concat(applied, ignore_index=True) if applied else pd.DataFrame(columns=ISSUE_COLUMNS)
+
+
+@db.retry_on_busy
+def _repair_batch(book_ids, fix_duplicates):
+    # Parti yazma kilidi altında yeniden taranır; sadece hâlâ geçerli sorunlar düzeltilir
+    with db.transaction(immediate=True) as conn:
+        issues = diagnose(_facts(conn, book_ids))
+        return _apply(conn, issues, fix_duplicates) if not issues.empty else issues
+
+
+def repair(batch_size=BATCH_SIZE, fix_duplicates=False, progress=None):
+    # Dönüş: rapor sözlüğü; "changes" uygulanan düzeltmelerin DataFrame'i.
+    # Çift ödünçler fix_duplicates verilmedikçe sadece raporlanır (elle inceleme)
+    start = time.perf_counter()
+    issues, scan_seconds = scan()
+    book_ids = issues["book_id"].drop_duplicates().tolist()
+    changes = []
+    for i in range(0, len(book_ids), batch_size):
+        changes.append(_repair_batch(book_ids[i:i + batch_size], fix_duplicates))
+        if progress: progress(min(i + batch_size, len(book_ids)), len(book_ids))
+    changes = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=ISSUE_COLUMNS)
+    return {"found": summarize(issues), "changed": summarize(changes), "changes": changes,
+            "scan_seconds": scan_seconds, "seconds": time.perf_counter() - start}
+
+
+def write_log(mode, found, changed, seconds, path=LOG_PATH):
+    # Zamanlanmış çalıştırmaların izi: her çalıştırma bir JSON satırı
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = {"at": datetime.now().isoformat(timespec="seconds"), "mode": mode,
+             "found": found, "changed": changed, "seconds": round(seconds, 3)}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return entry
+
+
+def last_log(path=LOG_PATH):
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(os.path.getsize(path) - 64 * 1024, 0))
+            lines = f.read().decode("utf-8", "replace").splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="books.status / ödünç / rezervasyon tutarlılık taraması.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    scan_cmd = sub.add_parser("scan", help="Sadece tara (tutarsızlık varsa çıkış kodu 1)")
+    repair_cmd = sub.add_parser("repair", help="Tara ve düzelt (cron için)")
+    repair_cmd.add_argument("--batch", type=int, default=BATCH_SIZE, help="İşlem başına kitap")
+    repair_cmd.add_argument("--fix-duplicates", action="store_true",
+                            help="Çift ödünçlerde eski ödüncü kapat (varsayılan: sadece raporla)")
+    for cmd in (scan_cmd, repair_cmd):
+        cmd.add_argument("--csv", default=None, help="Ayrıntıların yazılacağı CSV")
+        cmd.add_argument("--no-log", action="store_true", help=f"{LOG_PATH} dosyasına yazma")
+    args = parser.parse_args(argv)
+
+    if args.command == "scan":
+        issues, seconds = scan()
+        found, changed, detail = summarize(issues), {}, issues
+    else:
+        def progress(done, total):
+            print(f"\r  {done:,} / {total:,} kitap", end="", file=sys.stderr, flush=True)
+
+        report = repair(args.batch, args.fix_duplicates, progress=progress)
+        print(file=sys.stderr)
+        found, changed, detail, seconds = report["found"], report["changed"], report["changes"], report["seconds"]
+
+    for kind, n in found.items():
+        done = f"  → düzeltilen {changed.get(kind, 0):,}" if args.command == "repair" else ""
+        print(f"  {kind:<45} {n:>8,}{done}")
+    if not found:
+        print("✅ Tutarsızlık yok.")
+    print(f"({seconds:.2f} sn)", file=sys.stderr)
+    if args.csv:
+        detail.to_csv(args.csv, index=False, encoding="utf-8-sig")
+    if not args.no_log:
+        write_log(args.command, found, changed, seconds)
+    remaining = sum(found.values()) - sum(changed.values())
+    return 1 if remaining else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
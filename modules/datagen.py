@@ -0,0 +1,307 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from multiprocessing import Pool
+
+from modules import migrations
+
+# --- YÜK TESTİ İÇİN SENTETİK VERİ ÜRETİCİ ---
+# Kullanım:
+#   python -m modules.datagen --db loadtest.db --seed 42 \
+#       --books 1000000 --members 200000 --transactions 10000000 --reservations 500000 --workers 4
+#
+# Aynı tohum (seed) ve boyutlar her zaman aynı veritabanını üretir; işçi sayısı
+# sonucu değiştirmez (her parça kendi tohumuyla üretilir, sırayla yazılır).
+# Veri önce indekssiz/tetikleyicisiz temel şemaya toplu executemany ile basılır,
+# indeksler, FTS ve KPI sayaçları en sonda göçlerle tek seferde kurulur.
+
+BASE_SCHEMA_VERSION = 1
+DEFAULT_BATCH_SIZE = 50_000
+LOAN_DAYS = 14
+
+# Toplu yükleme sırasında dayanıklılık gerekmez: dosya yarıda kalırsa baştan üretilir
+LOAD_PRAGMAS = (
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",  # ~256 MB
+)
+
+BOOK_TITLES = [
+    "Suç ve Ceza", "Sefiller", "Nutuk", "Kürk Mantolu Madonna",
+    "Saatleri Ayarlama Enstitüsü", "Simyacı", "Hayvan Çiftliği",
+    "1984", "Beyaz Diş", "Küçük Prens", "Dönüşüm", "Yabancı",
+    "İnce Memed", "Tutunamayanlar", "Çalıkuşu", "Aylak Adam",
+    "Serenad", "Huzur", "Beyaz Kale", "Sinekli Bakkal",
+]
+
+INSERT_SQL = {
+    "books": "INSERT INTO books (title, author, isbn, location, status) VALUES (?, ?, ?, ?, 'Müsait')",
+    "members": "INSERT INTO members (name, phone, email, join_date) VALUES (?, ?, ?, ?)",
+    "transactions": "INSERT INTO transactions (book_id, member_id, issue_date, due_date, return_date, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+    "reservations": "INSERT INTO reservations (book_id, member_id, request_date, status) VALUES (?, ?, ?, ?)",
+}
+
+_fake = None
+
+
+def _faker(seed):
+    # İşçi süreç başına tek Faker örneği; her parçada yeniden tohumlanır
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        _fake = Faker('tr_TR')
+    _fake.seed_instance(seed)
+    return _fake
+
+
+def _rng(seed, *parts):
+    # str tohumlar sha512 ile türetilir: süreçten / PYTHONHASHSEED'den bağımsız
+    return random.Random(":".join(str(p) for p in (seed,) + parts))
+
+
+def _skewed(rng, n):
+    # Popülerlik dağılımı: düşük id'li kayıtlar çok daha sık seçilir (uzun kuyruk)
+    return int(n * rng.random() ** 2.5) + 1
+
+
+def _isbn13(rng):
+    digits = [9, 7, 8] + [rng.randrange(10) for _ in range(9)]
+    check = (10 - sum(d * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return "".join(map(str, digits)) + str(check)
+
+
+def _day(d):
+    return d.strftime('%Y-%m-%d')
+
+
+def _days_ago(n):
+    # days[k] = bugünden k gün önceki tarih metni; satır başına strftime yerine
+    today = date.today()
+    return [_day(today - timedelta(days=k)) for k in range(n + 1)]
+
+
+# --- PARÇA ÜRETİCİLER (işçi süreçlerde çalışır) ---
+def _books_chunk(seed, index, count, opts):
+    rng = _rng(seed, "books", index)
+    fake = _faker(rng.randrange(2 ** 32))
+    # Faker satır başına pahalıdır; parça başına küçük bir havuz üretip örnekleriz
+    authors = [fake.name() for _ in range(min(count, 500))]
+    words = [fake.word().capitalize() for _ in range(min(count, 500))]
+    rows = []
+    for _ in range(count):
+        title = f"{rng.choice(BOOK_TITLES)} - {rng.choice(words)}"
+        location = f"Raf-{rng.randint(1, 20)}-{rng.choice('ABC')}"
+        rows.append((title, rng.choice(authors), _isbn13(rng), location))
+    return rows
+
+
+def _members_chunk(seed, index, count, opts):
+    rng = _rng(seed, "members", index)
+    fake = _faker(rng.randrange(2 ** 32))
+    names = [fake.name() for _ in range(min(count, 500))]
+    domains = ["gmail.com", "hotmail.com", "yandex.com", "outlook.com"]
+    today = date.today()
+    rows = []
+    for i in range(count):
+        name = rng.choice(names)
+        phone = f"05{rng.randint(30, 59)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}"
+        email = f"uye{index * opts['batch_size'] + i + 1}@{rng.choice(domains)}"
+        join_date = today - timedelta(days=rng.randint(0, 365 * opts['years']))
+        rows.append((name, phone, email, _day(join_date)))
+    return rows
+
+
+def _history_chunk(seed, index, count, opts):
+    # Tamamlanmış (iade edilmiş) geçmiş ödünçler; id sırası kabaca zaman sırasıdır.
+    # En sıcak döngü (milyonlarca satır): tarih metinleri önceden hesaplanır.
+    rng = _rng(seed, "history", index)
+    random_ = rng.random
+    span_days = 365 * opts['years']
+    days = _days_ago(span_days + 40)
+    books, members = opts['books'], opts['members']
+    total = max(opts['history'], 1)
+    first = index * opts['batch_size']
+    rows = []
+    for i in range(count):
+        age = 30 + span_days - span_days * (first + i) // total + int(random_() * 4)
+        due_age = age - LOAN_DAYS
+        if random_() < 0.15:
+            # ~%15 geç iade
+            returned = max(due_age - 1 - int(random_() * 20), 0)
+        else:
+            returned = age - 1 - int(random_() * LOAN_DAYS)
+        rows.append((int(books * random_() ** 2.5) + 1, int(members * random_() ** 2.5) + 1,
+                     days[age], days[due_age], days[returned], 'Tamamlandı'))
+    return rows
+
+
+def _active_chunk(seed, index, book_ids, opts):
+    rng = _rng(seed, "active", index)
+    days = _days_ago(90)
+    rows = []
+    for book_id in book_ids:
+        if rng.random() < opts['overdue_rate']:
+            age = rng.randint(LOAN_DAYS + 1, 90)
+        else:
+            age = rng.randint(0, LOAN_DAYS - 1)
+        # Teslim tarihi gelecekte olabilir: bugünden (LOAN_DAYS - age) gün sonra
+        due = days[age - LOAN_DAYS] if age >= LOAN_DAYS else _day(date.today() + timedelta(days=LOAN_DAYS - age))
+        rows.append((book_id, _skewed(rng, opts['members']), days[age], due, None, 'Aktif'))
+    return rows
+
+
+def _reservations_chunk(seed, index, count, waiting_books, opts):
+    # İlk len(waiting_books) satır ödünçteki kitaplar için bekleyen taleplerdir
+    rng = _rng(seed, "reservations", index)
+    today = date.today()
+    rows = []
+    for i in range(count):
+        if i < len(waiting_books):
+            book_id = waiting_books[i]
+            request = today - timedelta(days=rng.randint(0, LOAN_DAYS))
+            status = 'Bekliyor'
+        else:
+            book_id = _skewed(rng, opts['books'])
+            request = today - timedelta(days=rng.randint(LOAN_DAYS, 365 * opts['years']))
+            status = 'Tamamlandı' if rng.random() < 0.8 else 'İptal'
+        rows.append((book_id, _skewed(rng, opts['members']), _day(request), status))
+    return rows
+
+
+def _run_task(task):
+    table, func, args = task
+    return table, func(*args)
+
+
+def _tasks(seed, opts, active_books, waiting_books):
+    batch = opts['batch_size']
+
+    def split(total):
+        for index, start in enumerate(range(0, total, batch)):
+            yield index, min(batch, total - start)
+
+    for index, count in split(opts['books_n']):
+        yield "books", _books_chunk, (seed, index, count, opts)
+    for index, count in split(opts['members_n']):
+        yield "members", _members_chunk, (seed, index, count, opts)
+    for index, count in split(opts['history']):
+        yield "transactions", _history_chunk, (seed, index, count, opts)
+    for index, start in enumerate(range(0, len(active_books), batch)):
+        yield "transactions", _active_chunk, (seed, index, active_books[start:start + batch], opts)
+    for index, count in split(opts['reservations_n']):
+        start = index * batch
+        yield "reservations", _reservations_chunk, (seed, index, count, waiting_books[start:start + count], opts)
+
+
+def generate(path, seed=42, books=10_000, members=2_000, transactions=50_000, reservations=2_000,
+             batch_size=DEFAULT_BATCH_SIZE, workers=1, active_rate=0.1, overdue_rate=0.3,
+             reserved_rate=0.2, years=5, verbose=True):
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} zaten var (üzerine yazmak için --force)")
+
+    # Ödünçteki kitaplar: her kitabın en fazla bir aktif ödüncü olur
+    plan_rng = _rng(seed, "plan")
+    n_active = min(int(books * active_rate), transactions)
+    active_books = sorted(plan_rng.sample(range(1, books + 1), n_active)) if n_active else []
+    waiting = [b for b in active_books if plan_rng.random() < reserved_rate]
+    waiting_books = [b for b in waiting for _ in range(plan_rng.randint(1, 3))][:reservations]
+
+    # Her işe kopyalanan küçük ayar sözlüğü (büyük listeler ayrı dilimlenir)
+    opts = {
+        "batch_size": batch_size, "years": years, "overdue_rate": overdue_rate,
+        "books": books, "members": members, "books_n": books, "members_n": members,
+        "history": transactions - n_active, "reservations_n": reservations,
+    }
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    migrations.migrate(conn, target=BASE_SCHEMA_VERSION)
+
+    started = time.perf_counter()
+    counts = {}
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        tasks = _tasks(seed, opts, active_books, waiting_books)
+        results = pool.imap(_run_task, tasks) if pool else map(_run_task, tasks)
+        current = None
+        table_started = started
+        for table, rows in results:
+            if table != current:
+                if current is not None:
+                    conn.execute("COMMIT")
+                    _report(verbose, current, counts[current], table_started)
+                current, table_started = table, time.perf_counter()
+                conn.execute("BEGIN")
+            conn.executemany(INSERT_SQL[table], rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+        if current is not None:
+            conn.execute("COMMIT")
+            _report(verbose, current, counts[current], table_started)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    conn.execute("BEGIN")
+    conn.execute("UPDATE books SET status = 'Ödünçte' "
+                 "WHERE id IN (SELECT book_id FROM transactions WHERE status = 'Aktif')")
+    conn.execute("COMMIT")
+
+    # İndeksler, FTS ve özet tablolar toplu olarak (satır satır tetikleyici yerine)
+    index_started = time.perf_counter()
+    migrations.migrate(conn, verbose=verbose)
+    if verbose:
+        print(f"🛠️ İndeksler ve türetilmiş tablolar: {time.perf_counter() - index_started:.1f} sn")
+
+    conn.execute("PRAGMA locking_mode=NORMAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    if verbose:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"✅ {path}: {size_mb:,.0f} MB, toplam {time.perf_counter() - started:.1f} sn")
+    return counts
+
+
+def _report(verbose, table, count, started):
+    if verbose:
+        elapsed = time.perf_counter() - started
+        print(f"📚 {table}: {count:,} satır, {elapsed:.1f} sn ({count / max(elapsed, 1e-9):,.0f} satır/sn)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yük testi için deterministik sentetik kütüphane veritabanı üretir.")
+    parser.add_argument("--db", default="loadtest.db", help="Üretilecek veritabanı dosyası")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--members", type=int, default=2_000)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--reservations", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Faker üretimi için işçi süreç sayısı")
+    parser.add_argument("--active-rate", type=float, default=0.1, help="Şu an ödünçte olan kitap oranı")
+    parser.add_argument("--overdue-rate", type=float, default=0.3, help="Aktif ödünçlerde gecikmiş oranı")
+    parser.add_argument("--reserved-rate", type=float, default=0.2, help="Sırada bekleyeni olan ödünç oranı")
+    parser.add_argument("--years", type=int, default=5, help="Geçmiş ödünçlerin yayıldığı yıl sayısı")
+    parser.add_argument("--force", action="store_true", help="Var olan dosyanın üzerine yaz")
+    args = parser.parse_args(argv)
+
+    if args.force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    generate(args.db, seed=args.seed, books=args.books, members=args.members,
+             transactions=args.transactions, reservations=args.reservations,
+             batch_size=args.batch_size, workers=args.workers, active_rate=args.active_rate,
+             overdue_rate=args.overdue_rate, reserved_rate=args.reserved_rate, years=args.years)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import functools
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from modules import instrumentation
+
+# --- AYARLAR ---
+# Veritabanı yolu ortam değişkeniyle değiştirilebilir (test / yük testi kopyaları için)
+DB_PATH = os.environ.get("AKYURT_DB_PATH", "library.db")
+POOL_SIZE = int(os.environ.get("AKYURT_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = 5000
+# busy_timeout dolduktan sonra (veya WAL anlık görüntüsü eskidiği için SQLite
+# beklemeden SQLITE_BUSY döndüğünde) yazma işlemi baştan en fazla bu kadar tekrarlanır
+BUSY_RETRIES = int(os.environ.get("AKYURT_BUSY_RETRIES", "5"))
+BUSY_BACKOFF_MS = 20
+BUSY_BACKOFF_MAX_MS = 1000
+STATEMENT_CACHE_SIZE = 256
+
+# Her yeni bağlantıda bir kez çalışır; istek yolunda tekrar edilmez.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Okuyucular yazıcıyı beklemez
+    "PRAGMA synchronous=NORMAL",  # WAL ile güvenli, her commit'te fsync yok
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",  # ~16 MB sayfa önbelleği (bağlantı başına)
+    "PRAGMA mmap_size=134217728",  # 128 MB bellek eşlemeli okuma
+)
+
+
+# --- BAĞLANTI HAVUZU ---
+# Süreç başına uzun ömürlü SQLite bağlantıları. Streamlit her oturumu ayrı bir
+# iş parçacığında çalıştırır; her iş parçacığı havuzdan bir bağlantı ödünç alır
+# ve işi bitince geri bırakır. Havuz doluysa bekleyenler sırayla (FIFO) hizmet
+# alır: geri bırakılan bağlantı doğrudan en eski bekleyene verilir, yeni gelen
+# iş parçacığı araya giremez (yoğun yazmada bekleyenler aç kalmaz).
+class PoolTimeout(sqlite3.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.pid = os.getpid()
+        self._idle = []
+        self._waiters = deque()  # [olay, bağlantı]
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _connect(self):
+        # isolation_level=None: işlemleri (BEGIN/COMMIT) transaction() açıkça yönetir
+        # factory: SQL ölçümü (modules/instrumentation.py), AKYURT_INSTRUMENT=0 ile kapanır
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE,
+                               factory=instrumentation.connection_factory())
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                if self._idle:
+                    return self._idle.pop()
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+                else:
+                    waiter = [threading.Event(), None]
+                    self._waiters.append(waiter)
+            if can_create:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    # Yuva geri verilir; bekleyen biri bağlantısız uyandırılır, yuvayı kendisi açar
+                    with self._lock:
+                        self._created -= 1
+                        if self._waiters:
+                            self._waiters.popleft()[0].set()
+                    raise
+                self._all.append(conn)
+                return conn
+            if not waiter[0].wait(BUSY_TIMEOUT_MS / 1000):
+                with self._lock:
+                    # Süre dolarken bağlantı verilmiş ya da yuva açılmış olabilir
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        raise PoolTimeout("Bağlantı havuzu dolu")
+            if waiter[1] is not None:
+                return waiter[1]
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = conn
+                waiter[0].set()
+            else:
+                self._idle.append(conn)
+
+    def close_all(self):
+        for conn in self._all:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._all = []
+        self._created = 0
+        self._idle = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Her başarılı yazma işleminde artan sayaç; önbellekler anahtarına ekleyerek
+# eski sonuçları kendiliğinden geçersiz sayar.
+_write_generation = 0
+_generation_lock = threading.Lock()
+
+# Sadece PRAGMA data_version okuyan, hiç yazmayan ayrı bağlantı. Değeri BAŞKA bir
+# bağlantının (havuzdakiler, diğer süreçler: CLI aktarımı, bildirim işi) her
+# commit'inde değişir; write_generation ise yalnızca bu sürecin yazmalarını görür.
+_watcher = None
+_watcher_serial = 0
+_watcher_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    pool = _pool
+    # fork sonrası üst sürecin bağlantıları kullanılmaz
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    from modules import migrations
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            pool = ConnectionPool(DB_PATH)
+            conn = pool.acquire()
+            try:
+                # Şema göçleri süreç başına bir kez, istek yolunun dışında
+                migrations.migrate(conn)
+            finally:
+                pool.release(conn)
+            _pool = pool
+        return _pool
+
+
+def reset_pool():
+    global _pool, _watcher
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close_all()
+        _pool = None
+    with _watcher_lock:
+        if _watcher is not None and _watcher[0] == os.getpid():
+            _watcher[1].close()
+        _watcher = None
+
+
+def write_generation():
+    return _write_generation
+
+
+def bump_write_generation():
+    global _write_generation
+    with _generation_lock:
+        _write_generation += 1
+
+
+def data_version():
+    # Veritabanı değişti mi? (~5 µs). Dönen değer sadece eşitlik için karşılaştırılır:
+    # (gözcü bağlantı no, PRAGMA data_version); havuz sıfırlanınca da değişir.
+    global _watcher, _watcher_serial
+    with _watcher_lock:
+        if _watcher is None or _watcher[0] != os.getpid():
+            get_pool()  # göçler gözcü açılmadan önce uygulanır
+            _watcher_serial += 1
+            _watcher = (os.getpid(), sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None))
+        return _watcher_serial, _watcher[1].execute("PRAGMA data_version").fetchone()[0]
+
+
+# --- BAĞLANTI / İŞLEM YÖNETİMİ ---
+@contextmanager
+def connection():
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(immediate=False):
+    # Hata olursa tüm değişiklikler geri alınır.
+    # immediate=True: yazma kilidi baştan alınır; önce okuyup sonra yazan
+    # (kontrol + güncelle) işlemler arada başka bir yazıcıyla çakışmaz.
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+            bump_write_generation()
+
+
+# --- MEŞGUL VERİTABANI: SINIRLI TEKRAR ---
+class DatabaseBusy(sqlite3.OperationalError):
+    # Tüm denemeler kilit yüzünden başarısız oldu
+    pass
+
+
+_busy_stats = {"retries": 0, "failures": 0}
+_busy_lock = threading.Lock()
+
+
+def is_busy(error):
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+
+def _count_busy(key):
+    with _busy_lock:
+        _busy_stats[key] += 1
+
+
+def busy_stats():
+    with _busy_lock:
+        return dict(_busy_stats)
+
+
+def retry_on_busy(func):
+    # "database is locked" hatasında tüm işlemi artan + rastgele beklemeyle yeniden
+    # çalıştırır. Sarılan fonksiyon kendi transaction() bloğunu açmalıdır: hata anında
+    # işlem geri alındığı için tekrar çalıştırmak güvenlidir.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or isinstance(e, DatabaseBusy): raise
+                if attempt == BUSY_RETRIES:
+                    _count_busy("failures")
+                    raise DatabaseBusy(f"Veritabanı meşgul ({attempt + 1} deneme): {e}") from e
+                _count_busy("retries")
+                delay = min(BUSY_BACKOFF_MS * 2 ** attempt, BUSY_BACKOFF_MAX_MS)
+                time.sleep(random.uniform(delay / 2, delay) / 1000)
+    return wrapper
+
+
+# --- SORGU YARDIMCILARI ---
+def fetch_all(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def fetch_one(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def fetch_value(sql, params=(), default=None):
+    row = fetch_one(sql, params)
+    return row[0] if row is not None else default
+
+
+@retry_on_busy
+def execute(sql, params=()):
+    with transaction() as conn:
+        cur = conn.execute(sql, params)
+        return cur.rowcount
+
+
+def read_df(sql, params=()):
+    import pandas as pd
+
+    with connection() as conn:
+        return pd.read_sql(sql, conn, params=params)
@@ -0,0 +1,288 @@
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# --- SQL VE SAYFA ÇİZİM ÖLÇÜMÜ ---
+# Havuzdaki her bağlantı InstrumentedConnection ile açılır; böylece hem
+# conn.execute hem pd.read_sql (cursor() üzerinden) ölçülür. Her ifade için
+# metin, parametre sayısı, dönen/etkilenen satır ve süre (execute + fetch)
+# kaydedilir. SLOW_QUERY_MS eşiğini aşan ifadelerin EXPLAIN QUERY PLAN çıktısı
+# bir kez alınır, tam tablo taramaları işaretlenir ve dönen günlüğe yazılır.
+# Menü / görünüm çizim süreleri section() ile kaydedilir.
+
+ENABLED = os.environ.get("AKYURT_INSTRUMENT", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("AKYURT_SLOW_QUERY_MS", "50"))
+LOG_PATH = os.environ.get("AKYURT_PERF_LOG", os.path.join("logs", "perf.log"))
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+MAX_STATEMENTS = 2000  # Farklı ifade metni sınırı (bellek)
+RECENT_SLOW = 200
+
+# Planı anlamlı olan ifadeler (BEGIN/COMMIT/PRAGMA vb. hariç)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_lock = threading.Lock()
+_statements = {}  # sql -> toplu istatistik
+_sections = {}  # menü/görünüm -> toplu istatistik
+_recent_slow = deque(maxlen=RECENT_SLOW)
+_section = contextvars.ContextVar("akyurt_section", default=None)
+_logger = None
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+def _bind_count(params):
+    try:
+        return len(params)
+    except TypeError:
+        return 0
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        with _lock:
+            if _logger is None:
+                logger = logging.getLogger("akyurt.perf")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                try:
+                    os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+                    handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                                                  backupCount=LOG_BACKUPS, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                except OSError:
+                    logger.addHandler(logging.NullHandler())
+                _logger = logger
+    return _logger
+
+
+def _log(event):
+    event["ts"] = datetime.now().isoformat(timespec="milliseconds")
+    _get_logger().info(json.dumps(event, ensure_ascii=False))
+
+
+# --- SORGU PLANI ---
+def explain(conn, sql, params=()):
+    # Ölçülmeyen düz bir imleçle çalışır (kendi kaydını üretmez)
+    cur = sqlite3.Cursor(conn)
+    try:
+        return [row[3] for row in cur.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    finally:
+        cur.close()
+
+
+def is_full_scan(detail):
+    # "SCAN books" tam tablo taraması; "SCAN t USING INDEX ..." ve sanal tablolar değil
+    return detail.startswith("SCAN ") and " USING " not in detail and "VIRTUAL TABLE" not in detail
+
+
+# --- KAYIT ---
+def record_statement(conn, sql, params, rows, elapsed_ms, error=None):
+    text = _normalize(sql)
+    section = _section.get()
+    with _lock:
+        entry = _statements.get(text)
+        if entry is None:
+            if len(_statements) >= MAX_STATEMENTS: return
+            entry = _statements[text] = {
+                "sql": text, "binds": _bind_count(params), "count": 0, "total_ms": 0.0,
+                "max_ms": 0.0, "rows": 0, "errors": 0, "slow": 0, "plan": None,
+                "full_scan": False, "sections": set(),
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["rows"] += max(rows, 0)
+        if error: entry["errors"] += 1
+        if section: entry["sections"].add(section)
+        slow = elapsed_ms >= SLOW_QUERY_MS
+        if slow: entry["slow"] += 1
+        need_plan = slow and entry["plan"] is None and text.lstrip("( ").upper().startswith(_EXPLAINABLE)
+
+    if not slow: return
+    plan = None
+    if need_plan:
+        try:
+            plan = explain(conn, sql, params)
+        except sqlite3.Error:
+            plan = []
+        with _lock:
+            entry["plan"] = plan
+            entry["full_scan"] = any(is_full_scan(detail) for detail in plan)
+    event = {"type": "slow_sql", "sql": text, "binds": _bind_count(params), "rows": rows,
+             "ms": round(elapsed_ms, 2), "section": section}
+    if plan is not None: event["plan"] = plan
+    if error: event["error"] = error
+    with _lock:
+        _recent_slow.append(event)
+    _log(event)
+
+
+def record_section(name, elapsed_ms, kind="menu"):
+    with _lock:
+        entry = _sections.setdefault(name, {"name": name, "kind": kind, "count": 0, "total_ms": 0.0,
+                                            "max_ms": 0.0, "last_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["last_ms"] = elapsed_ms
+    _log({"type": kind, "name": name, "ms": round(elapsed_ms, 2)})
+
+
+@contextmanager
+def section(name, kind="menu"):
+    # Bu blokta çalışan SQL ifadeleri menü/görünüm adıyla etiketlenir
+    token = _section.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _section.reset(token)
+        record_section(name, (time.perf_counter() - start) * 1000, kind)
+
+
+# --- RAPORLAMA ---
+def top_statements(n=20, key="max_ms"):
+    with _lock:
+        rows = [dict(e, sections=sorted(e["sections"])) for e in _statements.values()]
+    for row in rows:
+        row["avg_ms"] = row["total_ms"] / row["count"] if row["count"] else 0.0
+    return sorted(rows, key=lambda r: r[key], reverse=True)[:n]
+
+
+def full_scans():
+    with _lock:
+        return [dict(e, sections=sorted(e["sections"])) for e in _statements.values() if e["full_scan"]]
+
+
+def sections():
+    with _lock:
+        rows = [dict(e) for e in _sections.values()]
+    for row in rows:
+        row["avg_ms"] = row["total_ms"] / row["count"] if row["count"] else 0.0
+    return sorted(rows, key=lambda r: r["avg_ms"], reverse=True)
+
+
+def recent_slow():
+    with _lock:
+        return list(reversed(_recent_slow))
+
+
+def reset():
+    with _lock:
+        _statements.clear()
+        _sections.clear()
+        _recent_slow.clear()
+
+
+# --- ÖLÇÜLEN BAĞLANTI / İMLEÇ ---
+# Süre execute ile başlar, fetch çağrılarıyla birikir; imleç tükenince,
+# yeni bir execute yapılınca, kapatılınca veya çöpe gidince kayıt tamamlanır.
+class InstrumentedCursor(sqlite3.Cursor):
+    _pending = None
+
+    def _begin(self, sql, params, elapsed):
+        if self.description is None:
+            # DML / DDL: satır yok, etkilenen satır sayısı hemen belli
+            record_statement(self.connection, sql, params, self.rowcount, elapsed * 1000)
+        else:
+            self._pending = [sql, params, 0, elapsed]
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, rows, elapsed = pending
+            record_statement(self.connection, sql, params, rows, elapsed * 1000)
+
+    def _fetched(self, start, count):
+        if self._pending is not None:
+            self._pending[2] += count
+            self._pending[3] += time.perf_counter() - start
+
+    def execute(self, sql, params=()):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            super().execute(sql, params)
+        except sqlite3.Error as exc:
+            record_statement(self.connection, sql, params, -1, (time.perf_counter() - start) * 1000,
+                             error=str(exc))
+            raise
+        self._begin(sql, params, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_params)
+        record_statement(self.connection, sql, (), self.rowcount, (time.perf_counter() - start) * 1000)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None)
+        if row is None: self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows))
+        if len(rows) < size: self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._finish()
+            raise
+        self._fetched(start, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def connection_factory():
+    return InstrumentedConnection if ENABLED else sqlite3.Connection
@@ -0,0 +1,155 @@
+from functools import lru_cache
+
+from modules import catalog_cache
+from modules import db_manager as db
+from modules.search import build_match, fold_tr
+
+# --- YAZDIKÇA ARA (TYPEAHEAD) SORGULARI ---
+# Seçim kutularına tüm tablo yerine her aramada en fazla LOOKUP_LIMIT kayıt
+# gönderilir. Sonuçlar (sorgu, yazma sayacı) anahtarıyla sınırlı bir LRU
+# önbellekte tutulur; herhangi bir yazma işlemi sayacı artırdığı için eski
+# sonuçlar bir daha kullanılmaz. Üye araması ve aramasız kitap listesi süreç
+# geneli katalog önbelleğinden (catalog_cache) gelir; ödünç / iade yazmaları
+# onları geçersiz kılmaz.
+
+LOOKUP_LIMIT = 20
+LOOKUP_CACHE_SIZE = 512
+
+
+def _prefix_range(text):
+    # "ayş" -> name_key >= 'ays' AND name_key < 'ays\uffff' (indeks aralık taraması)
+    key = fold_tr(text.strip())
+    return key, key + "\uffff"
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _find_members(text, limit, generation):
+    if not text:
+        rows = db.fetch_all("SELECT id, name, phone FROM members ORDER BY id LIMIT ?", (limit,))
+    elif text.isdigit():
+        # Sadece rakam: üye numarası veya telefon öneki
+        rows = db.fetch_all("""
+            SELECT id, name, phone FROM members
+            WHERE id = ? OR (phone >= ? AND phone < ?)
+            ORDER BY id LIMIT ?
+        """, (int(text), text, text + "\uffff", limit))
+    else:
+        lo, hi = _prefix_range(text)
+        rows = db.fetch_all("""
+            SELECT id, name, phone FROM members
+            WHERE name_key >= ? AND name_key < ?
+            ORDER BY id LIMIT ?
+        """, (lo, hi, limit))
+    return tuple((row[0], f"{row[1]} ({row[2]})") for row in rows)
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _find_books(text, status, limit, generation):
+    # status: None (hepsi) veya durum demeti, ör. ('Müsait', 'Ayrıldı')
+    status_sql = "" if status is None else f"AND b.status IN ({','.join('?' * len(status))})"
+    status_args = () if status is None else status
+    match = build_match(text)
+    if match is None:
+        rows = db.fetch_all(f"""
+            SELECT b.id, b.title, b.author, b.location, b.status FROM books b
+            WHERE 1 {status_sql}
+            ORDER BY b.id LIMIT ?
+        """, status_args + (limit,))
+    else:
+        # FTS5 önek indeksi (books_fts, prefix='2 3')
+        rows = db.fetch_all(f"""
+            SELECT b.id, b.title, b.author, b.location, b.status FROM books b
+            WHERE b.id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?) {status_sql}
+            ORDER BY b.id LIMIT ?
+        """, (match,) + status_args + (limit,))
+    return tuple((row[0], catalog_cache.book_label(*row[1:])) for row in rows)
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _find_active_loans(text, limit, overdue_day, generation):
+    # overdue_day: verilirse yalnızca teslim tarihi o gün veya öncesi olanlar (gecikenler)
+    base = """
+        SELECT t.id, b.title, m.name, b.id FROM transactions t
+        JOIN books b ON t.book_id = b.id
+        JOIN members m ON t.member_id = m.id
+        WHERE t.status = 'Aktif'
+    """
+    args = ()
+    if overdue_day is not None:
+        base += " AND t.due_date <= ?"
+        args = (overdue_day,)
+    match = build_match(text)
+    if match is None:
+        # Arama yoksa en eski teslim tarihli ödünçler (kısmi indeks sırası)
+        rows = db.fetch_all(base + " ORDER BY t.due_date LIMIT ?", args + (limit,))
+    else:
+        lo, hi = _prefix_range(text)
+        rows = db.fetch_all(base + """
+            AND (t.book_id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)
+                 OR t.member_id IN (SELECT id FROM members WHERE name_key >= ? AND name_key < ?))
+            ORDER BY t.id LIMIT ?
+        """, args + (match, lo, hi, limit))
+    return tuple(((row[0], row[3]), f"{row[1]} - {row[2]}") for row in rows)
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _find_reservations(text, limit, generation):
+    # Bekleyen veya ayrılmış talepler; rakam: talep no, metin: kitap (FTS) veya üye adı öneki
+    base = """
+        SELECT r.id, b.title, m.name, r.status FROM reservations r
+        JOIN books b ON r.book_id = b.id
+        JOIN members m ON r.member_id = m.id
+        WHERE r.status IN ('Bekliyor', 'Ayrıldı')
+    """
+    match = build_match(text)
+    if match is None:
+        rows = db.fetch_all(base + " ORDER BY r.id LIMIT ?", (limit,))
+    elif text.isdigit():
+        rows = db.fetch_all(base + " AND r.id = ?", (int(text),))
+    else:
+        lo, hi = _prefix_range(text)
+        rows = db.fetch_all(base + """
+            AND (r.book_id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)
+                 OR r.member_id IN (SELECT id FROM members WHERE name_key >= ? AND name_key < ?))
+            ORDER BY r.id LIMIT ?
+        """, (match, lo, hi, limit))
+    return tuple((row[0], f"#{row[0]} {row[1]} - {row[2]} ({row[3]})") for row in rows)
+
+
+# --- GENEL API: [(değer, etiket), ...] döndürür ---
+def find_members(text="", limit=LOOKUP_LIMIT):
+    text = (text or "").strip()
+    cached = catalog_cache.find_members(text, int(limit))
+    if cached is not None: return cached
+    return _find_members(text, int(limit), db.write_generation())
+
+
+def find_books(text="", status=None, limit=LOOKUP_LIMIT):
+    # status: tek durum ('Müsait') veya birden çok durum (('Müsait', 'Ayrıldı'))
+    if isinstance(status, str):
+        status = (status,)
+    elif status is not None:
+        status = tuple(status)
+    text = (text or "").strip()
+    if not text and catalog_cache.available("books"):
+        return list(catalog_cache.get_books_dict(status, int(limit)).items())
+    return _find_books(text, status, int(limit), db.write_generation())
+
+
+def find_active_loans(text="", limit=LOOKUP_LIMIT, overdue=False):
+    # Değer: (işlem id, kitap id). overdue=True: yalnızca gecikenler (SMS paneli);
+    # gün önbellek anahtarındadır, gece yarısı yazma olmasa da liste yenilenir.
+    day = db.fetch_value("SELECT DATE('now')") if overdue else None
+    return _find_active_loans((text or "").strip(), int(limit), day, db.write_generation())
+
+
+def find_reservations(text="", limit=LOOKUP_LIMIT):
+    # Değer: talep id (iptal seçimi)
+    return _find_reservations((text or "").strip(), int(limit), db.write_generation())
+
+
+def clear_cache():
+    _find_members.cache_clear()
+    _find_books.cache_clear()
+    _find_active_loans.cache_clear()
+    _find_reservations.cache_clear()
@@ -0,0 +1,561 @@
+import sqlite3
+
+from modules.search import fold_sql, search_fold_sql, search_isbn_sql
+
+# Teslim tarihi olmayan aktif ödünç hiçbir zaman gecikmiş sayılmaz
+DUE_KEY_SQL = "coalesce({col}, '9999-12-31')"
+
+
+def _due_inc_sql(row):
+    return (f"INSERT INTO active_loans_by_due (due_date, n) "
+            f"VALUES ({DUE_KEY_SQL.format(col=row + '.due_date')}, 1) "
+            f"ON CONFLICT(due_date) DO UPDATE SET n = n + 1;")
+
+
+def _due_dec_sql(row):
+    key = DUE_KEY_SQL.format(col=row + ".due_date")
+    return (f"UPDATE active_loans_by_due SET n = n - 1 WHERE due_date = {key}; "
+            f"DELETE FROM active_loans_by_due WHERE due_date = {key} AND n <= 0;")
+
+
+# --- ŞEMA GÖÇLERİ (MIGRATIONS) ---
+# Her göç (sürüm, açıklama, adımlar) şeklindedir. Adımlar sırayla tek bir işlem
+# içinde çalışır ve sonunda PRAGMA user_version göç numarasına çekilir.
+# Uygulanmış bir göç ASLA değiştirilmez; yeni değişiklik = yeni numara.
+
+MIGRATIONS = [
+    (1, "Temel şema", (
+        '''
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            isbn TEXT,
+            location TEXT,
+            status TEXT DEFAULT 'Müsait' -- Müsait, Ödünçte, Kayıp
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            join_date DATE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INTEGER,
+            member_id INTEGER,
+            issue_date DATE,
+            due_date DATE,
+            return_date DATE,
+            status TEXT DEFAULT 'Aktif', -- Aktif, Tamamlandı
+            FOREIGN KEY (book_id) REFERENCES books (id),
+            FOREIGN KEY (member_id) REFERENCES members (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INTEGER,
+            member_id INTEGER,
+            request_date DATE,
+            status TEXT DEFAULT 'Bekliyor', -- Bekliyor, Tamamlandı, İptal
+            FOREIGN KEY (book_id) REFERENCES books (id),
+            FOREIGN KEY (member_id) REFERENCES members (id)
+        )
+        ''',
+    )),
+    (2, "Sıcak sorgu indeksleri ve ISO teslim tarihleri", (
+        # Teslim tarihleri 'YYYY-MM-DD' metnine normalize edilir; böylece
+        # "due_date <= DATE('now')" indeks üzerinde aralık taramasına dönüşür.
+        "UPDATE transactions SET due_date = DATE(due_date) "
+        "WHERE due_date IS NOT NULL AND due_date <> DATE(due_date)",
+        "UPDATE transactions SET issue_date = DATE(issue_date) "
+        "WHERE issue_date IS NOT NULL AND issue_date <> DATE(issue_date)",
+        "UPDATE reservations SET request_date = DATE(request_date) "
+        "WHERE request_date IS NOT NULL AND request_date <> DATE(request_date)",
+
+        # Aktif ödünçler: panel, iade ekranı ve gecikme listesi (kısmi + kapsayan)
+        "CREATE INDEX IF NOT EXISTS idx_transactions_active_due "
+        "ON transactions(due_date, member_id, book_id) WHERE status = 'Aktif'",
+        # Üye silme kontrolü / üye geçmişi
+        "CREATE INDEX IF NOT EXISTS idx_transactions_member_status ON transactions(member_id, status)",
+        # Kitap bazlı ödünç geçmişi
+        "CREATE INDEX IF NOT EXISTS idx_transactions_book_status ON transactions(book_id, status)",
+
+        # Bekleyen rezervasyonlar: kitap başına sıra (request_date sıralı) ve genel liste
+        "CREATE INDEX IF NOT EXISTS idx_reservations_waiting_book "
+        "ON reservations(book_id, request_date, member_id) WHERE status = 'Bekliyor'",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_waiting_date "
+        "ON reservations(request_date) WHERE status = 'Bekliyor'",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_member_book ON reservations(member_id, book_id, status)",
+
+        # Müsait / Ödünçte kitap listeleri
+        "CREATE INDEX IF NOT EXISTS idx_books_status ON books(status)",
+
+        # Üye aramaları
+        "CREATE INDEX IF NOT EXISTS idx_members_name ON members(name)",
+        "CREATE INDEX IF NOT EXISTS idx_members_phone ON members(phone)",
+    )),
+    (3, "FTS5 katalog arama indeksi", (
+        # Katlanmış (folded) metin saklanır: 'ı' -> 'i' burada, geri kalan Türkçe
+        # harfler (İ, Ş, Ğ, Ü, Ö, Ç) ve büyük/küçük harf tokenizer'da katlanır.
+        # Bkz. modules/search.py
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+            title, author, isbn, location,
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3'
+        )
+        ''',
+        f'''
+        INSERT INTO books_fts(rowid, title, author, isbn, location)
+        SELECT id, {search_fold_sql("title")}, {search_fold_sql("author")},
+               {search_isbn_sql("isbn")}, {search_fold_sql("location")}
+        FROM books
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_insert AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts(rowid, title, author, isbn, location)
+            VALUES (new.id, {search_fold_sql("new.title")}, {search_fold_sql("new.author")},
+                    {search_isbn_sql("new.isbn")}, {search_fold_sql("new.location")});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_update
+        AFTER UPDATE OF id, title, author, isbn, location ON books BEGIN
+            DELETE FROM books_fts WHERE rowid = old.id;
+            INSERT INTO books_fts(rowid, title, author, isbn, location)
+            VALUES (new.id, {search_fold_sql("new.title")}, {search_fold_sql("new.author")},
+                    {search_isbn_sql("new.isbn")}, {search_fold_sql("new.location")});
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_books_fts_delete AFTER DELETE ON books BEGIN
+            DELETE FROM books_fts WHERE rowid = old.id;
+        END
+        ''',
+    )),
+    (4, "Üye adı önek arama anahtarı", (
+        # Türkçe katlanmış ad (fold_tr ile aynı); "ayş" -> "AYŞE", "Ayşe" aralık taraması
+        f"ALTER TABLE members ADD COLUMN name_key TEXT "
+        f"GENERATED ALWAYS AS ({fold_sql('name')}) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_members_name_key ON members(name_key)",
+    )),
+    (5, "Operasyon Merkezi KPI sayaçları", (
+        # Tek satırlık özet; tetikleyicilerle her yazmada güncellenir
+        '''
+        CREATE TABLE IF NOT EXISTS library_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_books INTEGER NOT NULL DEFAULT 0,
+            total_members INTEGER NOT NULL DEFAULT 0,
+            active_loans INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        # Gecikme sayısı zamana bağlı olduğu için tetikleyiciyle tutulamaz; bunun
+        # yerine aktif ödünçler teslim gününe göre sayılır (gün başına bir satır),
+        # gecikenler = SUM(n) WHERE due_date <= bugün.
+        '''
+        CREATE TABLE IF NOT EXISTS active_loans_by_due (
+            due_date TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        "DELETE FROM library_stats",
+        "DELETE FROM active_loans_by_due",
+        '''
+        INSERT INTO library_stats (id, total_books, total_members, active_loans)
+        VALUES (1, (SELECT COUNT(*) FROM books), (SELECT COUNT(*) FROM members),
+                (SELECT COUNT(*) FROM transactions WHERE status = 'Aktif'))
+        ''',
+        f'''
+        INSERT INTO active_loans_by_due (due_date, n)
+        SELECT {DUE_KEY_SQL.format(col="due_date")}, COUNT(*) FROM transactions
+        WHERE status = 'Aktif' GROUP BY 1
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_books_insert AFTER INSERT ON books BEGIN
+            UPDATE library_stats SET total_books = total_books + 1 WHERE id = 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_books_delete AFTER DELETE ON books BEGIN
+            UPDATE library_stats SET total_books = total_books - 1 WHERE id = 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_members_insert AFTER INSERT ON members BEGIN
+            UPDATE library_stats SET total_members = total_members + 1 WHERE id = 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_members_delete AFTER DELETE ON members BEGIN
+            UPDATE library_stats SET total_members = total_members - 1 WHERE id = 1;
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_loans_insert
+        AFTER INSERT ON transactions WHEN new.status = 'Aktif' BEGIN
+            UPDATE library_stats SET active_loans = active_loans + 1 WHERE id = 1;
+            {_due_inc_sql("new")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_loans_delete
+        AFTER DELETE ON transactions WHEN old.status = 'Aktif' BEGIN
+            UPDATE library_stats SET active_loans = active_loans - 1 WHERE id = 1;
+            {_due_dec_sql("old")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_loans_leave
+        AFTER UPDATE OF status, due_date ON transactions WHEN old.status = 'Aktif' BEGIN
+            UPDATE library_stats SET active_loans = active_loans - 1 WHERE id = 1;
+            {_due_dec_sql("old")}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_loans_enter
+        AFTER UPDATE OF status, due_date ON transactions WHEN new.status = 'Aktif' BEGIN
+            UPDATE library_stats SET active_loans = active_loans + 1 WHERE id = 1;
+            {_due_inc_sql("new")}
+        END
+        ''',
+    )),
+    (6, "Sayfalı liste sıralama indeksleri", (
+        # modules/tables.py keyset sayfalaması: (sıralama ifadesi, id) indeks sırası
+        "CREATE INDEX IF NOT EXISTS idx_books_title ON books(title)",
+        "CREATE INDEX IF NOT EXISTS idx_books_author ON books(author)",
+        "CREATE INDEX IF NOT EXISTS idx_books_location ON books(coalesce(location, ''))",
+        "CREATE INDEX IF NOT EXISTS idx_members_join_date ON members(coalesce(join_date, ''))",
+    )),
+    (7, "Toplu katalog aktarımı: ISBN indeksi ve FTS toplu senkron", (
+        # modules/catalog_import.py: toplu aktarımda parça başına tek IN (...) araması
+        f"CREATE INDEX IF NOT EXISTS idx_books_isbn_key ON books({search_isbn_sql('isbn')})",
+        # Aktarım işlemi içinde bu tabloya satır eklenirse satır başına FTS tetikleyicisi
+        # atlanır ve parça tek INSERT ... SELECT ile indekslenir. Satır aynı işlemde
+        # silindiği için diğer bağlantılar onu hiç görmez.
+        "CREATE TABLE IF NOT EXISTS fts_sync_paused (id INTEGER PRIMARY KEY CHECK (id = 1))",
+        "DROP TRIGGER IF EXISTS trg_books_fts_insert",
+        f'''
+        CREATE TRIGGER trg_books_fts_insert AFTER INSERT ON books
+        WHEN NOT EXISTS (SELECT 1 FROM fts_sync_paused) BEGIN
+            INSERT INTO books_fts(rowid, title, author, isbn, location)
+            VALUES (new.id, {search_fold_sql("new.title")}, {search_fold_sql("new.author")},
+                    {search_isbn_sql("new.isbn")}, {search_fold_sql("new.location")});
+        END
+        ''',
+    )),
+    (8, "Rezervasyon kuyruğu: sıra numarası, bekleyen sayacı, ayırma", (
+        # position: kitap başına artan sıra numarası (iptaller yeniden numaralandırma gerektirmez).
+        # hold_until: iade edilen kitap sıradaki üyeye ayrıldığında son alma tarihi.
+        "ALTER TABLE reservations ADD COLUMN position INTEGER",
+        "ALTER TABLE reservations ADD COLUMN hold_until DATE",
+        '''
+        UPDATE reservations SET position = x.rn
+        FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY book_id ORDER BY request_date, id) AS rn
+              FROM reservations) AS x
+        WHERE x.id = reservations.id
+        ''',
+        # Kitap başına bekleyen sayısı ve son verilen sıra numarası (tetikleyicilerle)
+        '''
+        CREATE TABLE IF NOT EXISTS book_queue (
+            book_id INTEGER PRIMARY KEY,
+            waiting INTEGER NOT NULL DEFAULT 0,
+            last_position INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        "DELETE FROM book_queue",
+        '''
+        INSERT INTO book_queue (book_id, waiting, last_position)
+        SELECT book_id, SUM(status = 'Bekliyor'), MAX(position) FROM reservations
+        WHERE book_id IS NOT NULL GROUP BY book_id
+        ''',
+        # Sıradaki ilk kişi: (book_id, position) üzerinde tek indeks araması
+        "DROP INDEX IF EXISTS idx_reservations_waiting_book",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_queue ON reservations(book_id, position) "
+        "WHERE status = 'Bekliyor'",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_held ON reservations(book_id) WHERE status = 'Ayrıldı'",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_hold_expiry ON reservations(hold_until) "
+        "WHERE status = 'Ayrıldı'",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_queue_insert AFTER INSERT ON reservations BEGIN
+            INSERT INTO book_queue (book_id, waiting, last_position)
+            VALUES (new.book_id, new.status = 'Bekliyor', coalesce(new.position, 1))
+            ON CONFLICT(book_id) DO UPDATE SET
+                waiting = waiting + (new.status = 'Bekliyor'),
+                last_position = max(last_position + (new.position IS NULL), coalesce(new.position, 0));
+            UPDATE reservations
+            SET position = (SELECT last_position FROM book_queue WHERE book_id = new.book_id)
+            WHERE id = new.id AND new.position IS NULL;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_queue_leave AFTER UPDATE OF status ON reservations
+        WHEN old.status = 'Bekliyor' AND new.status IS NOT 'Bekliyor' BEGIN
+            UPDATE book_queue SET waiting = waiting - 1 WHERE book_id = old.book_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_queue_enter AFTER UPDATE OF status ON reservations
+        WHEN old.status IS NOT 'Bekliyor' AND new.status = 'Bekliyor' BEGIN
+            UPDATE book_queue SET waiting = waiting + 1 WHERE book_id = new.book_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_queue_delete AFTER DELETE ON reservations
+        WHEN old.status = 'Bekliyor' BEGIN
+            UPDATE book_queue SET waiting = waiting - 1 WHERE book_id = old.book_id;
+        END
+        ''',
+    )),
+    (9, "Gecikme bildirimleri: gönderim kaydı ve durum", (
+        # (loan_id, day) tekil: aynı ödünç için günde en fazla bir bildirim
+        '''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY,
+            loan_id INTEGER NOT NULL,
+            member_id INTEGER,
+            phone TEXT,
+            day DATE NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Bekliyor',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            gateway_ref TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            claimed_at TIMESTAMP,
+            sent_at TIMESTAMP,
+            UNIQUE (loan_id, day)
+        )
+        ''',
+        # Gönderilecekler (day, status) üzerinden sırayla alınır
+        "CREATE INDEX IF NOT EXISTS idx_notifications_day_status ON notifications(day, status, id)",
+    )),
+    (10, "Katalog değişiklik günlüğü (süreç içi katalog önbelleği için)", (
+        # Kitap/üye güncelleme ve silmeleri sıra numarasıyla kaydedilir; önbellek
+        # sadece son gördüğü sıradan sonrakileri yeniden okur. Eklemeler günlüğe
+        # yazılmaz: AUTOINCREMENT sayesinde yeni satırlar "id > bilinen en büyük id".
+        # Günlük kendini budar (son 50.000 kayıt); daha geride kalan önbellek
+        # tamamen yeniden yüklenir.
+        '''
+        CREATE TABLE IF NOT EXISTS catalog_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_id INTEGER NOT NULL
+        )
+        ''',
+        *[f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{tbl}_catalog_{event.lower()} AFTER {event} ON {tbl} BEGIN
+            INSERT INTO catalog_changes (tbl, row_id) VALUES ('{tbl}', old.id);
+        END
+        ''' for tbl in ("books", "members") for event in ("UPDATE", "DELETE")],
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_catalog_changes_prune AFTER INSERT ON catalog_changes
+        WHEN new.seq % 1000 = 0 BEGIN
+            DELETE FROM catalog_changes WHERE seq <= new.seq - 50000;
+        END
+        ''',
+    )),
+    (11, "Ödünç arşivi: eski tamamlanmış ödünçler ve birleşik geçmiş görünümü", (
+        # Sıcak tablo (transactions) aktif + yakın tarihli ödünçleri tutar; arşiv
+        # işi (modules/archive.py) eski tamamlanmışları id'leri korunarak buraya taşır.
+        # AUTOINCREMENT sayesinde silinen id'ler sıcak tabloda tekrar kullanılmaz.
+        '''
+        CREATE TABLE IF NOT EXISTS transactions_archive (
+            id INTEGER PRIMARY KEY,
+            book_id INTEGER,
+            member_id INTEGER,
+            issue_date DATE,
+            due_date DATE,
+            return_date DATE,
+            status TEXT,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_transactions_archive_member ON transactions_archive(member_id, issue_date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_archive_book ON transactions_archive(book_id, issue_date)",
+        # Arşivlenecek adaylar: iade tarihi sırasıyla, sadece tamamlanmışlar
+        "CREATE INDEX IF NOT EXISTS idx_transactions_done_return "
+        "ON transactions(return_date) WHERE status = 'Tamamlandı'",
+        # Üye geçmişi ve raporlar sıcak + soğuk veriyi tek yerden okur; member_id /
+        # book_id koşulu her iki kola da iner (kendi indeksleriyle)
+        '''
+        CREATE VIEW IF NOT EXISTS loan_history AS
+        SELECT id, book_id, member_id, issue_date, due_date, return_date, status, 0 AS archived
+        FROM transactions
+        UNION ALL
+        SELECT id, book_id, member_id, issue_date, due_date, return_date, status, 1
+        FROM transactions_archive
+        ''',
+    )),
+    (12, "Dolaşım istatistikleri: günlük / aylık özet tabloları", (
+        # modules/analytics.py tarafından artımlı doldurulur. Yeni ödünçler id
+        # filigranıyla (analytics_state.last_loan_id), iadeler ise aşağıdaki
+        # tetikleyicinin yazdığı analytics_returns günlüğünden okunur; masa
+        # işlemine iade başına tek satır ekleme düşer.
+        '''
+        CREATE TABLE IF NOT EXISTS rollup_daily (
+            day TEXT NOT NULL,
+            location TEXT NOT NULL,
+            loans INTEGER NOT NULL DEFAULT 0,
+            returns INTEGER NOT NULL DEFAULT 0,
+            late_returns INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, location)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS rollup_book_month (
+            month TEXT NOT NULL,
+            book_id INTEGER NOT NULL,
+            loans INTEGER NOT NULL,
+            PRIMARY KEY (month, book_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS rollup_member_month (
+            month TEXT NOT NULL,
+            member_id INTEGER NOT NULL,
+            loans INTEGER NOT NULL,
+            PRIMARY KEY (month, member_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS analytics_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_loan_id INTEGER NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP
+        )
+        ''',
+        "INSERT OR IGNORE INTO analytics_state (id) VALUES (1)",
+        "CREATE TABLE IF NOT EXISTS analytics_returns (seq INTEGER PRIMARY KEY, loan_id INTEGER NOT NULL)",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_analytics_return
+        AFTER UPDATE OF status ON transactions
+        WHEN old.status = 'Aktif' AND new.status = 'Tamamlandı' BEGIN
+            INSERT INTO analytics_returns (loan_id) VALUES (new.id);
+        END
+        ''',
+    )),
+    (13, "Şubeler arası transfer", (
+        # modules/branches.py. Her şube veritabanında aynı transfer iki satırdır:
+        # kaynakta 'Giden', hedefte 'Gelen' (ortak transfer_key). Şubeler ayrı
+        # dosyalar olduğu için iki taraf ayrı işlemlerde yazılır; anahtar tekrar
+        # denemeyi (branches.sync) güvenli kılar.
+        '''
+        CREATE TABLE IF NOT EXISTS transfers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transfer_key TEXT NOT NULL UNIQUE,
+            direction TEXT NOT NULL, -- Giden, Gelen
+            peer TEXT NOT NULL, -- karşı şubenin adı
+            book_id INTEGER, -- giden: gönderilen kitap; gelen: teslim alınınca eklenen kitap
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            isbn TEXT,
+            hold_member_id INTEGER, -- hedef şubedeki üye: kitap gelince ona ayrılır
+            status TEXT NOT NULL DEFAULT 'Yolda', -- Yolda, Teslim Alındı, İptal
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            closed_at TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_transfers_open ON transfers(direction, peer) WHERE status = 'Yolda'",
+    )),
+    (14, "Öneriler: kitap başına en benzer k kitap", (
+        # modules/recommend.py ödünç geçmişinden hesaplar; ekranlar tek bir
+        # birincil anahtar aralığı okur (book_id, rank). Yeni ödünçler id
+        # filigranıyla (recommend_state.last_loan_id) artımlı işlenir.
+        '''
+        CREATE TABLE IF NOT EXISTS book_neighbors (
+            book_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id INTEGER NOT NULL,
+            score REAL NOT NULL,      -- kosinüs benzerliği
+            together INTEGER NOT NULL, -- ikisini de okumuş üye sayısı
+            PRIMARY KEY (book_id, rank)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS recommend_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_loan_id INTEGER NOT NULL DEFAULT 0,
+            built_at TIMESTAMP,
+            refreshed_at TIMESTAMP
+        )
+        ''',
+        "INSERT OR IGNORE INTO recommend_state (id) VALUES (1)",
+        # Kitabı okumuş farklı üye sayısı (kosinüs paydası); artımlı güncellemede
+        # aday komşuların sayısı geçmişi taramadan buradan okunur
+        "CREATE TABLE IF NOT EXISTS book_readers (book_id INTEGER PRIMARY KEY, readers INTEGER NOT NULL)",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_neighbors_book_delete AFTER DELETE ON books BEGIN
+            DELETE FROM book_neighbors WHERE book_id = old.id;
+            DELETE FROM book_readers WHERE book_id = old.id;
+        END
+        ''',
+    )),
+    (15, "Üye adı anahtarı: Â/Î/Û katlaması", (
+        # name_key fold_sql() ile yeniden üretilir (fold_tr ile aynı; "Âdem" -> "adem").
+        # Üretilmiş kolonun ifadesi değiştirilemez: indeks ve kolon kaldırılıp
+        # yeniden eklenir (sanal kolon, satır verisi değişmez).
+        "DROP INDEX IF EXISTS idx_members_name_key",
+        "ALTER TABLE members DROP COLUMN name_key",
+        f"ALTER TABLE members ADD COLUMN name_key TEXT "
+        f"GENERATED ALWAYS AS ({fold_sql('name')}) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_members_name_key ON members(name_key)",
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, verbose=False, target=None):
+    # Bekleyen göçleri (target verilirse o sürüme kadar) uygular; uygulanan göç sayısını döndürür.
+    current = get_version(conn)
+    applied = 0
+    for version, description, steps in MIGRATIONS:
+        if version <= current or (target is not None and version > target):
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        # IMMEDIATE: aynı anda açılan ikinci süreç göçü tekrar denemez, bekler
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Kilidi aldıktan sonra tekrar kontrol et (başka süreç uygulamış olabilir)
+            if get_version(conn) >= version:
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        conn.commit()
+        applied += 1
+        if verbose:
+            print(f"🛠️ Göç {version} uygulandı: {description}")
+
+    if applied:
+        # Yeni indeksler için sorgu planlayıcı istatistiklerini güncelle
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+if __name__ == "__main__":
+    from modules import db_manager
+
+    _conn = sqlite3.connect(db_manager.DB_PATH)
+    count = migrate(_conn, verbose=True)
+    print(f"✅ Şema sürümü: {get_version(_conn)} ({count} göç uygulandı)")
+    _conn.close()
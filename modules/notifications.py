@@ -0,0 +1,521 @@
+import abc
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules import db_manager as db
+
+# --- GECİKME BİLDİRİMLERİ (SMS) ---
+# Kullanım:
+#   python -m modules.notifications send --workers 8 --rate 20
+#   python -m modules.notifications stub-server --port 8765 --fail-rate 0.1
+#
+# İki aşama:
+# 1) queue_overdue(): geciken ödünçler kısmi indeks (idx_transactions_active_due)
+#    üzerinden seçilir, mesaj metni üretilir ve notifications tablosuna yazılır.
+#    (loan_id, day) tekildir; aynı gün tekrar çalıştırmak yeni mesaj üretmez.
+# 2) dispatch(): bekleyen kayıtlar parça parça 'Gönderiliyor' olarak alınır
+#    (iki gönderici aynı kaydı almaz), asyncio işçi havuzu hız sınırı içinde
+#    ağ geçidine gönderir, geçici hatalar artan beklemeyle yeniden denenir,
+#    sonuçlar parça başına tek işlemde yazılır.
+#
+# Ağ geçidi AKYURT_SMS_GATEWAY ile seçilir:
+#   file:logs/sms_outbox.jsonl  (varsayılan, her mesaj bir JSON satırı)
+#   http://127.0.0.1:8765/send  (POST {"to", "text"}; stub-server ile denenebilir)
+
+PENDING = 'Bekliyor'
+SENDING = 'Gönderiliyor'
+SENT = 'Gönderildi'
+FAILED = 'Hata'
+
+GATEWAY_URL = os.environ.get("AKYURT_SMS_GATEWAY", "file:" + os.path.join("logs", "sms_outbox.jsonl"))
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 20.0  # mesaj/sn (sağlayıcı kotası)
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 0.5  # 0.5, 1, 2 ... sn (+ %20 rastgele)
+CLAIM_BATCH = 500
+STALE_CLAIM_MINUTES = 10  # Yarıda kalan (çöken) gönderimin kayıtları bu süreden sonra geri alınabilir
+HTTP_TIMEOUT = 10
+
+MESSAGE_TEMPLATE = ("Sayın {name}, kütüphanemizden aldığınız '{title}' adlı kitabın iade tarihi "
+                    "{due_date}{late}. Lütfen en kısa sürede iade ediniz. - Akyurt Belediyesi Kütüphanesi")
+
+
+def today():
+    # SQL tarafındaki DATE('now') ile aynı gün (gecikme sorguları da bunu kullanır)
+    return db.fetch_value("SELECT DATE('now')")
+
+
+def render_message(name, title, due_date, days):
+    late = f" idi ({days} gün gecikme)" if days > 0 else " bugündür"
+    return MESSAGE_TEMPLATE.format(name=name, title=title, due_date=due_date, late=late)
+
+
+# --- 1) SEÇİM VE KUYRUĞA ALMA ---
+def queue_overdue(day=None, loan_ids=None):
+    # Bugün henüz bildirimi olmayan gecikmiş ödünçleri kuyruğa alır; eklenen sayıyı döndürür
+    day = day or today()
+    sql = """
+        SELECT t.id, t.member_id, m.name, m.phone, b.title, t.due_date,
+               CAST(julianday(?) - julianday(t.due_date) AS INTEGER)
+        FROM transactions t
+        JOIN members m ON t.member_id = m.id
+        JOIN books b ON t.book_id = b.id
+        WHERE t.status = 'Aktif' AND t.due_date <= ?
+          AND NOT EXISTS (SELECT 1 FROM notifications n WHERE n.loan_id = t.id AND n.day = ?)
+    """
+    params = [day, day, day]
+    if loan_ids is not None:
+        loan_ids = list(loan_ids)
+        if not loan_ids: return 0
+        sql += f" AND t.id IN ({','.join('?' * len(loan_ids))})"
+        params += loan_ids
+    with db.transaction(immediate=True) as conn:
+        rows = conn.execute(sql, params).fetchall()
+        # Telefonu olmayan üyenin bildirimi doğrudan 'Hata' olarak kaydedilir (tekrar seçilmez)
+        cur = conn.executemany("""
+            INSERT INTO notifications (loan_id, member_id, phone, day, message, status, last_error)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(loan_id, day) DO NOTHING
+        """, [(loan_id, member_id, phone, day, render_message(name, title, due_date, days),
+               PENDING if (phone or "").strip() else FAILED,
+               None if (phone or "").strip() else "Telefon numarası yok")
+              for loan_id, member_id, name, phone, title, due_date, days in rows])
+        return cur.rowcount if rows else 0
+
+
+@db.retry_on_busy
+def _claim(day, loan_ids=None, limit=CLAIM_BATCH):
+    # Bekleyenlerden bir parçayı bu göndericiye ayırır: [(id, telefon, mesaj)]
+    sql = f"SELECT id FROM notifications WHERE day = ? AND status = '{PENDING}'"
+    params = [day]
+    if loan_ids is not None:
+        sql += f" AND loan_id IN ({','.join('?' * len(loan_ids))})"
+        params += list(loan_ids)
+    with db.transaction(immediate=True) as conn:
+        return conn.execute(f"""
+            UPDATE notifications SET status = '{SENDING}', claimed_at = CURRENT_TIMESTAMP
+            WHERE id IN ({sql} ORDER BY id LIMIT ?)
+            RETURNING id, phone, message
+        """, params + [limit]).fetchall()
+
+
+@db.retry_on_busy
+def _record(results):
+    with db.transaction() as conn:
+        conn.executemany("""
+            UPDATE notifications
+            SET status = ?, attempts = attempts + ?, last_error = ?, gateway_ref = ?,
+                sent_at = CASE WHEN ? = 'Gönderildi' THEN CURRENT_TIMESTAMP END
+            WHERE id = ?
+        """, [(status, attempts, error, ref, status, nid) for nid, status, attempts, error, ref in results])
+
+
+@db.retry_on_busy
+def _release(ids):
+    # Gönderilmeden kalan ayrılmış kayıtlar kuyruğa geri döner (gönderim yarıda kesildi)
+    with db.transaction() as conn:
+        conn.execute(f"""
+            UPDATE notifications SET status = '{PENDING}', claimed_at = NULL
+            WHERE status = '{SENDING}' AND id IN ({','.join('?' * len(ids))})
+        """, ids)
+
+
+def retry_failed(day=None):
+    # Hatalı kayıtları ve yarıda kalmış gönderimleri tekrar kuyruğa alır
+    day = day or today()
+    return db.execute(f"""
+        UPDATE notifications SET status = '{PENDING}', last_error = NULL
+        WHERE day = ? AND phone IS NOT NULL AND trim(phone) <> ''
+          AND (status = '{FAILED}'
+               OR (status = '{SENDING}' AND claimed_at < datetime('now', '-{STALE_CLAIM_MINUTES} minutes')))
+    """, (day,))
+
+
+# --- AĞ GEÇİTLERİ ---
+class GatewayError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class Gateway(abc.ABC):
+    # Ağ geçidi arayüzü: send() başarılıysa sağlayıcı referansını döndürür, değilse GatewayError atar.
+    # send() tanımlamayan alt sınıf oluşturulurken hata verir (gönderimin ortasında değil).
+    name = "gateway"
+
+    @abc.abstractmethod
+    async def send(self, phone, message):
+        ...
+
+    async def close(self):
+        pass
+
+
+class FileGateway(Gateway):
+    # Yerel / test: mesajlar JSON satırı olarak dosyaya eklenir
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._count = 0
+
+    async def send(self, phone, message):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._count += 1
+            self._file.write(json.dumps({"to": phone, "text": message, "ts": time.time()}, ensure_ascii=False) + "\n")
+            return f"file:{self._count}"
+
+    async def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class HttpGateway(Gateway):
+    # POST {"to", "text"} (JSON). 429 / 5xx / zaman aşımı yeniden denenir, diğer 4xx denenmez.
+    # urllib engelleyici olduğundan istekler kendi iş parçacığı havuzunda çalışır
+    # (varsayılan havuz tek çekirdekte 5 iş parçacığıyla sınırlı, işçi sayısını kısar).
+    name = "http"
+
+    def __init__(self, url, timeout=HTTP_TIMEOUT, token=None, max_connections=32):
+        self.url = url
+        self.timeout = timeout
+        self.token = token or os.environ.get("AKYURT_SMS_TOKEN")
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="sms")
+
+    def _post(self, phone, message):
+        body = json.dumps({"to": phone, "text": message}, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        if self.token: headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = response.read()
+        except urllib.error.HTTPError as exc:
+            raise GatewayError(f"HTTP {exc.code}", retryable=exc.code == 429 or exc.code >= 500)
+        except (urllib.error.URLError, OSError) as exc:
+            raise GatewayError(str(getattr(exc, "reason", exc)))
+        try:
+            return str(json.loads(payload or b"{}").get("id", ""))
+        except (ValueError, AttributeError):
+            return ""
+
+    async def send(self, phone, message):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._post, phone, message)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def get_gateway(url=None):
+    url = url or GATEWAY_URL
+    if url.startswith(("http://", "https://")):
+        return HttpGateway(url)
+    if url.startswith("file:"):
+        return FileGateway(url[len("file:"):])
+    raise ValueError(f"Bilinmeyen SMS ağ geçidi: {url}")
+
+
+# --- 2) GÖNDERİM ---
+class RateLimiter:
+    # Jeton kovası: saniyede en fazla `rate` gönderim, `burst` kadar ani artış
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate / 10))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0: return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _deliver(gateway, limiter, phone, message, max_attempts, backoff):
+    # Dönüş: (durum, deneme sayısı, hata, referans)
+    error = None
+    for attempt in range(1, max_attempts + 1):
+        await limiter.acquire()
+        try:
+            return SENT, attempt, None, await gateway.send(phone, message)
+        except GatewayError as exc:
+            error = exc
+        except Exception as exc:  # Ağ geçidi hatası gönderimin tamamını durdurmamalı
+            error = GatewayError(f"{type(exc).__name__}: {exc}")
+        if not error.retryable:
+            break
+        if attempt < max_attempts:
+            await asyncio.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random() * 0.2))
+    return FAILED, attempt, str(error), None
+
+
+async def dispatch_async(gateway, day=None, loan_ids=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                         max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS, progress=None):
+    day = day or today()
+    report = {"day": day, "sent": 0, "failed": 0, "retries": 0, "seconds": 0.0}
+    limiter = RateLimiter(rate)
+    start = time.perf_counter()
+    while True:
+        batch = _claim(day, loan_ids)
+        if not batch: break
+        pending = asyncio.Queue()
+        for item in batch:
+            pending.put_nowait(item)
+        results = []
+
+        async def worker():
+            while True:
+                try:
+                    nid, phone, message = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                status, attempts, error, ref = await _deliver(gateway, limiter, phone, message,
+                                                              max_attempts, backoff)
+                results.append((nid, status, attempts, error, ref))
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(workers, len(batch)))))
+        finally:
+            # İptal / hata durumunda da tamamlananlar kaydedilir; hiç gönderilmeyenler
+            # kuyruğa geri döner. Gönderilmiş ama kaydedilemeyenler 'Gönderiliyor'da kalır
+            # (çift mesaj yerine; STALE_CLAIM_MINUTES sonra retry_failed ile geri alınır).
+            try:
+                if results: _record(results)
+            finally:
+                done = {result[0] for result in results}
+                left = [nid for nid, _, _ in batch if nid not in done]
+                if left: _release(left)
+        for _, status, attempts, _, _ in results:
+            report["sent" if status == SENT else "failed"] += 1
+            report["retries"] += attempts - 1
+        report["seconds"] = time.perf_counter() - start
+        if progress: progress(report)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def dispatch(gateway=None, **options):
+    gateway = gateway or get_gateway()
+
+    async def run():
+        try:
+            return await dispatch_async(gateway, **options)
+        finally:
+            await gateway.close()
+
+    return asyncio.run(run())
+
+
+_background = threading.Lock()
+_background_again = threading.Event()
+_background_error = None
+
+
+def dispatch_running():
+    return _background.locked()
+
+
+def dispatch_error():
+    # Son arka plan gönderimi hatayla bittiyse hata metni (panelde gösterilir)
+    return _background_error
+
+
+def dispatch_in_background(day=None, **options):
+    # Panel beklemesin: binlerce mesaj hız sınırında dakikalar sürer. Gönderim
+    # sunucu sürecinde arka planda yürür (tarayıcı kapansa da tamamlanır); sayfa
+    # yalnızca status_counts() okur. Süreç başına aynı anda tek gönderim; başlatıldıysa True.
+    # Gönderim sürerken gelen istek kaybolmaz: iş bitince bir tur daha çalışır
+    # (son boş _claim ile kilidin bırakılması arasında kuyruğa alınanlar için).
+    global _background_error
+    _background_again.set()
+    if not _background.acquire(blocking=False): return False
+    _background_again.clear()
+    _background_error = None
+
+    def run():
+        global _background_error
+        try:
+            dispatch(day=day, **options)
+        except Exception as exc:
+            _background_error = f"{type(exc).__name__}: {exc}"
+            raise  # threading.excepthook günlüğe yazar
+        finally:
+            _background.release()
+            if _background_again.is_set() and _background_error is None:
+                dispatch_in_background(day, **options)
+
+    threading.Thread(target=run, name="sms-dispatch", daemon=True).start()
+    return True
+
+
+def send_overdue(day=None, loan_ids=None, gateway=None, **options):
+    # Kuyruğa al + gönder. Dönüş: gönderim raporu (+ "queued")
+    day = day or today()
+    queued = queue_overdue(day, loan_ids)
+    report = dispatch(gateway, day=day, loan_ids=loan_ids, **options)
+    report["queued"] = queued
+    return report
+
+
+# --- DURUM ---
+def status_counts(day=None):
+    rows = db.fetch_all("SELECT status, COUNT(*) FROM notifications WHERE day = ? GROUP BY status",
+                        (day or today(),))
+    return dict(rows)
+
+
+def loan_statuses(loan_ids=None, day=None):
+    # {loan_id: durum} bugünün bildirimleri (gecikme tablosunda göstermek için);
+    # loan_ids verilirse yalnızca o ödünçler (tablo ilk sayfası)
+    if loan_ids is None:
+        return dict(db.fetch_all("SELECT loan_id, status FROM notifications WHERE day = ?", (day or today(),)))
+    loan_ids = [int(i) for i in loan_ids]
+    if not loan_ids:
+        return {}
+    return dict(db.fetch_all(f"""
+        SELECT loan_id, status FROM notifications
+        WHERE day = ? AND loan_id IN ({",".join("?" * len(loan_ids))})
+    """, (day or today(), *loan_ids)))
+
+
+FAILED_COLUMNS = ("Ödünç No", "Üye", "Telefon", "Deneme", "Hata")
+
+
+def failed_rows(day=None, limit=200):
+    # FAILED_COLUMNS sırasıyla satırlar
+    return db.fetch_all("""
+        SELECT n.loan_id, m.name, n.phone, n.attempts, n.last_error
+        FROM notifications n
+        LEFT JOIN members m ON n.member_id = m.id
+        WHERE n.day = ? AND n.status = 'Hata'
+        ORDER BY n.id LIMIT ?
+    """, (day or today(), int(limit)))
+
+
+# --- TEST İÇİN YEREL SMS SUNUCUSU ---
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if server.latency: time.sleep(server.latency)
+        if random.random() < server.fail_rate:
+            self.send_response(503)
+            self.end_headers()
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+        with server.lock:
+            server.received += 1
+            message_id = server.received
+            if server.outbox:
+                server.outbox.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                server.outbox.flush()
+        reply = json.dumps({"id": f"stub-{message_id}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def stub_server(host="127.0.0.1", port=8765, fail_rate=0.0, latency_ms=0, outbox=None):
+    # fail_rate oranında 503 döner (yeniden deneme testi), latency_ms kadar bekletir
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    server.fail_rate = fail_rate
+    server.latency = latency_ms / 1000
+    server.lock = threading.Lock()
+    server.received = 0
+    server.outbox = open(outbox, "a", encoding="utf-8") if outbox else None
+    return server
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gecikmiş iadeler için toplu SMS bildirimi.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    send = sub.add_parser("send", help="Gecikenleri kuyruğa al ve gönder")
+    send.add_argument("--day", default=None, help="Bildirim günü (YYYY-AA-GG, varsayılan: bugün)")
+    send.add_argument("--gateway", default=None, help=f"Ağ geçidi (varsayılan: {GATEWAY_URL})")
+    send.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    send.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Saniyede en fazla mesaj (0: sınırsız)")
+    send.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+    send.add_argument("--retry-failed", action="store_true", help="Önce hatalı kayıtları tekrar kuyruğa al")
+    send.add_argument("--queue-only", action="store_true", help="Sadece kuyruğa al, gönderme")
+
+    stub = sub.add_parser("stub-server", help="Test için yerel HTTP SMS sunucusu")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8765)
+    stub.add_argument("--fail-rate", type=float, default=0.0, help="503 dönme olasılığı (0-1)")
+    stub.add_argument("--latency-ms", type=int, default=0)
+    stub.add_argument("--outbox", default=None, help="Alınan mesajların yazılacağı dosya")
+    args = parser.parse_args(argv)
+
+    if args.command == "stub-server":
+        server = stub_server(args.host, args.port, args.fail_rate, args.latency_ms, args.outbox)
+        print(f"SMS test sunucusu: http://{args.host}:{args.port}/send", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"\nAlınan mesaj: {server.received}", file=sys.stderr)
+            server.server_close()
+        return 0
+
+    day = args.day or today()
+    if args.retry_failed:
+        print(f"Tekrar kuyruğa alınan: {retry_failed(day):,}", file=sys.stderr)
+    queued = queue_overdue(day)
+    print(f"Kuyruğa alınan: {queued:,} ({day})", file=sys.stderr)
+    if args.queue_only:
+        return 0
+
+    def progress(report):
+        done = report["sent"] + report["failed"]
+        print(f"\r  gönderilen {report['sent']:,}  hatalı {report['failed']:,}  yeniden deneme {report['retries']:,}"
+              f"  ({done / max(report['seconds'], 1e-9):,.1f} mesaj/sn)", end="", file=sys.stderr, flush=True)
+
+    report = dispatch(get_gateway(args.gateway), day=day, workers=args.workers, rate=args.rate,
+                      max_attempts=args.max_attempts, progress=progress)
+    print(file=sys.stderr)
+    print(f"✅ Gönderilen: {report['sent']:,}  ❌ Hatalı: {report['failed']:,}  "
+          f"süre {report['seconds']:.1f} sn", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+from modules import db_manager as db
+
+# --- ÖNERİLER: "BU KİTABI OKUYANLAR BUNLARI DA OKUDU" ---
+# Ödünç geçmişi (arşiv dahil, loan_history) üye × kitap seyrek bir matris olarak
+# okunur (tekrar ödünçler tek sayılır). İki kitabın benzerliği, ikisini de okumuş
+# üye sayısının (birlikte) kitapların okuyucu sayılarına göre ölçeklenmiş
+# halidir (ikili vektörlerde kosinüs):
+#     skor(a, b) = birlikte(a, b) / sqrt(okuyan(a) * okuyan(b))
+# Her kitabın en yüksek skorlu K komşusu book_neighbors tablosuna (göç 14)
+# yazılır; ekranlar geçmiş üzerinde self-join yerine tek birincil anahtar
+# aralığı okur.
+#
+# Hesap yalnızca NumPy ile yapılır (SciPy bağımlılığı yok): satırlar üyeye göre
+# sıralı dizilerdir (CSR); her üyenin kitap çiftleri vektörel üretilip
+# np.unique ile sayılır. Çift sayısı okuyucu başına karesel büyüdüğünden kitaplar
+# PAIR_BUDGET çiftlik bloklar halinde işlenir (bellek sınırlı kalır).
+#
+# refresh() artımlıdır: filigrandan (recommend_state.last_loan_id) sonra ödünç
+# alınan kitapların listesi baştan, bu kitaplarla ortak okuyucusu olan
+# kitapların listesinde ise yalnızca o kitabın girdisi yeniden hesaplanır
+# (değişen çiftlerin hepsi bunlardır). Skoru düşen girdi dolu bir listenin
+# sonuna iniyorsa yerine listede olmayan bir kitap geçebilir; yalnızca bu
+# kitaplar okuyucularının geçmişinden baştan hesaplanır.
+#
+#   python -m modules.recommend rebuild
+#   python -m modules.recommend refresh       # ödünç ekranı da arka planda çağırır
+#   python -m modules.recommend show 42
+
+K = 10
+# Tek ortak okuyucu tesadüf sayılır (skoru yanıltıcı biçimde yüksek çıkar)
+MIN_TOGETHER = 2
+# Binlerce farklı kitap okumuş (kurum / sınıf kartı) üyenin çiftleri karesel
+# büyür ve sinyal taşımaz: çift sayımına katılmaz (1M fikstürde 46 üye, çiftlerin %76'sı)
+MAX_HISTORY = 500
+PAIR_BUDGET = 2_000_000
+READ_BATCH = 50_000
+# Bundan fazla yeni ödünç birikmişse artımlı yerine tam hesap
+INCREMENTAL_LIMIT = 20_000
+
+COLUMNS = ("Eser", "Yazar", "Raf", "Durum", "Birlikte Okuyan")
+
+_PAIRS_SQL = """
+    SELECT h.member_id, h.book_id FROM loan_history h JOIN books b ON b.id = h.book_id
+    WHERE h.id <= ? {where}
+"""
+
+
+def _max_loan_id(conn):
+    return conn.execute("""
+        SELECT max(coalesce((SELECT MAX(id) FROM transactions), 0),
+                   coalesce((SELECT MAX(id) FROM transactions_archive), 0))
+    """).fetchone()[0]
+
+
+def _read_array(conn, sql, params=()):
+    # İki tamsayı sütunlu sorgu -> (n, 2) dizi, READ_BATCH'lik parçalarla
+    import numpy as np
+
+    cur = conn.execute(sql, params)
+    chunks = [np.zeros((0, 2), dtype=np.int64)]
+    while True:
+        rows = cur.fetchmany(READ_BATCH)
+        if not rows: break
+        chunks.append(np.array(rows, dtype=np.int64))
+    return np.concatenate(chunks)
+
+
+def _read_pairs(conn, sql, params=()):
+    # Tekil (üye, kitap) çiftleri, üyeye sonra kitaba göre sıralı
+    import numpy as np
+
+    pairs = _read_array(conn, sql, params)
+    keys = np.unique((pairs[:, 0] << 32) | pairs[:, 1])
+    return keys >> 32, keys & 0xFFFFFFFF
+
+
+def _csr(members):
+    # Üyeye göre sıralı konumlar için: her konumun üyesinin kitapları [start, start + length)
+    import numpy as np
+
+    first = np.r_[True, members[1:] != members[:-1]] if len(members) else np.zeros(0, dtype=bool)
+    row_start = np.flatnonzero(first)
+    row_of = np.cumsum(first) - 1
+    return row_start[row_of], np.diff(np.r_[row_start, len(members)])[row_of]
+
+
+def _neighbor_blocks(members, books, sources=None, readers=None, k=K, min_together=MIN_TOGETHER,
+                     budget=PAIR_BUDGET):
+    # Kaynak kitapların (None: hepsi) en iyi k komşusu (k=None: hepsi), kitap id sırasıyla bloklar:
+    # (bloğun son kitap id'si, (kitap, sıra, komşu, skor, birlikte) dizileri).
+    # readers: (kitap, okuyucu sayısı) dizisi; verilmezse çiftlerden sayılır (tam geçmiş).
+    import numpy as np
+
+    ids, col = np.unique(books, return_inverse=True)
+    pop = np.bincount(col, minlength=len(ids)).astype(np.float64)
+    if readers is not None and len(readers):
+        at = np.minimum(np.searchsorted(ids, readers[:, 0]), len(ids) - 1)
+        found = ids[at] == readers[:, 0]
+        np.maximum.at(pop, at[found], readers[found, 1])
+    # MAX_HISTORY'yi aşan üyeler okuyucu sayılır ama çift üretmez
+    light = _csr(members)[1] <= MAX_HISTORY
+    members, col = members[light], col[light]
+    start, length = _csr(members)
+
+    is_source = np.ones(len(col), dtype=bool) if sources is None else np.isin(ids, sources)[col]
+    work = np.cumsum(np.bincount(col, weights=(length - 1) * is_source, minlength=len(ids)))
+    # Kaynak konumlar kitaba göre sıralı: her blok tek bir dilim
+    by_book = np.flatnonzero(is_source)
+    by_book = by_book[np.argsort(col[by_book], kind="stable")]
+    bounds = np.searchsorted(col[by_book], np.arange(len(ids) + 1))
+    lo = 0
+    while lo < len(ids):
+        done = work[lo - 1] if lo else 0
+        hi = min(max(int(np.searchsorted(work, done + budget, side="right")), lo + 1), len(ids))
+        pos = by_book[bounds[lo]:bounds[hi]]
+        lo, block_end = hi, int(ids[hi - 1])
+        if not len(pos): continue
+
+        # Konum başına üyenin tüm kitapları: (a, b) yönlü çiftleri
+        n = length[pos]
+        offsets = np.repeat(np.cumsum(n) - n, n)
+        a = np.repeat(col[pos], n)
+        b = col[np.repeat(start[pos], n) + np.arange(n.sum()) - offsets]
+        keep = a != b
+        keys, together = np.unique(a[keep].astype(np.int64) * len(ids) + b[keep], return_counts=True)
+        keep = together >= min_together
+        a, b, together = keys[keep] // len(ids), keys[keep] % len(ids), together[keep]
+        # Tabloya yazılan hassasiyetle sıralanır (artımlı birleştirme aynı sırayı bulur)
+        score = np.round(together / np.sqrt(pop[a] * pop[b]), 6)
+
+        order = np.lexsort((b, -together, -score, a))
+        a, b, score, together = a[order], b[order], score[order], together[order]
+        head = np.r_[True, a[1:] != a[:-1]] if len(a) else np.zeros(0, dtype=bool)
+        index = np.arange(len(a))
+        rank = index - np.maximum.accumulate(np.where(head, index, 0))
+        keep = rank < k if k is not None else slice(None)
+        yield block_end, (ids[a[keep]], rank[keep], ids[b[keep]], score[keep], together[keep])
+
+
+def _rows(arrays):
+    book, rank, neighbor, score, together = arrays
+    return zip(book.tolist(), rank.tolist(), neighbor.tolist(), score.tolist(), together.tolist())
+
+
+def _order(entry):
+    # (komşu, skor, birlikte) girdilerinin liste sırası (_neighbor_blocks ile aynı)
+    return -entry[1], -entry[2], entry[0]
+
+
+_INSERT_SQL = "INSERT INTO book_neighbors (book_id, rank, neighbor_id, score, together) VALUES (?, ?, ?, ?, ?)"
+
+
+def _snapshot(func):
+    # Tek okuma işlemi (anlık görüntü) içinde func(conn)
+    with db.connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            return func(conn)
+        finally:
+            conn.rollback()
+
+
+def rebuild(progress=None):
+    # Tüm geçmişten sıfırdan. Okuma tek anlık görüntüden; yazma kitap id sırasıyla
+    # blok başına kısa bir işlemdir (ekranlar hesap sırasında da öneri görür).
+    import numpy as np
+
+    start = time.perf_counter()
+
+    def read_all(conn):
+        top = _max_loan_id(conn)
+        return (top,) + _read_pairs(conn, _PAIRS_SQL.format(where=""), (top,))
+
+    top, members, books = _snapshot(read_all)
+    ids, readers = np.unique(books, return_counts=True)
+
+    written, previous = 0, -1
+    for block_end, arrays in _neighbor_blocks(members, books):
+        with db.transaction(immediate=True) as conn:
+            # Aralıktaki geçmişi olmayan kitapların eski satırları da silinir
+            conn.execute("DELETE FROM book_neighbors WHERE book_id > ? AND book_id <= ?", (previous, block_end))
+            conn.executemany(_INSERT_SQL, _rows(arrays))
+        written += len(arrays[0])
+        previous = block_end
+        if progress: progress(written, time.perf_counter() - start)
+    with db.transaction(immediate=True) as conn:
+        conn.execute("DELETE FROM book_neighbors WHERE book_id > ?", (previous,))
+        conn.execute("DELETE FROM book_readers")
+        conn.executemany("INSERT INTO book_readers (book_id, readers) VALUES (?, ?)",
+                         zip(ids.tolist(), readers.tolist()))
+        conn.execute("""UPDATE recommend_state SET last_loan_id = ?, built_at = CURRENT_TIMESTAMP,
+                        refreshed_at = CURRENT_TIMESTAMP WHERE id = 1""", (top,))
+    return {"loans": top, "pairs": len(members), "books": len(ids), "rows": written,
+            "seconds": time.perf_counter() - start}
+
+
+def _read_sources(conn, book_ids, top):
+    # Verilen kitapları okumuş üyelerin tüm geçmişi (tekil çiftler) ve bu geçmişteki
+    # kitapların kayıtlı okuyucu sayısı: kaynak kitapların komşuları için yeterli veri
+    import numpy as np
+
+    members, books = _read_pairs(conn, _PAIRS_SQL.format(where="""
+        AND h.member_id IN (SELECT member_id FROM loan_history
+                            WHERE book_id IN (SELECT value FROM json_each(?)))"""), (top, json.dumps(book_ids)))
+    readers = _read_array(conn, "SELECT book_id, readers FROM book_readers WHERE book_id IN "
+                                "(SELECT value FROM json_each(?))", (json.dumps(np.unique(books).tolist()),))
+    return members, books, readers
+
+
+def refresh(progress=None, full=True):
+    # Yeni ödünç yoksa tek okuma. Dönüş: rapor sözlüğü (rebuild'e düştüyse onunki).
+    # full=False: tam hesap gerekiyorsa (hiç kurulmamış / çok birikmiş) dokunmaz.
+    import numpy as np
+
+    start = time.perf_counter()
+    skipped = {"loans": 0, "books": 0, "rows": 0, "seconds": 0.0}
+
+    def read_new(conn):
+        watermark = conn.execute("SELECT last_loan_id FROM recommend_state WHERE id = 1").fetchone()[0]
+        top = _max_loan_id(conn)
+        if top <= watermark or watermark == 0 or top - watermark > INCREMENTAL_LIMIT:
+            return watermark, top, None, None, None
+        fresh = [row[0] for row in conn.execute(
+            "SELECT DISTINCT book_id FROM loan_history WHERE id > ? AND id <= ?", (watermark, top))]
+        # Okuyucu sayısı yalnızca yeni ödünç alınan kitaplarda değişmiştir
+        counts = _read_array(conn, """
+            SELECT book_id, COUNT(DISTINCT member_id) FROM loan_history
+            WHERE book_id IN (SELECT value FROM json_each(?)) AND id <= ? GROUP BY book_id
+        """, (json.dumps(fresh), top))
+        return watermark, top, fresh, counts, _read_sources(conn, fresh, top)
+
+    watermark, top, fresh, counts, source = _snapshot(read_new)
+    if top <= watermark:
+        return dict(skipped, seconds=time.perf_counter() - start)
+    if fresh is None:
+        return rebuild(progress=progress) if full else dict(skipped, seconds=time.perf_counter() - start)
+
+    # Yeni kitapların kesilmemiş komşu listesi. Skor simetrik olduğundan aynı
+    # satırlar, listesinde bu kitaplardan biri olan / olabilecek her kitabın
+    # güncellenecek girdisidir (birlikte sayısı azalmaz).
+    fresh_ids = set(fresh)
+    lists, patches = {}, {}
+    readers = np.concatenate([source[2], counts])
+    for _, arrays in _neighbor_blocks(*source[:2], sources=fresh, readers=readers, k=None):
+        for book, rank, neighbor, score, together in _rows(arrays):
+            if rank < K: lists.setdefault(book, []).append((neighbor, score, together))
+            if neighbor not in fresh_ids:
+                patches.setdefault(neighbor, []).append((book, score, together))
+
+    current = {}
+    for book, neighbor, score, together in db.fetch_all("""
+        SELECT book_id, neighbor_id, score, together FROM book_neighbors
+        WHERE book_id IN (SELECT value FROM json_each(?)) ORDER BY book_id, rank
+    """, (json.dumps(list(patches)),)):
+        current.setdefault(book, []).append((neighbor, score, together))
+    uncertain = []
+    for book, entries in patches.items():
+        old = current.get(book, [])
+        merged = sorted([e for e in old if e[0] not in fresh_ids] + entries, key=_order)
+        lists[book] = merged[:K]
+        # Dolu listede son sıranın altına düşen girdinin yerine, listede hiç
+        # olmayan bir kitap geçebilir: bu kitaplar baştan hesaplanır
+        if len(old) == K and any(_order(e) > _order(old[-1]) for e in lists[book]):
+            uncertain.append(book)
+    if uncertain:
+        source = _snapshot(lambda conn: _read_sources(conn, uncertain, top))
+        exact = {book: [] for book in uncertain}
+        readers = np.concatenate([source[2], counts])
+        for _, arrays in _neighbor_blocks(*source[:2], sources=uncertain, readers=readers):
+            for book, _, neighbor, score, together in _rows(arrays):
+                exact[book].append((neighbor, score, together))
+        lists.update(exact)
+
+    with db.transaction(immediate=True) as conn:
+        # Aynı aralığı başka bir süreç işlediyse yazılmaz
+        if conn.execute("SELECT last_loan_id FROM recommend_state WHERE id = 1").fetchone()[0] != watermark:
+            return dict(skipped, seconds=time.perf_counter() - start)
+        changed = fresh_ids | set(lists)
+        conn.execute("DELETE FROM book_neighbors WHERE book_id IN (SELECT value FROM json_each(?))",
+                     (json.dumps(sorted(changed)),))
+        rows = [(book, rank, neighbor, score, together) for book, entries in lists.items()
+                for rank, (neighbor, score, together) in enumerate(entries)]
+        conn.executemany(_INSERT_SQL, rows)
+        conn.executemany("""INSERT INTO book_readers (book_id, readers) VALUES (?, ?)
+                            ON CONFLICT (book_id) DO UPDATE SET readers = excluded.readers""", counts.tolist())
+        conn.execute("UPDATE recommend_state SET last_loan_id = ?, refreshed_at = CURRENT_TIMESTAMP WHERE id = 1",
+                     (top,))
+    return {"loans": top - watermark, "books": len(changed), "rows": len(rows),
+            "seconds": time.perf_counter() - start}
+
+
+def needs_refresh():
+    # Ucuz kontrol (iki indeks araması)
+    watermark, top = db.fetch_one("""
+        SELECT (SELECT last_loan_id FROM recommend_state WHERE id = 1), (SELECT MAX(id) FROM transactions)
+    """)
+    return (top or 0) > (watermark or 0)
+
+
+_background = threading.Lock()
+
+
+def refresh_in_background():
+    # Ödünç ekranı beklemesin: yeni ödünç varsa artımlı güncelleme arka planda,
+    # süreç başına aynı anda tek iş. Tam hesap (rebuild) yalnızca komut satırından.
+    if not needs_refresh() or not _background.acquire(blocking=False): return
+
+    def run():
+        try:
+            refresh(full=False)
+        finally:
+            _background.release()
+
+    threading.Thread(target=run, name="recommend-refresh", daemon=True).start()
+
+
+# --- EKRAN SORGUSU ---
+# Verilen kitapların komşuları (birden çoksa skorlar toplanır): book_neighbors
+# birincil anahtar aralığı + kitap satırı. Verilen kitaplar önerilmez.
+_SUGGEST_SQL = """
+    SELECT b.id, b.title, b.author, coalesce(b.location, '-'), b.status, MAX(n.together)
+    FROM book_neighbors n JOIN books b ON b.id = n.neighbor_id
+    WHERE n.book_id IN (SELECT value FROM json_each(:books))
+      AND n.neighbor_id NOT IN (SELECT value FROM json_each(:books))
+    GROUP BY n.neighbor_id
+    ORDER BY SUM(n.score) DESC, n.neighbor_id
+"""
+
+
+def suggest(book_ids, member_id=None, limit=5):
+    # Satırlar COLUMNS sırasıyla. member_id verilirse üyenin daha önce okudukları
+    # atlanır: aday başına alt sorgu yerine üye indeksinden tek okuma (+book_id
+    # kitap indeksini devre dışı bırakır; popüler kitabın geçmişi taranmaz)
+    if not book_ids: return []
+    rows = db.fetch_all(_SUGGEST_SQL, {"books": json.dumps([int(i) for i in book_ids])})
+    if member_id is not None and rows:
+        read = {row[0] for row in db.fetch_all("""
+            SELECT book_id FROM loan_history
+            WHERE member_id = ? AND +book_id IN (SELECT value FROM json_each(?))
+        """, (member_id, json.dumps([row[0] for row in rows])))}
+        rows = [row for row in rows if row[0] not in read]
+    return [row[1:] for row in rows[:limit]]
+
+
+# --- KOMUT SATIRI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ödünç geçmişinden kitap önerileri.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Komşu tablosunu tüm geçmişten üret")
+    sub.add_parser("refresh", help="Yeni ödünçlerin etkilediği kitapları güncelle")
+    show = sub.add_parser("show", help="Bir kitabın önerileri")
+    show.add_argument("book_id", type=int)
+    show.add_argument("--limit", type=int, default=K)
+    args = parser.parse_args(argv)
+
+    def progress(rows, seconds):
+        print(f"\r  {rows:,} komşu satırı yazıldı ({seconds:.1f} sn)", end="", file=sys.stderr, flush=True)
+
+    if args.command in ("refresh", "rebuild"):
+        result = (refresh if args.command == "refresh" else rebuild)(progress=progress)
+        print(file=sys.stderr)
+        print(f"✅ {result['books']:,} kitap, {result['rows']:,} komşu satırı ({result['seconds']:.1f} sn)",
+              file=sys.stderr)
+        return 0
+
+    title = db.fetch_value("SELECT title FROM books WHERE id = ?", (args.book_id,))
+    if title is None:
+        print("Kitap bulunamadı.", file=sys.stderr)
+        return 1
+    rows = suggest([args.book_id], limit=args.limit)
+    if not rows:
+        print(f"{title}: öneri yok (tablo hiç kurulmadıysa: python -m modules.recommend rebuild)")
+        return 0
+    print(f"{title} — okuyanlar bunları da okudu:")
+    for row in rows:
+        print(f"  {row[4]:>3} ortak okuyucu  {row[0]} ({row[1]}) [{row[3]}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+from modules import db_manager as db
+
+# --- REZERVASYON KUYRUĞU ---
+# Her kitabın kendi sırası vardır: reservations.position kitap başına artan sıra
+# numarasıdır (göç 8, tetikleyici atar). Sıradaki ilk kişi
+# idx_reservations_queue (book_id, position) üzerinde tek indeks araması,
+# bekleyen sayısı book_queue tablosundan tek satır okumadır.
+#
+# Yaşam döngüsü:
+#   Bekliyor --(kitap iade edildi, sırada ilk)--> Ayrıldı (hold_until'e kadar)
+#   Ayrıldı  --(üye kitabı aldı)--> Tamamlandı
+#   Ayrıldı  --(süre doldu / iptal)--> Süresi Doldu / İptal, kitap sıradakine geçer
+# Ayrılmış kitabın kendisi de 'Ayrıldı' durumundadır; sadece o üyeye verilebilir.
+
+HOLD_DAYS = 3
+
+WAITING = 'Bekliyor'
+HELD = 'Ayrıldı'
+FULFILLED = 'Tamamlandı'
+CANCELLED = 'İptal'
+EXPIRED = 'Süresi Doldu'
+
+BOOK_AVAILABLE = 'Müsait'
+BOOK_HELD = 'Ayrıldı'
+BOOK_IN_TRANSIT = 'Transferde'  # başka şubeye gönderildi, henüz teslim alınmadı (modules/branches.py)
+LENDABLE = (BOOK_AVAILABLE, BOOK_HELD)
+RESERVABLE = ('Ödünçte', BOOK_HELD)
+
+# Bir kitap için sıradaki ilk bekleyen rezervasyonun id'si (indeks araması)
+_HEAD_SQL = ("(SELECT id FROM reservations WHERE book_id = {book} AND status = 'Bekliyor' "
+             "ORDER BY position LIMIT 1)")
+_HOLDER_SQL = "(SELECT id FROM reservations WHERE book_id = {book} AND status = 'Ayrıldı' LIMIT 1)"
+
+
+def _in(values):
+    return ",".join("?" * len(values))
+
+
+# --- OKUMA ---
+def queue_heads(conn, book_ids):
+    # {book_id: (title, kitap durumu, rez. id, üye id, üye adı, rez. durumu)}; sıra yoksa rez. alanları None
+    book_ids = list(book_ids)
+    if not book_ids: return {}
+    rows = conn.execute(f"""
+        SELECT b.id, b.title, b.status, r.id, r.member_id, m.name, r.status
+        FROM books b
+        LEFT JOIN reservations r ON r.id = coalesce({_HOLDER_SQL.format(book="b.id")},
+                                                    {_HEAD_SQL.format(book="b.id")})
+        LEFT JOIN members m ON m.id = r.member_id
+        WHERE b.id IN ({_in(book_ids)})
+    """, book_ids).fetchall()
+    return {row[0]: row[1:] for row in rows}
+
+
+def waiting_count(book_id):
+    return db.fetch_value("SELECT waiting FROM book_queue WHERE book_id = ?", (book_id,), default=0)
+
+
+def queue_df():
+    # Bekleyen ve ayrılmış tüm talepler; Sıra: kitap kuyruğundaki yeri (ayrılan = 0)
+    # Sıra numarası kuyruk indeksi sırasıyla (book_id, position) hesaplanır, ek sıralama gerekmez
+    return db.read_df("""
+        SELECT r.id, b.title as 'Kitap', m.name as 'Üye', r.request_date as 'Tarih', r.place as 'Sıra'
+        FROM (SELECT id, book_id, member_id, request_date, 0 AS held,
+                     ROW_NUMBER() OVER (PARTITION BY book_id ORDER BY position) || '. sırada' AS place
+              FROM reservations WHERE status = 'Bekliyor'
+              UNION ALL
+              SELECT id, book_id, member_id, request_date, 1, 'Ayrıldı (' || hold_until || ' son)'
+              FROM reservations WHERE status = 'Ayrıldı') r
+        JOIN books b ON r.book_id = b.id
+        JOIN members m ON r.member_id = m.id
+        ORDER BY r.held DESC, r.request_date, r.id
+    """)
+
+
+# --- ÖDÜNÇ VERME KONTROLÜ ---
+def lend_check(conn, member_id, book_ids):
+    # Dönüş: (sorunlar [(book_id, mesaj)], karşılanacak rezervasyon id'leri).
+    # Kitap ayrılmışsa sadece ayrılan üyeye, sırası varsa sadece sıradaki ilk üyeye verilir.
+    heads = queue_heads(conn, book_ids)
+    problems, fulfil_ids = [], []
+    for book_id in book_ids:
+        if book_id not in heads:
+            problems.append((book_id, "Kitap bulunamadı"))
+            continue
+        title, status, res_id, res_member_id, res_owner, res_status = heads[book_id]
+        if status not in LENDABLE:
+            problems.append((book_id, f"'{title}' şu an {status}"))
+        elif res_id is not None and res_member_id != member_id:
+            verb = "adına ayrılmış" if res_status == HELD else "adına rezerve edilmiş"
+            problems.append((book_id, f"⛔ '{title}' {res_owner} {verb}"))
+        elif res_id is not None:
+            fulfil_ids.append(res_id)
+    return problems, fulfil_ids
+
+
+def fulfil(conn, reservation_ids):
+    if reservation_ids:
+        conn.execute(f"UPDATE reservations SET status = 'Tamamlandı' WHERE id IN ({_in(reservation_ids)})",
+                     list(reservation_ids))
+
+
+# --- İADE: SIRADAKİNE AYIR ---
+def hand_off(conn, book_ids):
+    # Rafa dönen kitapları sıradaki ilk üyeye ayırır, sırası olmayanları 'Müsait' yapar.
+    # Aynı işlem içinde çağrılmalıdır. Dönüş: [(kitap, üye, telefon, son tarih)]
+    book_ids = list(book_ids)
+    if not book_ids: return []
+    held = conn.execute(f"""
+        UPDATE reservations SET status = 'Ayrıldı', hold_until = DATE('now', ?)
+        WHERE id IN (SELECT {_HEAD_SQL.format(book="b.id")} FROM books b WHERE b.id IN ({_in(book_ids)}))
+        RETURNING id, book_id
+    """, [f"+{HOLD_DAYS} days"] + book_ids).fetchall()
+    held_books = [row[1] for row in held]
+    conn.execute(f"""
+        UPDATE books SET status = CASE WHEN id IN ({_in(held_books)}) THEN 'Ayrıldı' ELSE 'Müsait' END
+        WHERE id IN ({_in(book_ids)})
+    """, held_books + book_ids)
+    if not held: return []
+    held_ids = [row[0] for row in held]
+    return conn.execute(f"""
+        SELECT b.title, m.name, m.phone, r.hold_until FROM reservations r
+        JOIN books b ON r.book_id = b.id
+        JOIN members m ON r.member_id = m.id
+        WHERE r.id IN ({_in(held_ids)})
+    """, held_ids).fetchall()
+
+
+# --- TALEP / İPTAL ---
+@db.retry_on_busy
+def enqueue(book_id, member_id):
+    # Dönüş: (başarılı mı, mesaj)
+    with db.transaction(immediate=True) as conn:
+        status = conn.execute("SELECT status FROM books WHERE id = ?", (book_id,)).fetchone()
+        if status is None:
+            return False, "Kitap bulunamadı."
+        if status[0] not in RESERVABLE:
+            return False, f"Kitap şu an {status[0]}; rezervasyon gerekmez."
+        exists = conn.execute("""
+            SELECT 1 FROM reservations WHERE book_id = ? AND member_id = ? AND status IN ('Bekliyor', 'Ayrıldı')
+        """, (book_id, member_id)).fetchone()
+        if exists:
+            return False, "Bu üye zaten bu kitap için sırada bekliyor."
+        conn.execute("INSERT INTO reservations (book_id, member_id, request_date) VALUES (?, ?, DATE('now'))",
+                     (book_id, member_id))
+        waiting = conn.execute("SELECT waiting FROM book_queue WHERE book_id = ?", (book_id,)).fetchone()[0]
+    return True, f"Rezervasyon alındı. Sıra: {waiting}."
+
+
+@db.retry_on_busy
+def cancel(reservation_id):
+    # Ayrılmış bir talep iptal edilirse kitap sıradaki kişiye geçer. Dönüş: hand_off çıktısı
+    with db.transaction(immediate=True) as conn:
+        row = conn.execute("SELECT book_id, status FROM reservations WHERE id = ?", (reservation_id,)).fetchone()
+        if row is None or row[1] not in (WAITING, HELD):
+            return []
+        conn.execute("UPDATE reservations SET status = 'İptal' WHERE id = ?", (reservation_id,))
+        if row[1] == HELD:
+            return hand_off(conn, [row[0]])
+    return []
+
+
+@db.retry_on_busy
+def expire_holds():
+    # Süresi dolan ayırmaları kapatıp kitabı sıradakine geçirir. Ucuz ön kontrol:
+    # süresi dolan yoksa yazma işlemi açılmaz. Dönüş: hand_off çıktısı
+    if db.fetch_one("SELECT 1 FROM reservations WHERE status = 'Ayrıldı' AND hold_until < DATE('now') LIMIT 1") is None:
+        return []
+    with db.transaction(immediate=True) as conn:
+        book_ids = [row[0] for row in conn.execute("""
+            UPDATE reservations SET status = 'Süresi Doldu'
+            WHERE status = 'Ayrıldı' AND hold_until < DATE('now')
+            RETURNING book_id
+        """).fetchall()]
+        return hand_off(conn, book_ids)
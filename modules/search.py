@@ -0,0 +1,76 @@
+import re
+
+from modules import db_manager as db
+
+# --- KATALOG ARAMA (FTS5) ---
+# books_fts tablosu migrations.py (göç 3) ile oluşturulur ve books üzerindeki
+# tetikleyicilerle senkron tutulur.
+#
+# Türkçe katlama: FTS5 "unicode61 remove_diacritics 2" tokenizer'ı büyük/küçük
+# harfi ve İ/Ş/Ğ/Ü/Ö/Ç aksanlarını zaten katlar; katlayamadığı tek harf noktasız
+# 'ı' (U+0131). Bu yüzden hem indekse yazarken hem sorguda 'ı' -> 'i' yapılır.
+# Sonuç: "IŞIK", "ışık", "Işık" ve "isik" aynı terime düşer.
+
+SEARCH_LIMIT = 50
+MAX_TERMS = 8
+
+# bm25 ağırlıkları: başlık > yazar > ISBN > raf
+BM25_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+_TR_FOLD_FROM = "İIıŞşĞğÜüÖöÇçÂâÎîÛû"
+_TR_FOLD_TO = "iiissgguuooccaaiiuu"
+# SQLite lower() yalnızca ASCII harfleri küçültür; Python tarafı da aynısını
+# yapar (É gibi diğer harfler iki tarafta da olduğu gibi kalır)
+_ASCII_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_TR_FOLD = str.maketrans(_TR_FOLD_FROM + _ASCII_UPPER, _TR_FOLD_TO + _ASCII_UPPER.lower())
+_ISBN_SEP = re.compile(r"(?<=\d)[-\s](?=\d)")
+_TERM = re.compile(r"\w+")
+
+
+def fold_tr(text):
+    # Python tarafı katlama (aksansız, küçük harf): "İĞNE Işığı" -> "igne isigi".
+    # fold_sql() ile birebir aynı sonucu verir (önbellek ve SQL aynı önekleri bulur)
+    return (text or "").translate(_TR_FOLD)
+
+
+def fold_sql(expr):
+    # fold_tr() ile aynı sonucu veren SQL ifadesi (üretilen kolonlar / indeksler için)
+    for src, dst in zip(_TR_FOLD_FROM, _TR_FOLD_TO):
+        expr = f"replace({expr}, '{src}', '{dst}')"
+    return f"lower({expr})"
+
+
+def search_fold_sql(expr):
+    # İndekse yazılan değer için SQL ifadesi (tetikleyicilerde kullanılır)
+    return f"replace(coalesce({expr}, ''), 'ı', 'i')"
+
+
+def search_isbn_sql(expr):
+    # ISBN tire/boşluksuz indekslenir: 978-605-... ve 978605... aynı terim
+    return f"replace(replace(coalesce({expr}, ''), '-', ''), ' ', '')"
+
+
+def build_match(text):
+    # Kullanıcı girdisini güvenli bir FTS5 MATCH ifadesine çevirir.
+    # Her terim tırnak içine alınır (FTS sözdizimi enjekte edilemez) ve önek
+    # araması için '*' eklenir: "kürk mant" -> "kurk"* "mant"*
+    text = _ISBN_SEP.sub("", fold_tr(text))
+    terms = _TERM.findall(text)[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_books(text, limit=SEARCH_LIMIT):
+    match = build_match(text)
+    if match is None:
+        match = '""'  # hiçbir şeyle eşleşmez, aynı kolonlarla boş tablo döner
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return db.read_df(f"""
+        SELECT b.title as 'Eser', b.author as 'Yazar', b.location as 'Raf', b.status as 'Durum'
+        FROM books_fts f
+        JOIN books b ON b.id = f.rowid
+        WHERE books_fts MATCH ?
+        ORDER BY bm25(books_fts, {weights})
+        LIMIT ?
+    """, (match, int(limit)))
@@ -0,0 +1,137 @@
+from modules import catalog_cache
+from modules import db_manager as db
+from modules import lookup
+from modules import reservation_queue
+from modules import stats
+from modules.checkout import (LOAN_DAYS_ERROR, MAX_LOAN_DAYS, MIN_LOAN_DAYS, checkin, checkout, resolve_checkout,
+                             resolve_return)
+
+# --- SERVİS KATMANI ---
+# Kütüphane işlemlerinin arayüzden bağımsız hali. Streamlit ekranları ve yerel
+# HTTP API (modules/api.py) aynı fonksiyonları çağırır; hiçbiri st.* kullanmaz.
+# Yazan işlemler (başarılı mı, mesaj veya yeni id) döndürür.
+#
+# Ödünç / iade: checkout.checkout(member_id, book_ids, days) / checkout.checkin(loan_ids)
+# Rezervasyon:  reserve / cancel_reservation (reservation_queue)
+# Okuma:        lookup.find_* (typeahead), catalog_cache.get_* (kayıt)
+
+__all__ = [
+    "checkout", "checkin", "resolve_checkout", "resolve_return",
+    "reserve", "cancel_reservation", "reservations",
+    "add_book", "update_book", "delete_book", "get_book", "find_books",
+    "add_member", "update_member", "delete_member", "get_member", "find_members",
+    "find_active_loans", "kpis", "MIN_LOAN_DAYS", "MAX_LOAN_DAYS", "LOAN_DAYS_ERROR",
+]
+
+UNDELETABLE_BOOK = ('Ödünçte', 'Ayrıldı')
+
+get_book = catalog_cache.get_book
+get_member = catalog_cache.get_member
+find_books = lookup.find_books
+find_members = lookup.find_members
+find_active_loans = lookup.find_active_loans
+reserve = reservation_queue.enqueue
+cancel_reservation = reservation_queue.cancel
+
+
+def reservations():
+    return reservation_queue.queue_df()
+
+
+INVALID_FIELD = "Geçersiz alan değeri (metin bekleniyor)."
+
+
+def _texts(*values):
+    # Metin alanları: None -> "", metin / sayı -> kırpılmış metin. Liste / sözlük gibi
+    # bir değer varsa None (API'den gelen JSON veritabanına ulaşmadan reddedilir)
+    if any(isinstance(v, bool) or not isinstance(v, (str, int, float, type(None))) for v in values):
+        return None
+    return tuple("" if v is None else str(v).strip() for v in values)
+
+
+def kpis():
+    total_books, total_members, active_loans, overdue = stats.get_kpis()
+    return {"books": total_books, "members": total_members, "active_loans": active_loans, "overdue": overdue}
+
+
+# --- KİTAP ---
+@db.retry_on_busy
+def add_book(title, author, location="", isbn=""):
+    fields = _texts(title, author, location, isbn)
+    if fields is None:
+        return False, INVALID_FIELD
+    title, author, location, isbn = fields
+    if not (title and author):
+        return False, "Eksik bilgi."
+    with db.transaction() as conn:
+        book_id = conn.execute("INSERT INTO books (title, author, location, isbn) VALUES (?, ?, ?, ?)",
+                               (title, author, location, isbn)).lastrowid
+    return True, book_id
+
+
+def update_book(book_id, title, author, location):
+    fields = _texts(title, author, location)
+    if fields is None:
+        return False, INVALID_FIELD
+    title, author, location = fields
+    if not (title and author):
+        return False, "Kitap adı ve yazar boş olamaz."
+    if db.execute("UPDATE books SET title=?, author=?, location=? WHERE id=?",
+                  (title, author, location, book_id)) == 0:
+        return False, "Kitap bulunamadı."
+    return True, "Güncellendi."
+
+
+@db.retry_on_busy
+def delete_book(book_id):
+    # Ödünçteki veya üyeye ayrılmış kitap silinemez; kontrol ve silme tek işlemde
+    with db.transaction(immediate=True) as conn:
+        row = conn.execute("SELECT status FROM books WHERE id=?", (book_id,)).fetchone()
+        if row is None:
+            return False, "Kitap bulunamadı."
+        if row[0] in UNDELETABLE_BOOK:
+            return False, f"Bu kitap {row[0].lower()}, silinemez!"
+        conn.execute("DELETE FROM books WHERE id=?", (book_id,))
+    return True, "Silindi."
+
+
+# --- ÜYE ---
+@db.retry_on_busy
+def add_member(name, phone, email=""):
+    fields = _texts(name, phone, email)
+    if fields is None:
+        return False, INVALID_FIELD
+    name, phone, email = fields
+    if not (name and phone):
+        return False, "Ad ve Telefon zorunludur."
+    with db.transaction() as conn:
+        member_id = conn.execute(
+            "INSERT INTO members (name, phone, email, join_date) VALUES (?, ?, ?, DATE('now'))",
+            (name, phone, email)).lastrowid
+    return True, member_id
+
+
+def update_member(member_id, name, phone, email):
+    fields = _texts(name, phone, email)
+    if fields is None:
+        return False, INVALID_FIELD
+    name, phone, email = fields
+    if not (name and phone):
+        return False, "Ad ve Telefon zorunludur."
+    if db.execute("UPDATE members SET name=?, phone=?, email=? WHERE id=?",
+                  (name, phone, email, member_id)) == 0:
+        return False, "Üye bulunamadı."
+    return True, "Üye bilgileri güncellendi."
+
+
+@db.retry_on_busy
+def delete_member(member_id):
+    # Üzerinde iade edilmemiş kitap olan üye silinemez
+    with db.transaction(immediate=True) as conn:
+        active_loan = conn.execute("SELECT COUNT(*) FROM transactions WHERE member_id=? AND status='Aktif'",
+                                   (member_id,)).fetchone()[0]
+        if active_loan:
+            return False, f"HATA: Bu üyenin elinde {active_loan} adet iade edilmemiş kitap var. Silinemez!"
+        if conn.execute("DELETE FROM members WHERE id=?", (member_id,)).rowcount == 0:
+            return False, "Üye bulunamadı."
+    return True, "Üye silindi."
@@ -0,0 +1,39 @@
+from modules import db_manager as db
+
+# --- OPERASYON MERKEZİ GÖSTERGELERİ ---
+# library_stats ve active_loans_by_due tabloları migrations.py (göç 5) içindeki
+# tetikleyicilerle her yazmada güncellenir; burada sadece okunur.
+
+
+# (toplam kitap, toplam üye, ödünçteki, geciken) — tek satır + küçük tablo toplamı
+# (şube toplamları da aynı sorguyu her şubede çalıştırır: modules/branches.py)
+KPI_SQL = """
+    SELECT s.total_books, s.total_members, s.active_loans,
+           (SELECT coalesce(SUM(n), 0) FROM active_loans_by_due WHERE due_date <= DATE('now'))
+    FROM library_stats s
+    WHERE s.id = 1
+"""
+
+
+def get_kpis():
+    row = db.fetch_one(KPI_SQL)
+    return tuple(row) if row else (0, 0, 0, 0)
+
+
+def overdue_loans(limit=None):
+    # Kısmi indeks (idx_transactions_active_due) üzerinde aralık taraması.
+    # Satırlar: (id, üye, eser, teslim tarihi, telefon, gecikme günü) — DataFrame kurulmaz
+    sql = """
+        SELECT t.id, m.name, b.title, t.due_date, m.phone,
+        CAST(julianday('now') - julianday(t.due_date) AS INTEGER) as gecikme
+        FROM transactions t
+        JOIN members m ON t.member_id = m.id
+        JOIN books b ON t.book_id = b.id
+        WHERE t.status = 'Aktif' AND t.due_date <= DATE('now')
+        ORDER BY t.due_date
+    """
+    params = ()
+    if limit is not None:
+        sql += " LIMIT ?"
+        params = (int(limit),)
+    return db.fetch_all(sql, params)
@@ -0,0 +1,110 @@
+import html
+from functools import reduce
+from operator import add
+
+import streamlit as st
+
+from modules import db_manager as db
+
+# --- SAYFALI HTML TABLO ---
+# Sayfalama SQL seviyesinde "keyset" (seek) yöntemiyle yapılır:
+#   WHERE (sıralama, id) > (son_sıralama, son_id) ORDER BY sıralama, id LIMIT n
+# OFFSET kullanılmadığı için her sayfa, tablo büyüklüğünden bağımsız olarak
+# indeks üzerinde n+1 satır okur. HTML, satır satır += yerine kolon bazında
+# (pandas vektörel string işlemleri) üretilip tek seferde birleştirilir.
+# Küçük, satır listesi olarak gelen tablolar (gecikenler, sepet, tanılama) için
+# rows_table aynı HTML'i pandas'a hiç dokunmadan üretir.
+
+PAGE_SIZES = (25, 50, 100)
+EMPTY_HTML = "<div style='padding:20px; font-size:1.2rem;'>Kayıt bulunamadı.</div>"
+
+
+def create_custom_table(df, alert_col=None):
+    if df.empty: return EMPTY_HTML
+    head = "".join(f"<th>{html.escape(str(col))}</th>" for col in df.columns)
+    cells = []
+    for col in df.columns:
+        td = "<td class='alert-row'>" if alert_col and col == alert_col else "<td>"
+        cells.append(td + df[col].astype(str).map(html.escape) + "</td>")
+    rows = "<tr>" + reduce(add, cells) + "</tr>"
+    return f'<table class="big-table"><thead><tr>{head}</tr></thead><tbody>{"".join(rows.tolist())}</tbody></table>'
+
+
+def rows_table(columns, rows, alert_col=None):
+    # columns: başlıklar, rows: aynı sırada değer demetleri (create_custom_table ile aynı çıktı)
+    if not rows: return EMPTY_HTML
+    head = "".join(f"<th>{html.escape(str(col))}</th>" for col in columns)
+    tds = ["<td class='alert-row'>" if alert_col and col == alert_col else "<td>" for col in columns]
+    body = "".join("<tr>" + "".join(td + html.escape(str(value)) + "</td>" for td, value in zip(tds, row)) + "</tr>"
+                   for row in rows)
+    return f'<table class="big-table"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def _to_python(value):
+    # numpy skalerleri sqlite3 parametresi olarak bağlanamaz
+    return value.item() if hasattr(value, "item") else value
+
+
+def fetch_page(source, columns, sort_expr, id_expr, after=None, descending=False,
+               page_size=PAGE_SIZES[0], where="", params=()):
+    # Bir sayfa + bir sonraki sayfanın başlangıç anahtarını döndürür (yoksa None)
+    op, direction = ("<", "DESC") if descending else (">", "ASC")
+    conditions = [f"({where})"] if where else []
+    args = list(params)
+    if after is not None:
+        # (sıralama, id) > (?, ?) ile eşdeğer; ilk koşul indeks üzerinde aralık araması sağlar
+        conditions.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR {id_expr} {op} ?)")
+        args.extend((after[0], after[0], after[1]))
+    sql = f"SELECT {sort_expr} AS _sort_key, {id_expr} AS _row_id, {columns} FROM {source}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {sort_expr} {direction}, {id_expr} {direction} LIMIT ?"
+    args.append(int(page_size) + 1)
+
+    df = db.read_df(sql, tuple(args))
+    next_key = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        next_key = (_to_python(df["_sort_key"].iloc[-1]), _to_python(df["_row_id"].iloc[-1]))
+    return df.drop(columns=["_sort_key", "_row_id"]), next_key
+
+
+def paged_table(key, source, columns, sort_options, id_expr="id", where="", params=(),
+                alert_col=None, transform=None, fetch=None):
+    # sort_options: {"Görünen ad": "SQL sıralama ifadesi"}; ilk seçenek varsayılan.
+    # transform: sayfa DataFrame'ini gösterim öncesi düzenleyen isteğe bağlı fonksiyon.
+    # fetch: fetch(sıralama adı, after, descending, page_size) -> (df, sonraki anahtar)
+    #        veya None; bellekteki kopyadan sayfa verir (catalog_cache), None ise SQL.
+    c_sort, c_dir, c_size = st.columns([2, 1, 1])
+    sort_label = c_sort.selectbox("Sırala:", list(sort_options.keys()), key=f"{key}_sort")
+    descending = c_dir.radio("Yön:", ["Artan", "Azalan"], key=f"{key}_dir", horizontal=True) == "Azalan"
+    page_size = c_size.selectbox("Sayfa başına:", PAGE_SIZES, key=f"{key}_size")
+
+    # Sıralama/sayfa boyutu/filtre değişince baştan başla
+    signature = (sort_label, descending, page_size, where, tuple(params))
+    state_key = f"{key}_cursors"
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[state_key] = [None]
+    cursors = st.session_state[state_key]
+
+    result = fetch(sort_label, cursors[-1], descending, page_size) if fetch is not None else None
+    if result is None:
+        result = fetch_page(source, columns, sort_options[sort_label], id_expr, after=cursors[-1],
+                            descending=descending, page_size=page_size, where=where, params=params)
+    df, next_key = result
+    if transform is not None and not df.empty:
+        df = transform(df)
+    st.markdown(create_custom_table(df, alert_col=alert_col), unsafe_allow_html=True)
+
+    def _prev():
+        cursors.pop()
+
+    def _next():
+        cursors.append(next_key)
+
+    c_prev, c_page, c_next = st.columns([1, 2, 1])
+    c_prev.button("◀ Önceki", key=f"{key}_prev", on_click=_prev, disabled=len(cursors) <= 1)
+    c_page.markdown(f"<div style='text-align:center; padding-top:15px;'>Sayfa {len(cursors)}</div>",
+                    unsafe_allow_html=True)
+    c_next.button("Sonraki ▶", key=f"{key}_next", on_click=_next, disabled=next_key is None)
@@ -0,0 +1,87 @@
+import contextvars
+import time
+from functools import wraps
+
+import streamlit as st
+
+from modules import instrumentation
+
+# --- ORTAK ARAYÜZ YARDIMCILARI ---
+
+
+# --- İŞLEM SONUCU MESAJLARI (FLASH) ---
+# İşlemden sonra mesajı gösterip time.sleep ile bekletmek yerine mesaj
+# session_state'e yazılır ve hemen st.rerun() yapılır; yeniden çizimde aynı
+# görünüm mesajı bir kez gösterir. Oturumun iş parçacığı hiç beklemez.
+#   flash("Kitap iade alındı.")
+#   flash("Bu kitap sıradaki üyeye ayrıldı", "warning")
+#   st.rerun()
+FLASH_KEY = "flash_messages"
+_FLASH_KINDS = {"success": st.success, "info": st.info, "warning": st.warning, "error": st.error}
+_current_view = contextvars.ContextVar("akyurt_view", default=None)
+
+
+def flash(message, kind="success", toast=False):
+    # Mesaj, çağrıldığı görünümün (timed_view) bir sonraki çiziminde gösterilir
+    st.session_state.setdefault(FLASH_KEY, []).append((_current_view.get(), kind, message, toast))
+
+
+def show_flash(view=None):
+    pending = st.session_state.get(FLASH_KEY)
+    if not pending: return
+    st.session_state[FLASH_KEY] = [item for item in pending if item[0] != view]
+    for owner, kind, message, toast in pending:
+        if owner != view: continue
+        if toast:
+            st.toast(message)
+        else:
+            _FLASH_KINDS.get(kind, st.info)(message)
+
+
+# --- YAZDIKÇA ARA SEÇİCİ ---
+# Tüm tabloyu selectbox'a basmak yerine arama kutusuna göre en fazla
+# lookup.LOOKUP_LIMIT kayıt getirir. finder: lookup.find_* fonksiyonlarından biri.
+# Eşleşme yoksa None döner.
+def typeahead_select(label, finder, key, placeholder="Aramak için yazın...", **finder_args):
+    text = st.text_input(f"🔎 {label}", key=f"{key}_search", placeholder=placeholder)
+    options = dict(finder(text, **finder_args))
+    if not options:
+        if text: st.caption("Eşleşen kayıt bulunamadı.")
+        return None
+    return st.selectbox(label, list(options.keys()), format_func=options.get, key=key)
+
+
+# --- GÖRÜNÜM (VIEW) ÇALIŞTIRMA ---
+# timed_view ile işaretlenen fonksiyon bir st.fragment olur: içindeki bir form
+# gönderimi veya buton sadece o görünümü yeniden çalıştırır, sayfanın geri
+# kalanını (ve diğer sekmelerin sorgularını) değil. Çalışma süresi görünümün
+# altında gösterilir, session_state["view_timings"] içinde saklanır ve
+# Sistem Tanılama sayfası için instrumentation'a kaydedilir.
+def timed_view(title):
+    def decorator(func):
+        @st.fragment
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            token = _current_view.set(title)
+            try:
+                with instrumentation.section(title, kind="view"):
+                    show_flash(title)
+                    func(*args, **kwargs)
+            finally:
+                _current_view.reset(token)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            st.session_state.setdefault("view_timings", {})[title] = elapsed_ms
+            st.caption(f"⏱️ {title}: {elapsed_ms:.1f} ms")
+        return wrapper
+    return decorator
+
+
+# st.tabs her sekmenin gövdesini her seferinde çalıştırır. Bunun yerine sekme
+# başlıkları yatay bir seçici olarak çizilir ve SADECE seçili görünüm çalışır.
+# views: {"Sekme başlığı": görünüm fonksiyonu}
+def lazy_tabs(key, views):
+    choice = st.radio("Görünüm", list(views.keys()), key=key, horizontal=True,
+                      label_visibility="collapsed")
+    st.markdown("---")
+    views[choice]()
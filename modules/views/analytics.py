@@ -0,0 +1,101 @@
+import streamlit as st
+
+from modules import analytics
+from modules.tables import create_custom_table
+from modules.ui import timed_view
+
+# ========================================================
+# 6. MODÜL: İSTATİSTİKLER (DOLAŞIM RAPORU)
+# ========================================================
+# Tüm sayılar özet tablolardan gelir (modules/analytics); sayfa açılışında
+# son yenilemeden bu yana gelen ödünç / iadeler arka planda özetlere eklenir.
+
+# st.line_chart her rerun'da Altair şemasını baştan doğrular (sayfa süresinin
+# çoğu); grafik sabit bir Vega-Lite tanımıyla doğrudan çizilir
+SERIES_CHART = {
+    "mark": {"type": "line", "tooltip": True},
+    "encoding": {
+        "x": {"field": "Gün", "type": "temporal", "title": None},
+        "y": {"field": "Değer", "type": "quantitative", "title": None},
+        "color": {"field": "Seri", "type": "nominal", "title": None, "sort": None},
+    },
+}
+
+
+def daily_series(daily_df, month):
+    # Raf satırları gün bazında toplanır; boş günler 0 olarak ayın tamamına yayılır
+    import pandas as pd
+
+    days = pd.date_range(f"{month}-01", periods=pd.Period(month).days_in_month, freq="D")
+    per_day = daily_df.groupby(pd.to_datetime(daily_df["day"]))[["loans", "returns"]].sum()
+    per_day = per_day.reindex(days, fill_value=0)
+    per_day.index.name = "Gün"
+    return pd.DataFrame({
+        "Ödünç": per_day["loans"],
+        "İade": per_day["returns"],
+        "7 Günlük Ort.": per_day["loans"].rolling(7, min_periods=1).mean().round(1),
+    })
+
+
+def location_rates(daily_df, overdue_df):
+    # Raf bazında geç iade oranı + şu an geciken ödünçler (sütun işlemleri, döngü yok)
+    import pandas as pd
+
+    per_loc = daily_df.groupby("location")[["loans", "returns", "late_returns"]].sum()
+    per_loc = per_loc.join(overdue_df.set_index("location"), how="outer").fillna(0)
+    rate = (100 * per_loc["late_returns"] / per_loc["returns"].where(per_loc["returns"] > 0)).fillna(0)
+    table = pd.DataFrame({
+        "Raf": per_loc.index,
+        "Ödünç": per_loc["loans"].astype(int),
+        "İade": per_loc["returns"].astype(int),
+        "Geç İade": per_loc["late_returns"].astype(int),
+        "Geç İade %": rate.round(1),
+        "Şu An Geciken": per_loc["overdue_now"].astype(int),
+    })
+    return table.sort_values(["Ödünç", "Raf"], ascending=[False, True])
+
+
+@timed_view("İstatistikler")
+def report():
+    # Yeni ödünç / iadeler özetlere arka planda eklenir; sayfa mevcut özetleri gösterir
+    running = analytics.refresh_in_background()
+    if running:
+        st.caption("🔄 Özetler güncelleniyor; son ödünçler birazdan rapora yansır.")
+    months = analytics.months()
+    if not months:
+        st.info("Özetler ilk kez hazırlanıyor, birazdan sayfayı yenileyin." if running
+                else "Henüz ödünç kaydı yok.")
+        return
+
+    month = st.selectbox("Ay", months)
+    daily = analytics.daily_df(month)
+    loans, returns, late = (int(daily[col].sum()) for col in ("loans", "returns", "late_returns"))
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Ödünç", loans)
+    c2.metric("İade", returns)
+    c3.metric("Aktif Üye", analytics.active_members(month))
+    c4.metric("Geç İade", f"%{100 * late / returns:.1f}" if returns else "-")
+
+    st.subheader("📈 Günlük Ödünç")
+    series = daily_series(daily, month)
+    chart = series.reset_index().melt(id_vars="Gün", value_vars=["Ödünç", "7 Günlük Ort."],
+                                      var_name="Seri", value_name="Değer")
+    st.vega_lite_chart(chart, SERIES_CHART, width="stretch")
+
+    st.subheader("🏆 En Çok Okunanlar")
+    top = analytics.top_titles_df(month).rename(columns={
+        "title": "Eser", "author": "Yazar", "loans": "Ödünç", "copies": "Kopya"})
+    st.markdown(create_custom_table(top), unsafe_allow_html=True)
+
+    st.subheader("📚 Raf Bazında")
+    rates = location_rates(daily, analytics.overdue_by_location_df())
+    st.markdown(create_custom_table(rates), unsafe_allow_html=True)
+
+    st.download_button("GÜNLÜK VERİYİ İNDİR (CSV)", series.to_csv().encode("utf-8-sig"),
+                       file_name=f"dolasim_{month}.csv", mime="text/csv")
+
+
+def render():
+    st.title("İstatistikler")
+    report()
@@ -0,0 +1,186 @@
+import streamlit as st
+
+from modules import catalog_cache
+from modules import catalog_import
+from modules import db_manager as db
+from modules import lookup
+from modules import recommend
+from modules import search as catalog_search
+from modules import services
+from modules.tables import create_custom_table, paged_table, rows_table
+from modules.ui import flash, lazy_tabs, timed_view, typeahead_select
+
+# ========================================================
+# 4. MODÜL: KİTAP YÖNETİMİ (GELİŞMİŞ FİLTRELEME)
+# ========================================================
+
+# Liste sorguları (benchmarks/ da aynı tanımları kullanır)
+INVENTORY_COLUMNS = "title as 'Eser', author as 'Yazar', location as 'Raf', status as 'Durum'"
+INVENTORY_SORTS = {"Eser": "title", "Yazar": "author", "Raf": "coalesce(location, '')", "Kayıt No": "id"}
+# Aynı liste süreç geneli katalog önbelleğinden (SQL'e gitmeden)
+INVENTORY_CACHE_COLUMNS = {"Eser": "title", "Yazar": "author", "Raf": "location", "Durum": "status"}
+INVENTORY_CACHE_SORTS = {"Eser": "title", "Yazar": "author", "Raf": "location", "Kayıt No": "id"}
+
+# Kitabı alanı, tarihi ve O KİTAP İÇİN BEKLEYEN REZERVASYON SAYISINI getirir.
+# Bekleyen sayısı book_queue sayacından (göç 8) tek satır okumadır.
+LOANED_SOURCE = """transactions t JOIN books b ON t.book_id = b.id JOIN members m ON t.member_id = m.id
+    LEFT JOIN book_queue q ON q.book_id = b.id"""
+LOANED_COLUMNS = """b.title as 'Eser', m.name as 'Alan Üye', t.due_date as 'Dönüş Tarihi',
+    coalesce(q.waiting, 0) as 'Sırada Bekleyen'"""
+LOANED_SORTS = {"Dönüş Tarihi": "t.due_date", "İşlem No": "t.id"}
+LOANED_WHERE = "t.status = 'Aktif'"
+
+
+def format_waiting(df):
+    # Bekleyen varsa o sütunu kırmızı gösterelim
+    df['Sırada Bekleyen'] = df['Sırada Bekleyen'].apply(lambda x: f"{x} KİŞİ" if x > 0 else "-")
+    return df
+
+
+def inventory_page(sort_label, after, descending, page_size):
+    return catalog_cache.page("books", INVENTORY_CACHE_COLUMNS, INVENTORY_CACHE_SORTS[sort_label],
+                              after, descending, page_size)
+
+
+# --- 1. TÜM ENVANTER ---
+@timed_view("Tüm Envanter")
+def inventory_view():
+    search = st.text_input("Kitap Ara:", placeholder="Kitap adı, yazar, ISBN, raf...")
+    if search:
+        # FTS5 indeksi: Türkçe katlama, önek eşleşmesi, bm25 sıralaması
+        df = catalog_search.search_books(search)
+        st.markdown(create_custom_table(df), unsafe_allow_html=True)
+    else:
+        paged_table("books_list", "books", INVENTORY_COLUMNS, INVENTORY_SORTS, fetch=inventory_page)
+
+
+# --- 2. ÖDÜNÇTEKİLER VE SIRA DURUMU ---
+@timed_view("Ödünçtekiler & Sıra")
+def loaned_view():
+    st.markdown("### Şu An Dışarıda Olan Kitaplar")
+    if not db.fetch_value("SELECT 1 FROM transactions WHERE status = 'Aktif' LIMIT 1"):
+        st.info("Şu an dışarıda hiç kitap yok.")
+    else:
+        paged_table("loaned_list", LOANED_SOURCE, LOANED_COLUMNS, LOANED_SORTS,
+                    id_expr="t.id", where=LOANED_WHERE,
+                    alert_col="Sırada Bekleyen", transform=format_waiting)
+
+
+# --- 3. EKLEME ---
+@timed_view("Yeni Ekle")
+def add_book_view():
+    st.markdown("### Yeni Eser Girişi")
+    with st.container(border=True):
+        with st.form("add_book_form"):
+            col1, col2 = st.columns(2)
+            t = col1.text_input("Kitap Adı")
+            a = col2.text_input("Yazar")
+            l = col1.text_input("Raf Numarası")
+            i = col2.text_input("ISBN (Opsiyonel)")
+
+            if st.form_submit_button("KİTABI KAYDET"):
+                ok, result = services.add_book(t, a, l, i)
+                if ok:
+                    st.success(f"'{t}' envantere eklendi.")
+                else:
+                    st.error(result)
+
+
+# --- 4. TOPLU AKTARIM (CSV / MARC21) ---
+@timed_view("Toplu Aktarım")
+def import_view():
+    st.markdown("### Toplu Katalog Aktarımı")
+    st.caption("CSV başlığı: Kitap Adı; Yazar; ISBN; Raf Numarası (ayraç otomatik bulunur) "
+               "veya MARC21 (.mrc) dosyası. ISBN tekrarları atlanır.")
+    uploaded = st.file_uploader("Dosya Seç", type=["csv", "tsv", "txt", "mrc", "marc"])
+    c1, c2 = st.columns(2)
+    dry_run = c1.checkbox("Deneme (veritabanına yazma)", value=True)
+    require_isbn = c2.checkbox("ISBN'siz kayıtları reddet")
+
+    if uploaded is not None and st.button("AKTARIMI BAŞLAT", type="primary"):
+        bar = st.progress(0.0, text="Başlıyor...")
+
+        def _progress(report, fraction):
+            bar.progress(fraction, text=f"Okunan {report['read']:,} | Eklenen {report['inserted']:,}")
+
+        try:
+            report = catalog_import.import_file(uploaded, name=uploaded.name, dry_run=dry_run,
+                                                require_isbn=require_isbn, progress=_progress)
+        except catalog_import.ImportFormatError as exc:
+            st.error(str(exc))
+            return
+        bar.progress(1.0, text=f"Tamamlandı ({report['seconds']:.1f} sn)")
+
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Okunan", report["read"])
+        m2.metric("Eklenecek" if dry_run else "Eklenen", report["inserted"])
+        m3.metric("Tekrar", report["duplicates_file"] + report["duplicates_db"])
+        m4.metric("Hatalı", report["invalid"])
+        if report["errors"]:
+            st.markdown(f"#### Reddedilen Kayıtlar (ilk {len(report['errors'])})")
+            st.markdown(rows_table(["Satır", "Sebep", "Eser"], report["errors"], alert_col="Sebep"),
+                        unsafe_allow_html=True)
+        if dry_run:
+            st.info("Deneme modu: hiçbir kayıt yazılmadı.")
+        else:
+            st.success(f"{report['inserted']} kitap envantere eklendi.")
+
+
+# --- 5. DÜZENLEME / SİLME ---
+@timed_view("Kitap Düzenle / Sil")
+def edit_book_view():
+    st.markdown("### Kitap Düzenle veya Sil")
+    selected_book_id = typeahead_select("İşlem Yapılacak Kitap:", lookup.find_books, key="edit_book",
+                                        placeholder="Kitap adı, yazar, ISBN...")
+
+    if selected_book_id is None:
+        if not st.session_state.get("edit_book_search"): st.warning("Kitap yok.")
+    else:
+        curr_book = catalog_cache.get_book(selected_book_id)
+        if curr_book is None:
+            # Seçim yapıldıktan sonra başka bir masada silinmiş: seçimi bırak
+            flash("Kayıt silinmiş, seçim temizlendi.", "warning")
+            st.session_state.pop("edit_book", None)
+            st.rerun()
+
+        with st.form("edit_book_form"):
+            new_title = st.text_input("Kitap Adı", value=curr_book[1])
+            new_author = st.text_input("Yazar", value=curr_book[2])
+            new_loc = st.text_input("Raf Yeri", value=curr_book[4])
+
+            c1, c2 = st.columns(2)
+            if c1.form_submit_button("💾 GÜNCELLE"):
+                ok, msg = services.update_book(selected_book_id, new_title, new_author, new_loc)
+                if ok:
+                    flash(msg)
+                    st.rerun()
+                else:
+                    st.error(msg)
+
+            if c2.form_submit_button("🗑️ SİL"):
+                ok, msg = services.delete_book(selected_book_id)
+                if ok:
+                    flash(msg)
+                    st.rerun()
+                else:
+                    st.error(msg)
+
+        # Hazır komşu tablosundan tek aralık okuması (modules/recommend.py)
+        st.markdown("#### 📚 Bu Kitabı Okuyanlar Bunları da Okudu")
+        suggestions = recommend.suggest([selected_book_id])
+        if suggestions:
+            st.markdown(rows_table(recommend.COLUMNS, suggestions), unsafe_allow_html=True)
+        else:
+            st.caption("Bu kitap için henüz öneri yok.")
+
+
+def render():
+    st.title("Kitap Envanter Yönetimi")
+    # Sekmeler: Tümü | Ödünçtekiler | Ekle | Toplu Aktar | Düzenle (sadece seçili olan çalışır)
+    lazy_tabs("books_tab", {
+        "Tüm Envanter": inventory_view,
+        "Ödünçtekiler & Sıra": loaned_view,
+        "Yeni Ekle": add_book_view,
+        "Toplu Aktar": import_view,
+        "Düzenle / Sil": edit_book_view,
+    })
@@ -0,0 +1,154 @@
+import streamlit as st
+
+from modules import branches
+from modules import lookup
+from modules import reservation_queue
+from modules.tables import rows_table
+from modules.ui import flash, lazy_tabs, timed_view, typeahead_select
+
+# ========================================================
+# 7. MODÜL: ŞUBELER
+# ========================================================
+# Menüde yalnızca AKYURT_BRANCHES ile birden çok şube tanımlıysa görünür.
+# Şube sorguları paralel çalışır (modules/branches.py); ulaşılamayan şube
+# sayfayı bozmaz, uyarı olarak gösterilir.
+
+TRANSFER_COLUMNS = ("Yön", "Şube", "Eser", "Yazar", "Ayrılacak Üye", "Tarih")
+
+
+def enabled():
+    return branches.enabled()
+
+
+def _warn(errors):
+    for name, message in errors.items():
+        st.warning(f"{name} şubesine ulaşılamadı: {message}")
+
+
+@timed_view("Şube Toplamları")
+def totals_view():
+    per_branch, total, errors = branches.kpis()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Toplam Kitap", total[0])
+    c2.metric("Toplam Üye", total[1])
+    c3.metric("Ödünç Verilen", total[2])
+    c4.metric("Geciken İade", total[3])
+    _warn(errors)
+    st.markdown(rows_table(("Şube", "Kitap", "Üye", "Ödünçte", "Geciken"),
+                           [(name,) + values for name, values in per_branch.items()], alert_col="Geciken"),
+                unsafe_allow_html=True)
+
+
+@timed_view("Ortak Katalog")
+def catalog_view():
+    text = st.text_input("Tüm şubelerde ara:", key="branch_search", placeholder="Kitap adı, yazar, ISBN, raf...")
+    if not text:
+        st.info("Aranacak kitabı yazın.")
+        return
+    rows, errors = branches.search_books(text)
+    _warn(errors)
+    st.markdown(rows_table(("Şube", "Eser", "Yazar", "Raf", "Durum"),
+                           [(name, title, author, location or "-", status)
+                            for name, _, title, author, location, status in rows]),
+                unsafe_allow_html=True)
+
+    # Başka şubedeki müsait kopya bu şubeye gönderilir ve gelince üyeye ayrılır
+    remote = {(row[0], row[1]): f"{row[2]} — {row[3]} ({row[0]})" for row in rows
+              if row[0] != branches.LOCAL_BRANCH and row[5] == reservation_queue.BOOK_AVAILABLE}
+    if not remote: return
+    with st.container(border=True):
+        st.markdown("### 🚚 Bu Şubeye Getir")
+        choice = st.selectbox("Kopya:", list(remote), format_func=remote.get, key="branch_copy")
+        mem_id = typeahead_select("Talep Eden Üye:", lookup.find_members, key="branch_member",
+                                  placeholder="Ad soyad, üye no veya telefon...")
+        if mem_id is not None and st.button("TALEP ET"):
+            ok, message = branches.request_copy(choice[0], choice[1], mem_id)
+            flash(message, "success" if ok else "error")
+            st.rerun()
+
+
+@timed_view("Şubelerde Üye")
+def member_view():
+    text = st.text_input("🔎 Üye ara (tüm şubeler):", key="branch_people_search",
+                         placeholder="Ad soyad, üye no veya telefon...")
+    members, errors = branches.find_members(text)
+    _warn(errors)
+    if not members:
+        if text: st.caption("Eşleşen kayıt bulunamadı.")
+        return
+    phones = {(row[0], row[1]): row[3] for row in members}
+    labels = {(row[0], row[1]): f"{row[2]} ({row[3]}) — {row[0]}" for row in members}
+    choice = st.selectbox("Üye:", list(labels), format_func=labels.get, key="branch_people_pick")
+
+    # Aynı telefonla kayıtlı üyelik her şubede aynı kişi sayılır
+    loans, errors = branches.member_loans(phones[choice])
+    _warn(errors)
+    st.markdown(f"### 📚 Tüm Şubelerdeki Ödünçleri ({len(loans)})")
+    st.markdown(rows_table(("Şube", "Üye", "Eser", "Veriliş", "Teslim Tarihi", "Gecikme"),
+                           [row[:5] + (f"{row[5]} GÜN" if row[5] else "-",) for row in loans],
+                           alert_col="Gecikme"), unsafe_allow_html=True)
+
+
+@timed_view("Transferler")
+def transfers_view():
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.markdown("### 📤 Kitap Gönder")
+        with st.container(border=True):
+            book_id = typeahead_select("Gönderilecek Kitap (Sadece Müsait):", lookup.find_books,
+                                       key="transfer_book", status=reservation_queue.BOOK_AVAILABLE,
+                                       placeholder="Kitap adı, yazar, ISBN...")
+            targets = [name for name in branches.branches() if name != branches.LOCAL_BRANCH]
+            target = st.selectbox("Hedef Şube:", targets, key="transfer_target")
+            if book_id is not None and st.button("GÖNDER"):
+                ok, message = branches.send(book_id, target)
+                flash(message, "success" if ok else "error")
+                st.rerun()
+
+    open_rows = branches.transfers()
+    incoming = [row for row in open_rows if row[1] == branches.INCOMING]
+    outgoing = [row for row in open_rows if row[1] == branches.OUTGOING]
+    with col2:
+        st.markdown(f"### 📥 Gelen Kitaplar ({len(incoming)})")
+        if not incoming:
+            st.info("Yolda gelen kitap yok.")
+        else:
+            labels = {row[0]: f"{row[3]} ({row[2]}){f' → {row[5]}' if row[5] else ''}" for row in incoming}
+            key = st.selectbox("Teslim Alınacak:", list(labels), format_func=labels.get, key="transfer_in")
+            location = st.text_input("Raf:", key="transfer_location", placeholder="Örn: Raf-3-A")
+            if st.button("TESLİM AL"):
+                ok, message = branches.receive(key, location)
+                flash(message, "success" if ok else "error")
+                st.rerun()
+
+    st.markdown("---")
+    st.markdown("### 🚚 Yoldaki Transferler")
+    st.markdown(rows_table(TRANSFER_COLUMNS, [row[1:6] + (row[6],) for row in open_rows]), unsafe_allow_html=True)
+    c_cancel, c_sync = st.columns([3, 1])
+    if outgoing:
+        labels = {row[0]: f"{row[3]} → {row[2]}" for row in outgoing}
+        key = c_cancel.selectbox("İptal Edilecek Gönderi:", list(labels), format_func=labels.get,
+                                 key="transfer_cancel")
+        if c_cancel.button("GÖNDERİYİ İPTAL ET"):
+            ok, message = branches.cancel(key)
+            flash(message, "success" if ok else "error")
+            st.rerun()
+    # Şube kapalıyken yarıda kalan gönderi / teslimleri tamamlar
+    if c_sync.button("EŞİTLE"):
+        report = branches.sync()
+        flash(f"Gönderilen {report['pushed']}, teslimi kapatılan {report['received']}, "
+              f"iptali kapatılan {report['cancelled']}")
+        for name, message in report["errors"].items():
+            flash(f"{name} şubesine ulaşılamadı: {message}", "warning")
+        st.rerun()
+
+
+def render():
+    st.title("Şubeler")
+    st.caption(f"Bu şube: {branches.LOCAL_BRANCH}")
+    lazy_tabs("branches_tab", {
+        "Toplamlar": totals_view,
+        "Ortak Katalog": catalog_view,
+        "Üye Sorgu": member_view,
+        "Transferler": transfers_view,
+    })
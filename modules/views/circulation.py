@@ -0,0 +1,178 @@
+import streamlit as st
+
+from modules import checkout
+from modules import lookup
+from modules import recommend
+from modules import reservation_queue
+from modules.tables import rows_table
+from modules.ui import flash, lazy_tabs, timed_view, typeahead_select
+
+# ========================================================
+# 2. MODÜL: ÖDÜNÇ VE İADE
+# ========================================================
+
+
+def _suggestions(book_ids, member_id):
+    # Verilen kitapları okuyanların okudukları (üyenin daha önce okudukları hariç)
+    rows = recommend.suggest(book_ids, member_id=member_id)
+    if not rows: return
+    st.markdown("#### 💡 Bunu Okuyanlar Bunları da Okudu")
+    st.markdown(rows_table(recommend.COLUMNS, rows), unsafe_allow_html=True)
+
+
+@timed_view("Ödünç Verme")
+def lend_view():
+    st.markdown("### Ödünç Verme Ekranı")
+    mem_id = typeahead_select("Üye Seç:", lookup.find_members, key="lend_member",
+                              placeholder="Ad soyad, üye no veya telefon...")
+    # Rafta olanlar + sıradaki üyeye ayrılmış olanlar (sadece o üyeye verilebilir)
+    bk_id = typeahead_select("Kitap Seç:", lookup.find_books, key="lend_book",
+                             status=reservation_queue.LENDABLE, placeholder="Kitap adı, yazar, ISBN...")
+
+    if bk_id is None:
+        if not st.session_state.get("lend_book_search"): st.error("Stokta kitap kalmadı.")
+    elif mem_id is not None:
+        days = st.slider("Süre (Gün):", checkout.MIN_LOAN_DAYS, checkout.MAX_LOAN_DAYS, checkout.MAX_LOAN_DAYS)
+
+        if st.button("ÖDÜNÇ VER", type="primary"):
+            # Rezervasyon kontrolü (ayrılan / sıradaki ilk üye) ve kayıt tek işlemde
+            allow, problems = checkout.checkout(mem_id, [bk_id], days)
+            for _, reason in problems:
+                st.error(f"DUR! {reason}")
+
+            # st.rerun() işlem bloğunun dışında: commit tamamlandıktan sonra
+            if allow:
+                flash("İşlem tamamlandı.")
+                st.rerun()
+
+        _suggestions([bk_id], mem_id)
+
+
+@timed_view("İade Alma")
+def return_view():
+    st.markdown("### İade Alma Ekranı")
+    sel_ret = typeahead_select("İade Edilen:", lookup.find_active_loans, key="return_loan",
+                               placeholder="Kitap adı, ISBN veya üye adı...")
+
+    if sel_ret is None:
+        if not st.session_state.get("return_loan_search"): st.info("İade bekleyen kitap yok.")
+    else:
+        if st.button("İADEYİ ONAYLA"):
+            trans_id, book_id = sel_ret
+
+            # İade + sırada bekleyen varsa kitabın ona ayrılması aynı işlemde
+            _, held = checkout.checkin([trans_id])
+
+            flash("Kitap iade alındı.")
+
+            # Uyarı varsa yeni çizimde gösterilir (okunana kadar ekranda kalır)
+            if held:
+                title, name, phone, hold_until = held[0]
+                flash(f"DİKKAT! Bu kitap sıradaki üyeye ayrıldı: **{name}** (son alma: {hold_until})", "warning")
+                flash(f"İletişim: {phone} — Kitabı rafa değil, ayrılmış kitaplar bölümüne koyun.", "info")
+
+            st.rerun()
+
+
+# --- BARKOD SEPETİ (TOPLU ÖDÜNÇ / İADE) ---
+# Okuyucu her barkoddan sonra Enter gönderir: on_change geri çağrısı barkodu
+# çözüp sepete ekler ve kutuyu boşaltır. Onay tek işlemde yapılır; sonuç
+# mesajı session_state'e yazılır ve görünüm tek seferde yenilenir.
+CART_LEND = "📤 Ödünç"
+CART_RETURN = "📥 İade"
+
+
+def _cart():
+    return st.session_state.setdefault("scan_cart", [])
+
+
+def _clear_cart():
+    st.session_state["scan_cart"] = []
+    st.session_state.pop("scan_error", None)
+
+
+def _on_scan():
+    code = st.session_state.get("scan_code", "").strip()
+    st.session_state["scan_code"] = ""
+    if not code: return
+    cart = _cart()
+    if st.session_state.get("scan_mode") == CART_RETURN:
+        item, error = checkout.resolve_return(code, exclude={i["loan_id"] for i in cart})
+    else:
+        item, error = checkout.resolve_checkout(code, exclude={i["book_id"] for i in cart})
+    if error:
+        st.session_state["scan_error"] = f"{code}: {error}"
+    else:
+        cart.append(dict(item, code=code))
+        st.session_state.pop("scan_error", None)
+
+
+def _confirm_cart(member_id, days):
+    cart = _cart()
+    if st.session_state.get("scan_mode") == CART_RETURN:
+        count, waiting = checkout.checkin([i["loan_id"] for i in cart])
+        messages = [("success", f"{count} kitap iade alındı.")]
+        messages += [("warning", f"DİKKAT! **{title}** sıradaki üyeye ayrıldı: **{name}** ({phone}), "
+                                 f"son alma {hold_until}")
+                     for title, name, phone, hold_until in waiting]
+    else:
+        ok, problems = checkout.checkout(member_id, [i["book_id"] for i in cart], days)
+        if not ok:
+            st.session_state["scan_result"] = [("error", f"Hiçbir kitap verilmedi. {reason}")
+                                               for _, reason in problems]
+            return
+        messages = [("success", f"{len(cart)} kitap ödünç verildi.")]
+    st.session_state["scan_result"] = messages
+    _clear_cart()
+
+
+@timed_view("Barkod Sepeti")
+def cart_view():
+    st.markdown("### Barkod ile Toplu İşlem")
+    mode = st.radio("İşlem", [CART_LEND, CART_RETURN], key="scan_mode", horizontal=True,
+                    on_change=_clear_cart)
+    member_id = None
+    if mode == CART_LEND:
+        member_id = typeahead_select("Üye Seç:", lookup.find_members, key="cart_member",
+                                     placeholder="Ad soyad, üye no veya telefon...")
+
+    for kind, text in st.session_state.pop("scan_result", []):
+        getattr(st, kind)(text)
+
+    st.text_input("Barkod / ISBN okutun:", key="scan_code", on_change=_on_scan,
+                  placeholder="Okuyucu her barkoddan sonra Enter gönderir")
+    if st.session_state.get("scan_error"):
+        st.error(st.session_state["scan_error"])
+
+    cart = _cart()
+    if not cart:
+        st.info("Sepet boş.")
+        return
+    columns = {"code": "Barkod", "title": "Eser"}
+    if mode == CART_RETURN:
+        columns.update(member="Üye", due_date="Teslim Tarihi")
+    st.markdown(rows_table(list(columns.values()), [tuple(item[k] for k in columns) for item in cart]),
+                unsafe_allow_html=True)
+
+    c_days, c_ok, c_clear = st.columns([2, 1, 1])
+    days = (c_days.slider("Süre (Gün):", checkout.MIN_LOAN_DAYS, checkout.MAX_LOAN_DAYS, checkout.MAX_LOAN_DAYS,
+                          key="cart_days") if mode == CART_LEND else checkout.MAX_LOAN_DAYS)
+    label = f"{len(cart)} KİTABI ÖDÜNÇ VER" if mode == CART_LEND else f"{len(cart)} KİTABI İADE AL"
+    c_ok.button(label, type="primary", on_click=_confirm_cart, args=(member_id, days),
+                disabled=mode == CART_LEND and member_id is None)
+    c_clear.button("Sepeti Boşalt", on_click=_clear_cart)
+    if mode == CART_LEND:
+        _suggestions([item["book_id"] for item in cart], member_id)
+
+
+def render():
+    st.title("Ödünç ve İade İşlemleri")
+    # Süresi dolan ayırmalar sıradakine geçer (dolan yoksa tek indeks okuması)
+    reservation_queue.expire_holds()
+    # Yeni ödünçler öneri tablosuna arka planda işlenir (ekran beklemez)
+    recommend.refresh_in_background()
+    lazy_tabs("circulation_tab", {
+        "📤 KİTAP VER (ÖDÜNÇ)": lend_view,
+        "📥 KİTAP AL (İADE)": return_view,
+        "🛒 BARKOD SEPETİ": cart_view,
+    })
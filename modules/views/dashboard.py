@@ -0,0 +1,115 @@
+import streamlit as st
+
+from modules import lookup, notifications, stats
+from modules.tables import rows_table
+from modules.ui import timed_view, typeahead_select
+
+# ========================================================
+# 1. MODÜL: OPERASYON MERKEZİ (DASHBOARD)
+# ========================================================
+# Bu sayfa her açılışta ilk çizilen sayfadır: satırlar doğrudan sqlite'tan
+# demet olarak okunur, pandas yüklenmez.
+
+OVERDUE_COLUMNS = ("Üye", "Eser", "Teslim Tarihi", "Telefon", "Gecikme Süresi", "SMS")
+# Tabloda en eski teslim tarihli bu kadar gecikme gösterilir; toplam KPI sayacından
+OVERDUE_PREVIEW = 50
+SMS_POLL_SECONDS = 2
+
+
+def overdue_display_rows(overdue, sms_status=None):
+    # overdue: stats.overdue_loans() satırları; sms_status: {loan_id: durum}
+    sms_status = sms_status or {}
+    return [(name, title, due, phone, f"{days} GÜN", sms_status.get(loan_id, "-"))
+            for loan_id, name, title, due, phone, days in overdue]
+
+
+@timed_view("Operasyon Merkezi")
+def overview():
+    # KPI'lar tetikleyicilerle güncel tutulan özet tablodan tek satırda okunur
+    total_books, total_members, active_loans, overdue_count = stats.get_kpis()
+
+    # KPI KARTLARI (DEVASA PUNTOLU)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Toplam Kitap", total_books)
+    c2.metric("Toplam Üye", total_members)
+    c3.metric("Ödünç Verilen", active_loans)
+    c4.metric("Geciken İade", overdue_count)
+
+    st.markdown("---")
+
+    overdue = stats.overdue_loans(limit=OVERDUE_PREVIEW)
+    if overdue:
+        st.subheader("⚠️ DİKKAT: Teslim Tarihi Geçenler")
+        # Bugünkü bildirim durumu (notifications tablosu, ödünç başına günde bir kayıt)
+        statuses = notifications.loan_statuses([row[0] for row in overdue])
+        rows = overdue_display_rows(overdue, statuses)
+        st.markdown(rows_table(OVERDUE_COLUMNS, rows, alert_col="Gecikme Süresi"), unsafe_allow_html=True)
+        if overdue_count > len(overdue):
+            st.caption(f"En eski {len(overdue)} gecikme gösteriliyor (toplam {overdue_count}).")
+
+        sms_panel(overdue_count)
+    else:
+        st.success("Gecikmiş iade bulunmuyor.")
+
+
+def sms_panel(overdue_count):
+    with st.container(border=True):
+        st.markdown("### 🔔 SMS Paneli")
+        # Sayaçlar gönderimden sonra doldurulur (aynı çizimde güncel görünsün)
+        summary = st.container()
+
+        # Değer: (işlem id, kitap id); yalnızca gecikenler aranır
+        selected = typeahead_select("Kişi Seç:", lookup.find_active_loans, key="sms_loan",
+                                    placeholder="Üye adı veya eser...", overdue=True)
+        start = False
+        if selected is not None and st.button("SMS GÖNDER"):
+            if notifications.queue_overdue(loan_ids=[int(selected[0])]):
+                st.info("SMS kuyruğa alındı; sonuç aşağıdaki sayaçlarda görünür.")
+                start = True
+            else:
+                st.info("Bu kişiye bugün zaten SMS gönderildi.")
+
+        # Toplu gönderim: bugün bildirimi gitmemiş tüm gecikenler (tekrar basmak çift mesaj üretmez).
+        # Sayfa yalnızca kuyruğa alır; gönderim arka planda, sayaçlar SMS_POLL_SECONDS'ta bir okunur.
+        c_all, c_retry = st.columns(2)
+        if c_all.button(f"TÜM GECİKENLERE GÖNDER ({overdue_count})"):
+            queued = notifications.queue_overdue()
+            st.info(f"{queued} mesaj kuyruğa alındı.")
+            start = True
+        if c_retry.button("HATALILARI TEKRAR DENE"):
+            notifications.retry_failed()
+            start = True
+        if start and not notifications.dispatch_in_background():
+            st.info("Gönderim zaten sürüyor; yeni kayıtlar da gönderilecek.")
+
+        poll = SMS_POLL_SECONDS if notifications.dispatch_running() else None
+        with summary:
+            st.fragment(sms_status, run_every=poll)()
+
+
+def sms_status():
+    counts = notifications.status_counts()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Bugün Gönderilen", counts.get(notifications.SENT, 0))
+    c2.metric("Bekleyen", counts.get(notifications.PENDING, 0) + counts.get(notifications.SENDING, 0))
+    c3.metric("Hatalı", counts.get(notifications.FAILED, 0))
+    if notifications.dispatch_running():
+        st.caption("📤 Gönderim arka planda sürüyor...")
+    elif notifications.dispatch_error():
+        st.error(f"Arka plan gönderimi yarıda kaldı: {notifications.dispatch_error()}. "
+                 f"Gönderilmeyenler kuyruğa geri alındı; tekrar deneyebilirsiniz.")
+    elif st.session_state.get("sms_polling"):
+        # Gönderim bitti: tablo (SMS sütunu) ve hatalılar için sayfa bir kez yenilenir
+        st.session_state["sms_polling"] = False
+        st.rerun()
+    st.session_state["sms_polling"] = notifications.dispatch_running()
+    failed = notifications.failed_rows() if counts.get(notifications.FAILED) else None
+    if failed:
+        with st.expander("Gönderilemeyenler"):
+            st.markdown(rows_table(notifications.FAILED_COLUMNS, failed, alert_col="Hata"),
+                        unsafe_allow_html=True)
+
+
+def render():
+    st.title("Operasyon Merkezi")
+    overview()
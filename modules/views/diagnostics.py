@@ -0,0 +1,146 @@
+import hmac
+import os
+
+import streamlit as st
+
+from modules import db_manager as db
+from modules import instrumentation
+from modules.tables import EMPTY_HTML, create_custom_table, rows_table
+from modules.ui import timed_view
+
+# ========================================================
+# 8. MODÜL: SİSTEM TANILAMA (SADECE YÖNETİCİ)
+# ========================================================
+# Menüde yalnızca AKYURT_ADMIN_PIN ortam değişkeni tanımlıysa görünür ve
+# oturum başına PIN ile açılır. Veriler süreç geneli (tüm oturumlar) ölçümlerdir.
+
+ADMIN_PIN = os.environ.get("AKYURT_ADMIN_PIN", "")
+
+
+def enabled():
+    return bool(ADMIN_PIN)
+
+
+def _unlocked():
+    if st.session_state.get("admin_unlocked"): return True
+    with st.form("admin_login"):
+        pin = st.text_input("Yönetici PIN", type="password")
+        if st.form_submit_button("GİRİŞ"):
+            if hmac.compare_digest(pin, ADMIN_PIN):
+                st.session_state["admin_unlocked"] = True
+                return True
+            st.error("PIN hatalı.")
+    return False
+
+
+def _short(sql, width=160):
+    return sql if len(sql) <= width else sql[:width] + "…"
+
+
+def _records_table(records, alert_col=None):
+    # [{başlık: değer}] -> HTML (pandas'sız; başlıklar ilk kaydın anahtarları)
+    if not records: return EMPTY_HTML
+    return rows_table(list(records[0]), [tuple(r.values()) for r in records], alert_col=alert_col)
+
+
+@timed_view("Sistem Tanılama")
+def diagnostics_view():
+    statements = instrumentation.top_statements(n=10_000)
+    scans = instrumentation.full_scans()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Farklı Sorgu", len(statements))
+    c2.metric("Toplam Çalıştırma", sum(s["count"] for s in statements))
+    c3.metric(f"Yavaş (≥{instrumentation.SLOW_QUERY_MS:.0f} ms)", sum(s["slow"] for s in statements))
+    c4.metric("Tam Tarama", len(scans))
+    busy = db.busy_stats()
+    st.caption(f"Kilit (database is locked) tekrarı: {busy['retries']:,} — "
+               f"denemeleri tükenen işlem: {busy['failures']:,}")
+
+    st.markdown("---")
+    c_n, c_key = st.columns(2)
+    top_n = c_n.slider("Gösterilecek sorgu sayısı", 5, 100, 20, step=5)
+    key = c_key.radio("Sıralama", ["En yavaş", "Toplam süre", "Ortalama"], horizontal=True)
+    sort_key = {"En yavaş": "max_ms", "Toplam süre": "total_ms", "Ortalama": "avg_ms"}[key]
+
+    st.subheader("🐢 En Yavaş Sorgular")
+    top = instrumentation.top_statements(n=top_n, key=sort_key)
+    st.markdown(_records_table([{
+        "Sorgu": _short(s["sql"]),
+        "Menü": ", ".join(s["sections"]) or "-",
+        "Çalışma": s["count"],
+        "Parametre": s["binds"],
+        "Satır (ort.)": round(s["rows"] / s["count"], 1) if s["count"] else 0,
+        "Ort. ms": f"{s['avg_ms']:.2f}",
+        "Maks. ms": f"{s['max_ms']:.2f}",
+        "Toplam ms": f"{s['total_ms']:.1f}",
+        "Uyarı": "TAM TARAMA" if s["full_scan"] else "-",
+    } for s in top], alert_col="Uyarı"), unsafe_allow_html=True)
+
+    st.subheader("⚠️ Tam Tablo Taraması Yapan Yavaş Sorgular")
+    if scans:
+        st.markdown(_records_table([{
+            "Sorgu": _short(s["sql"]),
+            "Plan": " | ".join(s["plan"] or []),
+            "Maks. ms": f"{s['max_ms']:.2f}",
+        } for s in scans], alert_col="Plan"), unsafe_allow_html=True)
+    else:
+        st.success("Eşiği aşan sorgularda tam tablo taraması görülmedi.")
+
+    st.subheader("⏱️ Menü / Görünüm Çizim Süreleri")
+    st.markdown(_records_table([{
+        "Ad": s["name"],
+        "Tür": "Menü" if s["kind"] == "menu" else "Görünüm",
+        "Çalışma": s["count"],
+        "Son ms": f"{s['last_ms']:.1f}",
+        "Ort. ms": f"{s['avg_ms']:.1f}",
+        "Maks. ms": f"{s['max_ms']:.1f}",
+    } for s in instrumentation.sections()]), unsafe_allow_html=True)
+
+    consistency_panel()
+
+    with st.expander("Son yavaş sorgu kayıtları"):
+        st.json(instrumentation.recent_slow()[:50])
+
+    st.caption(f"Günlük dosyası: {os.path.abspath(instrumentation.LOG_PATH)}")
+    if st.button("ÖLÇÜMLERİ SIFIRLA"):
+        instrumentation.reset()
+        st.rerun()
+
+
+def consistency_panel():
+    # books.status / ödünç / rezervasyon tutarlılığı (modules/consistency.py; pandas
+    # kullandığı için yalnızca bu panel çizilirken yüklenir)
+    from modules import consistency
+
+    st.subheader("🧮 Kitap Durumu Tutarlılığı")
+    last = consistency.last_log()
+    if last:
+        st.caption(f"Son çalıştırma ({last['mode']}): {last['at']} — bulunan {sum(last['found'].values()):,}, "
+                   f"düzeltilen {sum(last['changed'].values()):,}")
+    c_scan, c_fix = st.columns(2)
+    if c_scan.button("TUTARLILIĞI TARA"):
+        issues, seconds = consistency.scan()
+        consistency.write_log("scan", consistency.summarize(issues), {}, seconds)
+        if issues.empty:
+            st.success(f"Tutarsızlık yok ({seconds:.2f} sn).")
+        else:
+            st.markdown(create_custom_table(issues.rename(columns={
+                "kind": "Sorun", "book_id": "Kitap", "ref_id": "Ödünç / Talep",
+                "current": "Şu An", "target": "Olması Gereken"}).fillna("-").head(200)), unsafe_allow_html=True)
+    if c_fix.button("TUTARSIZLIKLARI DÜZELT"):
+        report = consistency.repair()
+        consistency.write_log("repair", report["found"], report["changed"], report["seconds"])
+        st.success(f"Düzeltilen: {sum(report['changed'].values()):,} ({report['seconds']:.2f} sn)")
+        left = {k: n - report["changed"].get(k, 0) for k, n in report["found"].items()}
+        if any(left.values()):
+            st.warning("Elle incelenmesi gerekenler: " + ", ".join(f"{k}: {n}" for k, n in left.items() if n)
+                       + " (çift ödünçler: python -m modules.consistency repair --fix-duplicates)")
+
+
+def render():
+    st.title("Sistem Tanılama")
+    if not instrumentation.ENABLED:
+        st.warning("Ölçüm kapalı (AKYURT_INSTRUMENT=0).")
+        return
+    if _unlocked():
+        diagnostics_view()
@@ -0,0 +1,116 @@
+import streamlit as st
+
+from modules import archive
+from modules import catalog_cache
+from modules import lookup
+from modules import services
+from modules.tables import paged_table
+from modules.ui import flash, lazy_tabs, timed_view, typeahead_select
+
+# ========================================================
+# 5. MODÜL: ÜYE YÖNETİMİ
+# ========================================================
+
+MEMBER_COLUMNS = "name as 'Ad Soyad', phone as 'Telefon', email as 'E-Posta', join_date as 'Kayıt Tarihi'"
+MEMBER_SORTS = {"Ad Soyad": "name", "Kayıt Tarihi": "coalesce(join_date, '')", "Üye No": "id"}
+# Aynı liste süreç geneli katalog önbelleğinden (SQL'e gitmeden)
+MEMBER_CACHE_COLUMNS = {"Ad Soyad": "name", "Telefon": "phone", "E-Posta": "email", "Kayıt Tarihi": "join_date"}
+MEMBER_CACHE_SORTS = {"Ad Soyad": "name", "Kayıt Tarihi": "join_date", "Üye No": "id"}
+
+
+# Üye geçmişi: sıcak + arşivlenmiş ödünçler (loan_history görünümü)
+HISTORY_SOURCE = "loan_history h LEFT JOIN books b ON h.book_id = b.id"
+HISTORY_COLUMNS = ("coalesce(b.title, '(silinmiş kitap)') as 'Eser', h.issue_date as 'Veriliş', "
+                   "h.due_date as 'Son Tarih', coalesce(h.return_date, '-') as 'İade', h.status as 'Durum'")
+HISTORY_SORTS = {"Veriliş Tarihi": "h.issue_date", "İade Tarihi": "coalesce(h.return_date, '')"}
+
+
+def member_page(sort_label, after, descending, page_size):
+    return catalog_cache.page("members", MEMBER_CACHE_COLUMNS, MEMBER_CACHE_SORTS[sort_label],
+                              after, descending, page_size)
+
+
+@timed_view("Üye Listesi")
+def member_list_view():
+    paged_table("members_list", "members", MEMBER_COLUMNS, MEMBER_SORTS, fetch=member_page)
+
+
+@timed_view("Ödünç Geçmişi")
+def history_view():
+    st.markdown("### Üye Ödünç Geçmişi")
+    mem_id = typeahead_select("Üye Seç:", lookup.find_members, key="history_member",
+                              placeholder="Ad soyad, üye no veya telefon...")
+    if mem_id is None: return
+    st.caption(f"Toplam {archive.member_history_count(mem_id):,} ödünç (arşivlenmişler dahil)")
+    paged_table("member_history", HISTORY_SOURCE, HISTORY_COLUMNS, HISTORY_SORTS, id_expr="h.id",
+                where="h.member_id = ?", params=(mem_id,))
+
+
+@timed_view("Yeni Üye Ekle")
+def add_member_view():
+    st.markdown("### Yeni Üye Kaydı")
+    with st.container(border=True):
+        with st.form("add_member_form"):
+            nm = st.text_input("Ad Soyad")
+            ph = st.text_input("Telefon")
+            em = st.text_input("E-Posta")
+
+            if st.form_submit_button("ÜYEYİ KAYDET"):
+                ok, result = services.add_member(nm, ph, em)
+                if ok:
+                    st.success(f"{nm} sisteme eklendi.")
+                else:
+                    st.error(result)
+
+
+@timed_view("Üye Düzenle / Sil")
+def edit_member_view():
+    st.markdown("### Üye Bilgilerini Düzenle")
+    sel_mem_id = typeahead_select("İşlem Yapılacak Üyeyi Seç:", lookup.find_members, key="edit_member",
+                                  placeholder="Ad soyad, üye no veya telefon...")
+
+    if sel_mem_id is None:
+        if not st.session_state.get("edit_member_search"): st.warning("Kayıtlı üye yok.")
+    else:
+        curr_mem = catalog_cache.get_member(sel_mem_id)
+        if curr_mem is None:
+            # Seçim yapıldıktan sonra başka bir masada silinmiş: seçimi bırak
+            flash("Kayıt silinmiş, seçim temizlendi.", "warning")
+            st.session_state.pop("edit_member", None)
+            st.rerun()
+
+        with st.form("edit_mem_form"):
+            new_name = st.text_input("Ad Soyad", value=curr_mem[1])
+            new_phone = st.text_input("Telefon", value=curr_mem[2])
+            new_email = st.text_input("E-Posta", value=curr_mem[3])
+
+            c1, c2 = st.columns(2)
+            upd_btn = c1.form_submit_button("💾 GÜNCELLE")
+            del_btn = c2.form_submit_button("🗑️ ÜYEYİ SİL")
+
+            if upd_btn:
+                ok, msg = services.update_member(sel_mem_id, new_name, new_phone, new_email)
+                if ok:
+                    flash(msg)
+                    st.rerun()
+                else:
+                    st.error(msg)
+
+            if del_btn:
+                # Üzerinde iade edilmemiş kitap varsa servis silmez
+                ok, msg = services.delete_member(sel_mem_id)
+                if ok:
+                    flash(msg)
+                    st.rerun()
+                else:
+                    st.error(msg)
+
+
+def render():
+    st.title("Üye Veritabanı Yönetimi")
+    lazy_tabs("members_tab", {
+        "📋 Üye Listesi": member_list_view,
+        "📜 Ödünç Geçmişi": history_view,
+        "➕ Yeni Üye Ekle": add_member_view,
+        "✏️ Düzenle / Sil": edit_member_view,
+    })
@@ -0,0 +1,74 @@
+import streamlit as st
+
+from modules import lookup
+from modules import reservation_queue
+from modules.tables import create_custom_table
+from modules.ui import flash, timed_view, typeahead_select
+
+# ========================================================
+# 3. MODÜL: REZERVASYON
+# ========================================================
+
+
+def load_waiting_reservations():
+    # Bekleyenler (kitap kuyruğundaki sırasıyla) + üyeye ayrılmış kitaplar
+    return reservation_queue.queue_df()
+
+
+@timed_view("Rezervasyon")
+def reservations_view():
+    col1, col2 = st.columns([1, 1])
+
+    # SOL: Talep Oluştur
+    with col1:
+        st.markdown("### ➕ Sıraya Gir (Talep)")
+        with st.container(border=True):
+            # Sadece ödünçte veya başka üyeye ayrılmış kitaplar listelenir
+            bk_id = typeahead_select("İstenen Kitap (Sadece Ödünçtekiler):", lookup.find_books, key="res_book",
+                                     status=reservation_queue.RESERVABLE, placeholder="Kitap adı, yazar, ISBN...")
+
+            if bk_id is None:
+                if not st.session_state.get("res_book_search"):
+                    st.success("Tüm kitaplar rafta! Rezervasyona gerek yok, direkt ödünç verebilirsiniz.")
+            else:
+                mem_id = typeahead_select("Talep Eden Üye:", lookup.find_members, key="res_member",
+                                          placeholder="Ad soyad, üye no veya telefon...")
+
+                if mem_id is not None:
+                    st.caption(f"Bu kitap için sırada bekleyen: {reservation_queue.waiting_count(bk_id)}")
+                    if st.button("REZERVASYON OLUŞTUR"):
+                        # Zaten sırada mı? kontrolü ve sıraya ekleme tek işlemde
+                        ok, message = reservation_queue.enqueue(bk_id, mem_id)
+                        if ok:
+                            st.success(message)
+                        else:
+                            st.error(message)
+
+    # SAĞ: Bekleyenler Listesi
+    with col2:
+        st.markdown("### Bekleyen Talepler")
+        res_df = load_waiting_reservations()
+
+        if res_df.empty:
+            st.info("Sırada bekleyen kimse yok.")
+        else:
+            # HTML Tablo ile göster
+            st.markdown(create_custom_table(res_df), unsafe_allow_html=True)
+
+            # İptal Etme Alanı
+            st.markdown("---")
+            cancel_id = typeahead_select("İptal Edilecek Talep:", lookup.find_reservations, key="res_cancel",
+                                         placeholder="Talep no, kitap adı veya üye adı...")
+            if cancel_id is not None and st.button("TALEBİ İPTAL ET"):
+                # Ayrılmış bir talep iptal edilirse kitap sıradakine geçer
+                held = reservation_queue.cancel(int(cancel_id))
+                flash("Talep silindi.")
+                for title, name, phone, hold_until in held:
+                    flash(f"'{title}' sıradaki üyeye ayrıldı: {name} ({phone}), son alma {hold_until}", "info")
+                st.rerun()
+
+
+def render():
+    st.title("Kitap Rezervasyon Sistemi")
+    reservation_queue.expire_holds()
+    reservations_view()